@@ -0,0 +1,77 @@
+"""
+Active region ("virtual trackpad") mapping.
+
+Only a rectangle of the camera frame drives the cursor: it is stretched
+over the whole screen, so small hand movements cover the full desktop.
+Bands along the region edges have a higher gain (edge acceleration), so
+the center keeps fine control while the screen borders stay reachable.
+The same rectangle, plus a margin, is what HandTracker can restrict
+inference to.
+"""
+
+import config
+
+
+class ActiveRegion:
+    def __init__(self, rect=None, edge_width=None, edge_gain=None):
+        """
+        rect: (x_min, y_min, x_max, y_max) in normalised camera coordinates
+              of the mirrored (selfie view) frame.
+        edge_width: width of each accelerated edge band, as a fraction of the region (0 to <0.5).
+        edge_gain: how much faster the cursor moves inside the edge bands than in the center.
+        """
+        rect = config.ACTIVE_REGION if rect is None else rect
+        edge_width = config.ACTIVE_REGION_EDGE_WIDTH if edge_width is None else edge_width
+        edge_gain = config.ACTIVE_REGION_EDGE_GAIN if edge_gain is None else edge_gain
+
+        x_min, y_min, x_max, y_max = rect
+        if not (0.0 <= x_min < x_max <= 1.0 and 0.0 <= y_min < y_max <= 1.0):
+            raise ValueError(f"Invalid active region {rect}")
+        if not 0.0 <= edge_width < 0.5 or edge_gain <= 0:
+            raise ValueError(f"Invalid edge acceleration (width={edge_width}, gain={edge_gain})")
+        self.rect = (x_min, y_min, x_max, y_max)
+
+        # Affine part: camera coordinates -> 0..1 inside the region
+        self.scale_x = 1.0 / (x_max - x_min)
+        self.scale_y = 1.0 / (y_max - y_min)
+        self.offset_x = -x_min * self.scale_x
+        self.offset_y = -y_min * self.scale_y
+
+        # Piecewise-linear edge curve: slopes chosen so 0..1 still maps onto 0..1
+        self.edge_width = edge_width
+        self.center_slope = 1.0 / ((1.0 - 2.0 * edge_width) + 2.0 * edge_width * edge_gain)
+        self.edge_slope = self.center_slope * edge_gain
+        self.edge_out = edge_width * self.edge_slope
+
+    @classmethod
+    def full_frame(cls):
+        """Identity mapping over the whole frame (no active region)"""
+        return cls((0.0, 0.0, 1.0, 1.0), edge_width=0.0, edge_gain=1.0)
+
+    @classmethod
+    def from_config(cls):
+        return cls() if config.ACTIVE_REGION_ENABLED else cls.full_frame()
+
+    def _curve(self, u):
+        if u <= self.edge_width:
+            return u * self.edge_slope
+        if u >= 1.0 - self.edge_width:
+            return 1.0 - (1.0 - u) * self.edge_slope
+        return self.edge_out + (u - self.edge_width) * self.center_slope
+
+    def to_unit(self, norm_x, norm_y):
+        """Map camera coordinates to 0..1 across the region, clamped at the edges"""
+        u = min(max(norm_x * self.scale_x + self.offset_x, 0.0), 1.0)
+        v = min(max(norm_y * self.scale_y + self.offset_y, 0.0), 1.0)
+        return self._curve(u), self._curve(v)
+
+    def contains(self, norm_x, norm_y):
+        x_min, y_min, x_max, y_max = self.rect
+        return x_min <= norm_x <= x_max and y_min <= norm_y <= y_max
+
+    def roi(self, margin=None):
+        """The region grown by a margin (fraction of the frame), clipped to the frame"""
+        margin = config.ROI_MARGIN if margin is None else margin
+        x_min, y_min, x_max, y_max = self.rect
+        return (max(0.0, x_min - margin), max(0.0, y_min - margin),
+                min(1.0, x_max + margin), min(1.0, y_max + margin))
@@ -0,0 +1,304 @@
+"""
+Vectorised batch gesture evaluation for offline analysis.
+
+GestureRecognizer.recognize handles one frame at a time. BatchGestureEvaluator
+takes a whole session as a (T, 21, 3) landmark array and computes
+everything that doesn't depend on state - finger states, pinch distances
+(with their hysteresis, as a forward fill), palm sizes, hand centers and
+the pose of each frame (through the recognizer's compiled
+pose table, or its pose classifier) - with NumPy over all frames at once. Only the state machine
+itself runs in Python, and it visits runs of frames with the same pose
+rather than every frame: once a run reaches a steady transition (one that
+changes no state when repeated), the rest of it is filled in with one
+slice assignment.
+
+Within a run, frames that only wait - for the right click hold time, or
+for a pinch to outlast the tap window or move the hand - are skipped to
+the first frame that can end the wait (searchsorted on the timestamps, a
+vectorised movement test). Continuous scroll runs go through
+ScrollEngine.update_run, with their scrolls logged in one go. The
+recognizer the state machine runs on is built without its temporal
+matchers, and shares one mouse controller per evaluator.
+
+That leaves a NumPy pass over all frames (about 0.2 us a frame) plus
+Python work per pose change, per scrolling or momentum-coasting frame
+(the scroll integration and its velocity are sequential) and per click,
+against about 25 us a frame for recognize(). The speedup therefore
+depends on how much of a session is spent acting, not on its length:
+on 40,000-frame synthetic sessions, about 30x when the pose changes every
+20 frames and one frame in ten scrolls, about 50x with runs of 30-300
+frames that still scroll and click a lot, and 100-130x when runs are long
+and mostly cursor movement. Sessions that spend most of their frames
+scrolling don't get to hundreds.
+
+The state machine is the recognizer's own (GESTURE_MACHINE), so the
+gestures and the press/release/click/scroll actions produced are identical
+to feeding the same frames through recognize() one by one. Cursor movement
+is not simulated (use replay.py for that).
+"""
+
+from array import array
+
+import numpy as np
+
+import config
+from event_log import EventLog
+from gesture_recognizer import (GestureRecognizer, GESTURE_MACHINE, GESTURE_SCROLL_UP_ACTION,
+                                GESTURE_SCROLL_DOWN_ACTION, POSE_LOST, POSE_HAND, THUMB_TIP,
+                                INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, PINKY_TIP, WRIST, INDEX_FINGER_MCP,
+                                MIDDLE_FINGER_MCP, PINKY_MCP, classifier_poses)
+from gesture_state_machine import STAY
+import pose_classifier
+from mouse_controller import MouseController, NullMouseBackend, ACTION_SCROLL
+from session_recorder import GESTURES, HAND_NONE
+from temporal_gestures import TemporalGestureEngine
+
+_TIP_IDS = [8, 12, 16, 20]
+_PIP_IDS = [6, 10, 14, 18]
+_FEATURE_WEIGHTS = 1 << np.arange(7)  # Bit order of gesture_state_machine.feature_key
+_GESTURE_CODES = {name: i for i, name in enumerate(GESTURES)}
+
+
+def fingers_up(landmarks):
+    """(T, 5) finger states, as HandTracker.fingers_up per frame"""
+    thumb = landmarks[:, THUMB_TIP, 0] > landmarks[:, 3, 0]
+    others = landmarks[:, _TIP_IDS, 1] < landmarks[:, _PIP_IDS, 1]
+    return np.column_stack([thumb, others])
+
+
+def distance(landmarks, p1, p2):
+    """(T,) 2D distance between two landmarks, as HandTracker.calculate_distance"""
+    dx = landmarks[:, p2, 0] - landmarks[:, p1, 0]
+    dy = landmarks[:, p2, 1] - landmarks[:, p1, 1]
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def palm_sizes(landmarks):
+    """(T,) palm size, as GestureRecognizer.recognize with hand scale normalisation"""
+    return np.maximum(distance(landmarks, WRIST, MIDDLE_FINGER_MCP), distance(landmarks, INDEX_FINGER_MCP, PINKY_MCP))
+
+
+def hysteresis(values, enter, leave, present):
+    """
+    (T,) bool: on from a frame with value < enter until one with value >= leave
+    or without a hand (enter and leave may be per-frame arrays)
+    """
+    decided = (values < enter) | (values >= leave) | ~present
+    # Every frame takes the state of the latest deciding frame (off before the first)
+    last = np.maximum.accumulate(np.where(decided, np.arange(len(values)), -1))
+    state = (values < enter)[last]
+    state[last < 0] = False
+    return state
+
+
+def hand_centers(landmarks):
+    """(T, 2) hand center (mean of wrist and middle finger MCP)"""
+    return (landmarks[:, 0, :2] + landmarks[:, 9, :2]) / 2
+
+
+class BatchResult:
+    def __init__(self, gestures, actions, poses, fingers, centers):
+        self.gestures = gestures   # (T,) indices into session_recorder.GESTURES
+        self.actions = actions     # (N, 4) frame index, ACTION_* code, a, b (NullMouseBackend layout)
+        self.poses = poses         # (T,) POSE_* of each frame
+        self.fingers = fingers     # (T, 5) finger states
+        self.centers = centers     # (T, 2) hand centers (undefined where no hand)
+
+    def gesture_names(self):
+        return [GESTURES[g] for g in self.gestures]
+
+
+class BatchGestureEvaluator:
+    def __init__(self):
+        # Same settings GestureRecognizer reads at construction
+        self.pinch_threshold_click = config.PINCH_THRESHOLD_CLICK
+        self.hand_scale_normalisation = config.HAND_SCALE_NORMALISATION
+        self.pinch_enter_ratio = config.PINCH_ENTER_RATIO
+        self.pinch_exit_ratio = config.PINCH_EXIT_RATIO
+        self.pose_table = np.array(GESTURE_MACHINE.compile(_Run, config.CURSOR_MODE).pose_table, np.int8)
+        self.classifier_min_confidence = config.POSE_CLASSIFIER_MIN_CONFIDENCE
+        self.set_pose_classifier(pose_classifier.load(config.POSE_CLASSIFIER) if config.POSE_CLASSIFIER else None)
+        # Shared by every evaluation: the mouse controller only forwards actions to each run's
+        # backend, and the temporal matchers (swipes, circles) aren't part of the state machine
+        quiet = EventLog(mode="off")
+        self.mouse_controller = MouseController(backend=NullMouseBackend(), screen_size=(1920, 1080), event_log=quiet)
+        self.temporal = TemporalGestureEngine([])
+
+    def set_pose_classifier(self, model):
+        """As GestureRecognizer.set_pose_classifier"""
+        self.pose_classifier = model
+        self.classifier_poses = (np.array(classifier_poses(model.classes, config.CURSOR_MODE), np.int8)
+                                 if model is not None else None)
+
+    def poses(self, landmarks, present, palm=None):
+        """Pose of every frame; returns (poses, fingers). palm: palm_sizes(landmarks), if already computed"""
+        fingers = fingers_up(landmarks)
+        if self.pose_classifier is not None:
+            classes, confidence = pose_classifier.predict(self.pose_classifier, np.nan_to_num(landmarks))
+            poses = np.where(confidence >= self.classifier_min_confidence, self.classifier_poses[classes], POSE_HAND)
+            poses[~present] = POSE_LOST
+            return poses.astype(np.int8), fingers
+        pinch_distance = distance(landmarks, THUMB_TIP, INDEX_FINGER_TIP)
+        touch_distance = distance(landmarks, INDEX_FINGER_TIP, MIDDLE_FINGER_TIP)
+        if self.hand_scale_normalisation:
+            palm = palm_sizes(landmarks) if palm is None else palm
+            enter, leave = self.pinch_enter_ratio * palm, self.pinch_exit_ratio * palm
+            pinch = hysteresis(pinch_distance, enter, leave, present)
+            touch = hysteresis(touch_distance, enter, leave, present)
+        else:
+            pinch = pinch_distance < self.pinch_threshold_click
+            touch = touch_distance < self.pinch_threshold_click
+        features = np.column_stack([fingers, pinch, touch])
+        poses = self.pose_table[features @ _FEATURE_WEIGHTS]
+        poses[~present] = POSE_LOST
+        return poses, fingers
+
+    def evaluate(self, landmarks, timestamps, present=None):
+        """
+        landmarks: (T, 21, 3) normalised x, y, z per frame.
+        timestamps: (T,) capture times in seconds.
+        present: (T,) bool, frames with a hand (default: frames whose landmarks aren't NaN).
+        """
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if present is None:
+            present = ~np.isnan(landmarks[:, 0, 0])
+        present = np.asarray(present, bool)
+
+        palm = palm_sizes(landmarks)
+        poses, fingers = self.poses(landmarks, present, palm)
+        gestures = np.empty(len(poses), np.uint8)
+        centers = hand_centers(landmarks)
+        run = _Run(self.mouse_controller, self.temporal, timestamps, landmarks[:, PINKY_TIP, 1], centers, palm)
+        transitions = run.machine.transitions
+        engine = run.scroll_engine
+
+        # Walk runs of frames with the same pose
+        starts = np.flatnonzero(np.diff(poses, prepend=-1))
+        ends = np.append(starts[1:], len(poses))
+        for start, end, pose in zip(starts.tolist(), ends.tolist(), poses[starts].tolist()):
+            i = start
+            while i < end:
+                gestures[i] = _GESTURE_CODES[run.step_frame(i, pose)]
+                i += 1
+                if engine and engine.coasting:
+                    continue
+                transition = transitions[run.current_gesture][pose]
+                # Settled: the rest of the run repeats a transition that changes nothing
+                if transition.steady:
+                    gestures[i:end] = gestures[i - 1]
+                    break
+                # Continuous scrolling: the engine integrates the rest of the run in one call
+                if engine and transition.actions == (GestureRecognizer._scroll,) and transition.target is STAY:
+                    gestures[i:end] = run.scroll_frames(i, end)
+                    break
+                # Waiting for a hold time or hand movement: skip to the first frame that may end the wait
+                wait = run.wait(transition, i, end)
+                gestures[i:wait] = gestures[i - 1]
+                i = wait
+
+        actions = np.frombuffer(run.backend.log, dtype=np.float64).reshape(-1, 4).copy()
+        return BatchResult(gestures, actions, poses, fingers, centers)
+
+    def evaluate_records(self, records):
+        """Evaluate session_recorder FRAME_DTYPE records (a session or landmark cache entry)"""
+        return self.evaluate(records['landmarks'], records['t'], records['hand'] != HAND_NONE)
+
+
+# Waiting guards are searched for with this much slack, so the frame found is never late
+_WAIT_SLACK = 1e-9
+
+
+class _Run(GestureRecognizer):
+    """The recognizer's state machine, stepped by frame index without moving a cursor"""
+
+    def __init__(self, mouse_controller, temporal, timestamps, pinky_y, centers, palm_sizes):
+        """
+        mouse_controller, temporal: the evaluator's, shared between runs (actions go to this run's backend).
+        Per-frame (T,) and (T, 2) arrays; stepped frames read float arrays (cheap to index, cheap to copy).
+        """
+        self.frame_index = 0
+        self.backend = mouse_controller.backend = NullMouseBackend(clock=lambda: self.frame_index)
+        super().__init__(mouse_controller, None, event_log=mouse_controller.event_log, temporal=temporal)
+        self.time_array, self.center_array, self.palm_array = timestamps, centers, palm_sizes
+        self.timestamps = _floats(timestamps)
+        self.pinky_ys = _floats(pinky_y)
+        self.center_xs, self.center_ys = _floats(centers[:, 0]), _floats(centers[:, 1])
+        self.palm_sizes = _floats(palm_sizes)
+        # Guards that hold a state until a time passes or the hand moves -> first frame they may pass
+        self.waits = {'_click_held': self._click_held_from, '_pinch_is_drag': self._pinch_is_drag_from}
+
+    def step_frame(self, i, pose):
+        self.frame_index = i
+        self.pinky_y = self.pinky_ys[i]
+        self.palm_size = self.palm_sizes[i]
+        return self.step(pose, self.timestamps[i])
+
+    def _hand_center(self):
+        return self.center_xs[self.frame_index], self.center_ys[self.frame_index]
+
+    def wait(self, transition, i, end):
+        """
+        First frame in [i, end) on which a transition that waits (a guard whose fallback is
+        steady) may stop waiting; frames before it repeat the fallback. i if it doesn't wait.
+        """
+        if transition.guard is None or not transition.otherwise.steady:
+            return i
+        wait = self.waits.get(transition.guard.__name__)
+        return i if wait is None else wait(i, end)
+
+    def scroll_frames(self, i, end):
+        """
+        _scroll on each of frames [i, end) of a pinky run, continuous mode; returns their gesture codes.
+        The scrolls are appended to the backend log in one go (this run's event bus has no subscribers).
+        """
+        scales = self.palm_sizes[i:end] if self.hand_scale_normalisation else [1.0] * (end - i)
+        amounts = np.array(self.scroll_engine.update_run(self.pinky_ys[i:end], self.timestamps[i:end], scales))
+        scrolled = amounts != 0
+        hits = np.flatnonzero(scrolled)
+        records = np.zeros((len(hits), NullMouseBackend.RECORD_SIZE))
+        records[:, 0] = hits + i  # The backend clock is the frame index
+        records[:, 1] = ACTION_SCROLL
+        records[:, 3] = amounts[hits]
+        self.backend.log.frombytes(records.tobytes())
+
+        # Each frame shows the direction of the latest scroll so far, or the gesture the run started in
+        codes = np.where(amounts > 0, _GESTURE_CODES[GESTURE_SCROLL_DOWN_ACTION], _GESTURE_CODES[GESTURE_SCROLL_UP_ACTION])
+        last = np.maximum.accumulate(np.where(scrolled, np.arange(len(amounts)), -1))
+        gestures = codes[last].astype(np.uint8)
+        gestures[last < 0] = _GESTURE_CODES[self.current_gesture]
+        if len(hits):
+            self.current_gesture = GESTURE_SCROLL_DOWN_ACTION if amounts[hits[-1]] > 0 else GESTURE_SCROLL_UP_ACTION
+        self.frame_index = end - 1
+        self.pinky_y = self.pinky_ys[end - 1]
+        self.palm_size = self.palm_sizes[end - 1]
+        return gestures
+
+    def _first_frame_at(self, t, i, end):
+        return i + int(np.searchsorted(self.time_array[i:end], t - _WAIT_SLACK))
+
+    def _click_held_from(self, i, end):
+        held = max(self.right_click_start_time + self.gesture_hold_time,
+                   self.last_click_time + self.click_debounce_time)
+        return self._first_frame_at(held, i, end)
+
+    def _pinch_is_drag_from(self, i, end):
+        end = self._first_frame_at(self.pinch_start_time + self.tap_window, i, end)
+        x, y = self.pinch_start_center
+        moved = np.hypot(self.center_array[i:end, 0] - x, self.center_array[i:end, 1] - y)
+        if self.hand_scale_normalisation:
+            max_movement = self.tap_max_movement_ratio * self.palm_array[i:end]
+        else:
+            max_movement = self.tap_max_movement
+        over = np.flatnonzero(moved > max_movement - _WAIT_SLACK)
+        return i + int(over[0]) if len(over) else end
+
+    def _track_cursor(self, now):
+        pass
+
+
+def _floats(values):
+    """array('d') copy of a float64 array: indexing it yields Python floats without a tolist() of every frame"""
+    floats = array('d')
+    floats.frombytes(np.ascontiguousarray(values, np.float64).tobytes())
+    return floats
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Headless benchmark suite for every pipeline stage.
+
+Runs from fixtures instead of a live camera: a video clip (a recording
+passed with --video, or a generated MJPEG clip) for camera decode and
+hand tracking, and scripted landmark sequences (synthetic_landmarks) for
+everything after tracking. The generated clip has no hand in it, so
+find_hands then only times the palm detector, never the landmark model:
+pass a recording of a hand for representative tracking latency (the run
+warns when no hand was detected). Results are written as JSON and can be
+compared against a stored baseline to flag regressions.
+
+    python benchmark.py --output results.json
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --baseline benchmark_baseline.json   # exit code 1 on regressions
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Fixture clip generated when no recording is given
+FIXTURE_SIZE = (640, 480)
+FIXTURE_FRAMES = 120
+FIXTURE_FPS = 30
+
+# A result is a regression when its mean time exceeds the baseline by this fraction
+DEFAULT_TOLERANCE = 0.15
+
+
+def make_fixture_video(path, frames=FIXTURE_FRAMES, size=FIXTURE_SIZE, fps=FIXTURE_FPS):
+    """Write a deterministic MJPEG clip (textured background with a moving blob, no hand)"""
+    width, height = size
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (9, 9), 0)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not write fixture video {path}")
+    for i in range(frames):
+        image = background.copy()
+        cx = int(width * (0.3 + 0.4 * i / frames))
+        cv2.ellipse(image, (cx, height // 2), (60, 90), 0, 0, 360, (120, 160, 210), -1)
+        writer.write(image)
+    writer.release()
+    return path
+
+
+def load_frames(path, limit=None):
+    """Decode a clip into a list of BGR frames"""
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while limit is None or len(frames) < limit:
+        ok, image = capture.read()
+        if not ok:
+            break
+        frames.append(image)
+    capture.release()
+    if not frames:
+        raise RuntimeError(f"No frames could be read from {path}")
+    return frames
+
+
+def landmark_script():
+    """Scripted gesture sequence exercising move, drag, scroll, right click and idle"""
+    from synthetic_landmarks import make_sequence, POSE_MOVE, POSE_PINCH, POSE_OPEN, POSE_SCROLL, POSE_RIGHT
+    return make_sequence([
+        (POSE_MOVE, 30, 0.005, 0.002), (POSE_PINCH, 15, -0.005, 0.0), (POSE_MOVE, 10, 0.0, 0.0),
+        (POSE_SCROLL, 20, 0.0, 0.004), (POSE_RIGHT, 10, 0.0, 0.0), (POSE_OPEN, 15, 0.0, 0.0),
+        (None, 5, 0.0, 0.0),
+    ])
+
+
+def summarize(samples, items_per_sample=1):
+    """Timing statistics for a list of per-iteration durations (seconds)"""
+    samples = np.asarray(samples, dtype=np.float64)
+    total = float(samples.sum())
+    return {
+        'iterations': int(len(samples)),
+        'total_s': total,
+        'mean_ms': float(samples.mean() * 1000),
+        'p50_ms': float(np.percentile(samples, 50) * 1000),
+        'p95_ms': float(np.percentile(samples, 95) * 1000),
+        'max_ms': float(samples.max() * 1000),
+        'per_second': len(samples) * items_per_sample / total if total > 0 else 0.0,
+    }
+
+
+def timed(func, inputs, repeat=1):
+    """Time func(x) for every input, repeated; returns per-call durations"""
+    clock = time.perf_counter
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = clock()
+            func(item)
+            samples.append(clock() - start)
+    return samples
+
+
+# --- Benchmarks ---
+# Each takes the shared fixtures and a repeat count and returns summarize(...) output.
+
+def bench_camera_decode(fixtures, repeat):
+    """Read and decode every frame of the clip (per-frame time)"""
+    clock = time.perf_counter
+    samples = []
+    for _ in range(repeat):
+        capture = cv2.VideoCapture(fixtures['video'])
+        while True:
+            start = clock()
+            ok, _ = capture.read()
+            if not ok:
+                break
+            samples.append(clock() - start)
+        capture.release()
+    return summarize(samples)
+
+
+def bench_find_hands(fixtures, repeat):
+    """HandTracker.find_hands on every fixture frame, including landmark drawing"""
+    from hand_tracker import HandTracker
+    tracker = HandTracker()
+    detected = [0]
+
+    def track(image):
+        _, hands = tracker.find_hands(image)
+        if hands:
+            detected[0] += 1
+
+    try:
+        track(fixtures['frames'][0])  # Model warm-up
+        detected[0] = 0
+        result = summarize(timed(track, fixtures['frames'], repeat))
+    finally:
+        tracker.close()
+    result['detection_ratio'] = detected[0] / result['iterations']
+    return result
+
+
+def bench_landmark_conversion(fixtures, repeat):
+    """HandTracker.get_landmark_list on MediaPipe landmark messages"""
+    from hand_tracker import HandTracker
+    tracker = HandTracker.__new__(HandTracker)  # Conversion needs no model
+    messages = fixtures['landmark_messages']
+    return summarize(timed(lambda m: tracker.get_landmark_list(m, 640, 480), messages, repeat * 20))
+
+
+def _bench_recognizer(fixtures, repeat, machine=None):
+    from mouse_controller import MouseController, NullMouseBackend
+    from hand_tracker import HandTracker
+    from gesture_recognizer import GestureRecognizer
+    tracker = HandTracker.__new__(HandTracker)  # fingers_up and distances need no model
+    recognizer = GestureRecognizer(MouseController(backend=NullMouseBackend(), screen_size=(1920, 1080)), tracker)
+    if machine is not None:
+        recognizer.machine = machine.compile(GestureRecognizer, recognizer.cursor_mode)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return summarize(timed(lambda lm: recognizer.recognize(lm, 640, 480), fixtures['landmarks'], repeat * 10))
+
+
+def bench_recognize(fixtures, repeat):
+    """GestureRecognizer.recognize over the scripted gesture sequence, null mouse backend"""
+    return _bench_recognizer(fixtures, repeat)
+
+
+# Finger patterns (thumb..pinky) that the landmark script never shows
+EXTRA_GESTURE_PATTERNS = [(1, 0, 0, 0, 1), (1, 0, 0, 1, 1), (0, 1, 0, 0, 1), (0, 1, 1, 1, 0),
+                          (1, 1, 1, 0, 0), (0, 0, 1, 1, 1), (1, 0, 1, 0, 1), (0, 1, 1, 1, 1)]
+
+
+def extended_gesture_machine(patterns=EXTRA_GESTURE_PATTERNS):
+    """GESTURE_MACHINE with one extra gesture per finger pattern, at the highest pose priority"""
+    from gesture_recognizer import (GESTURE_MACHINE, GESTURE_STATES, GESTURE_GROUPS, POSE_RULES,
+                                    GESTURE_TRANSITIONS, POSE_HAND, POSE_LOST)
+    from gesture_state_machine import StateMachine, State, ANY
+    states = dict(GESTURE_STATES)
+    rules, transitions = [], []
+    for i, pattern in enumerate(patterns):
+        pose, name = GESTURE_MACHINE.poses + i, f"extra_{i}"
+        states[name] = State()
+        rules.append((pose, lambda fingers, pinch, touch, p=pattern: tuple(fingers) == p and not (pinch or touch),
+                      None))
+        transitions.append((ANY, pose, None, name, ()))
+    return StateMachine(states, GESTURE_GROUPS, rules + POSE_RULES, transitions + GESTURE_TRANSITIONS,
+                        default_pose=POSE_HAND, lost_pose=POSE_LOST,
+                        stateless_actions=GESTURE_MACHINE.stateless_actions)
+
+
+def bench_recognize_extended(fixtures, repeat):
+    """recognize with eight more gestures compiled into the state machine (should match recognize)"""
+    return _bench_recognizer(fixtures, repeat, extended_gesture_machine())
+
+
+def bench_batch_recognize(fixtures, repeat):
+    """BatchGestureEvaluator over the whole scripted sequence (per_second counts frames)"""
+    from batch_gestures import BatchGestureEvaluator
+    sequence = fixtures['landmarks']
+    landmarks = np.full((len(sequence), 21, 3), np.nan)
+    for i, lm_list in enumerate(sequence):
+        if lm_list:
+            landmarks[i] = [lm[1:4] for lm in lm_list]
+    timestamps = np.arange(len(sequence)) / 30.0
+    evaluator = BatchGestureEvaluator()
+    return summarize(timed(lambda _: evaluator.evaluate(landmarks, timestamps), range(repeat * 10)), len(sequence))
+
+
+def shape_templates():
+    """Ten DTW templates: the built-in circles (four phases each way) plus a triangle each way"""
+    from temporal_gestures import circle_templates, polygon
+    return circle_templates() + [('triangle_cw', polygon(3, True)), ('triangle_ccw', polygon(3, False))]
+
+
+def bench_temporal_gestures(fixtures, repeat):
+    """Ring buffer push plus swipe, flick and 10-template DTW matchers per frame of a circling hand"""
+    from synthetic_landmarks import make_hand, POSE_OPEN
+    from temporal_gestures import TemporalGestureEngine, default_matchers
+    # Every frame moves the hand far enough for a DTW column update (the worst case)
+    frames = [make_hand(POSE_OPEN, 0.5 + 0.1 * math.cos(i * 0.2), 0.5 + 0.1 * math.sin(i * 0.2)) for i in range(300)]
+    engine = TemporalGestureEngine(default_matchers(shape_templates()))
+    return summarize(timed(lambda i: engine.update(frames[i % len(frames)], i / 30.0), range(len(frames) * repeat)))
+
+
+def bench_smoothing(fixtures, repeat):
+    """Cursor smoothing plus pointer acceleration lookup per hand position"""
+    from mouse_controller import MouseController, NullMouseBackend
+    from hand_tracker import HandTracker
+    from gesture_recognizer import GestureRecognizer
+    from pointer_acceleration import AccelerationCurve
+    recognizer = GestureRecognizer(MouseController(backend=NullMouseBackend(), screen_size=(1920, 1080)),
+                                   HandTracker.__new__(HandTracker))
+    curve = AccelerationCurve()
+    centers = [(lm[9][1], lm[9][2]) for lm in fixtures['landmarks'] if lm]
+
+    def smooth(center):
+        x, y = recognizer._smooth_cursor_movement(*center)
+        curve.gain(abs(x - center[0]) * 30.0 + abs(y - center[1]) * 30.0)
+
+    return summarize(timed(smooth, centers, repeat * 20))
+
+
+def bench_actuation_dispatch(fixtures, repeat):
+    """Replaying each frame's buffered mouse actions onto a null backend"""
+    from mouse_controller import (MouseController, BufferedMouseBackend, NullMouseBackend,
+                                  replay_actions)
+    from hand_tracker import HandTracker
+    from gesture_recognizer import GestureRecognizer
+    buffer = BufferedMouseBackend()
+    recognizer = GestureRecognizer(MouseController(backend=buffer, screen_size=(1920, 1080)),
+                                   HandTracker.__new__(HandTracker))
+    batches = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for lm_list in fixtures['landmarks']:
+            recognizer.recognize(lm_list, 640, 480)
+            batches.append(buffer.take())
+    backend = NullMouseBackend()
+    result = summarize(timed(lambda actions: replay_actions(backend, actions), batches, repeat * 10))
+    result['actions'] = len(backend)
+    return result
+
+
+def bench_ui_overlay(fixtures, repeat):
+    """Status, hand info, latency and instruction overlays drawn on a frame"""
+    from ui_manager import UIManager
+    from latency_metrics import LatencyTracker
+    from synthetic_landmarks import make_hand, POSE_POINT
+    ui = UIManager()
+    latency = LatencyTracker()
+    for name, histogram in latency.histograms.items():
+        histogram.record(0.010)
+    lm_list = make_hand(POSE_POINT)
+    fingers = [False, True, False, False, False]
+    status = type('Status', (), {})()
+
+    def draw(image):
+        image = ui.draw_status_info(image.copy(), 30.0, "move", 0, status)
+        image = ui.draw_hand_info(image, lm_list, fingers)
+        image = ui.draw_latency(image, latency)
+        ui.show_instructions = True
+        now = ui.clock()
+        ui.start_time = now  # Keep the instructions showing (UIManager's perf_counter time base)
+        ui.draw_instructions(image, now)
+
+    return summarize(timed(draw, fixtures['frames'], repeat))
+
+
+BENCHMARKS = {
+    'camera_decode': bench_camera_decode,
+    'find_hands': bench_find_hands,
+    'landmark_conversion': bench_landmark_conversion,
+    'recognize': bench_recognize,
+    'recognize_extended': bench_recognize_extended,
+    'batch_recognize': bench_batch_recognize,
+    'temporal_gestures': bench_temporal_gestures,
+    'smoothing': bench_smoothing,
+    'actuation_dispatch': bench_actuation_dispatch,
+    'ui_overlay': bench_ui_overlay,
+}
+
+
+def load_fixtures(video=None, frames=None):
+    """
+    Video path, decoded frames, landmark sequence and MediaPipe landmark messages.
+    Without a video, one is generated in a temporary directory: call release_fixtures when done.
+    """
+    from mediapipe.framework.formats import landmark_pb2
+
+    temp_dir = None
+    if video is None:
+        temp_dir = tempfile.mkdtemp(prefix="hgc-bench-")
+        video = make_fixture_video(os.path.join(temp_dir, "fixture.avi"))
+    landmarks = landmark_script()
+    messages = []
+    for lm_list in landmarks:
+        if lm_list:
+            message = landmark_pb2.NormalizedLandmarkList()
+            for _, x, y, z in lm_list:
+                message.landmark.add(x=x, y=y, z=z)
+            messages.append(message)
+    return {
+        'video': video,
+        'frames': load_frames(video, frames),
+        'landmarks': landmarks,
+        'landmark_messages': messages,
+        'temp_dir': temp_dir,
+    }
+
+
+def release_fixtures(fixtures):
+    """Remove the generated fixture clip, if any"""
+    if fixtures.get('temp_dir'):
+        shutil.rmtree(fixtures['temp_dir'], ignore_errors=True)
+        fixtures['temp_dir'] = None
+
+
+def run_benchmarks(names=None, repeat=1, fixtures=None, log=print):
+    """Run the selected benchmarks; returns the JSON-ready results document"""
+    generated = fixtures is None
+    fixtures = fixtures or load_fixtures()
+    results = {}
+    warnings = []
+    try:
+        for name in names or BENCHMARKS:
+            if log:
+                log(f"Running {name}...")
+            results[name] = BENCHMARKS[name](fixtures, repeat)
+            if results[name].get('detection_ratio') == 0:
+                warnings.append(f"{name}: no hand detected in {os.path.basename(fixtures['video'])}, so only "
+                                f"the palm detector was timed; pass --video with a recording of a hand")
+                if log:
+                    log(f"WARNING {warnings[-1]}")
+    finally:
+        if generated:
+            release_fixtures(fixtures)
+    import mediapipe
+    return {
+        'meta': {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'mediapipe': getattr(mediapipe, '__version__', 'unknown'),
+            'fixture': os.path.basename(fixtures['video']),
+            'fixture_frames': len(fixtures['frames']),
+            'repeat': repeat,
+        },
+        'results': results,
+        'warnings': warnings,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare mean times against a baseline document.
+    Returns a list of (name, baseline_ms, current_ms, change) for regressions.
+    """
+    regressions = []
+    for name, current in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('mean_ms'):
+            continue
+        change = current['mean_ms'] / previous['mean_ms'] - 1.0
+        if change > tolerance:
+            regressions.append((name, previous['mean_ms'], current['mean_ms'], change))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print(f"\n{'benchmark':<22}{'mean ms':>10}{'p95 ms':>10}{'per s':>12}{'vs base':>10}")
+    for name, result in results['results'].items():
+        line = f"{name:<22}{result['mean_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['per_second']:>12.0f}"
+        previous = (baseline or {}).get('results', {}).get(name)
+        if previous and previous.get('mean_ms'):
+            line += f"{(result['mean_ms'] / previous['mean_ms'] - 1) * 100:>+9.1f}%"
+        print(line)
+    for warning in results.get('warnings', []):
+        print(f"WARNING {warning}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Hand Gesture Control benchmark suite')
+    parser.add_argument('--video', help='Recorded clip to use as the camera fixture')
+    parser.add_argument('--frames', type=int, default=None, help='Use at most this many frames of the clip')
+    parser.add_argument('--only', help='Comma-separated benchmarks to run: ' + ', '.join(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=1, help='Passes over the fixtures per benchmark')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--baseline', help='Compare against this results JSON and fail on regressions')
+    parser.add_argument('--save-baseline', help='Also write the results as a new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown before a result counts as a regression (fraction)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    names = args.only.split(',') if args.only else None
+    unknown = [n for n in names or [] if n not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}")
+        return 2
+
+    fixtures = load_fixtures(args.video, args.frames)
+    try:
+        results = run_benchmarks(names, args.repeat, fixtures)
+    finally:
+        release_fixtures(fixtures)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {path}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before:.3f} ms -> {after:.3f} ms ({change * 100:+.1f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance * 100:.0f}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
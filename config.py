@@ -5,26 +5,143 @@ DEFAULT_CAMERA_INDEX = 0
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
 
+# Frame pacing (headless and tray modes)
+TARGET_FPS = 0  # 0 = pace to the camera's reported frame rate
+DEFAULT_FPS = 30  # Used when the camera doesn't report a usable frame rate
+FRAME_DEADLINE_TOLERANCE = 0.25  # Lateness (fraction of a frame) before a deadline counts as missed
+
 # Hand tracking settings
 MIN_DETECTION_CONFIDENCE = 0.7
 MIN_TRACKING_CONFIDENCE = 0.5
 MAX_NUM_HANDS = 1
+MODEL_COMPLEXITY = 1  # MediaPipe hand model: 0 = lite (faster), 1 = full
 
 # Gesture recognition thresholds
-PINCH_THRESHOLD_CLICK = 0.04  # Reduced for more sensitive click detection
+PINCH_THRESHOLD_CLICK = 0.04  # Reduced for more sensitive click detection (without hand scale normalisation)
 SCROLL_PINCH_THRESHOLD = 0.07
 SCROLL_SENSITIVITY = 0.05  # Reduced for more responsive scrolling
 
+# Scroll engine: "continuous" integrates pinky movement into smooth scrolling with momentum,
+# "discrete" sends one wheel tick per SCROLL_SENSITIVITY of pinky movement
+SCROLL_MODE = "continuous"
+SCROLL_GAIN = 40.0  # Lines per unit of normalised pinky movement
+SCROLL_DEADZONE = 0.002  # Per-frame pinky movement ignored as noise
+SCROLL_MOMENTUM_FRICTION = 4.0  # Momentum decay rate (1/s), 0 disables momentum
+SCROLL_MIN_VELOCITY = 2.0  # Lines/s below which momentum stops
+SCROLL_RESOLUTION = 0.125  # Smallest scroll step in lines; whole lines where the backend can't go finer (X11, macOS)
+
 # Timing settings (in seconds)
 CLICK_DEBOUNCE_TIME = 0.5  # Increased to prevent accidental double clicks
 SCROLL_DEBOUNCE_TIME = 0.1  # Reduced for smoother scrolling
 IDLE_TIMEOUT = 0.5  # Reduced for faster state transitions
 MIN_MOVEMENT_FOR_CURSOR = 0.005  # Reduced threshold for movement detection
 
+# Tap vs drag: a pinch released within TAP_WINDOW, having moved the hand less than
+# TAP_MAX_MOVEMENT, is a left click (sent on release); otherwise it becomes a drag
+TAP_WINDOW = 0.25  # Longest pinch that still counts as a click (seconds)
+TAP_MIN_DURATION = 0.05  # Shorter pinches are tracking noise, not clicks
+TAP_MAX_MOVEMENT = 0.02  # Hand movement (normalised) that turns a pinch into a drag
+
+# Hand scale normalisation: pinch and touch distances, tap movement and pinky scroll movement are
+# measured in palm sizes (the larger of wrist to middle finger MCP and index to pinky MCP, per frame)
+# instead of frame units, so they hold at any distance from the camera. A pinch or touch starts
+# below the enter ratio and lasts until the fingertips part beyond the exit ratio, so a distance
+# hovering at the threshold doesn't flicker between poses. The defaults match the absolute settings
+# for a palm size of 0.15 (a hand at typical webcam distance). False: PINCH_THRESHOLD_CLICK,
+# TAP_MAX_MOVEMENT, SCROLL_GAIN, SCROLL_DEADZONE and SCROLL_SENSITIVITY
+HAND_SCALE_NORMALISATION = True
+PINCH_ENTER_RATIO = 0.27
+PINCH_EXIT_RATIO = 0.35
+TAP_MAX_MOVEMENT_RATIO = 0.13  # Hand movement (palm sizes) that turns a pinch into a drag
+SCROLL_GAIN_RATIO = 6.0  # Lines per palm size of pinky movement (continuous scrolling)
+SCROLL_DEADZONE_RATIO = 0.013  # Per-frame pinky movement (palm sizes) ignored as noise
+SCROLL_SENSITIVITY_RATIO = 0.33  # Pinky movement (palm sizes) per wheel tick (discrete scrolling)
+
+# Learned pose classifier (see pose_classifier.py): a model file trained on recorded sessions
+# replaces the rule-based finger states and pinch tests; None uses the rules
+POSE_CLASSIFIER = None  # e.g. "pose_model.npz"
+POSE_CLASSIFIER_MIN_CONFIDENCE = 0.6  # Less confident frames count as plain cursor movement
+
+# Temporal gestures (see temporal_gestures.py): swipes, index flicks and circles, made with an open palm
+GESTURE_HISTORY_FRAMES = 64  # Landmark frames kept for temporal matchers
+SWIPE_FRAMES = 8  # Frames a swipe is measured over (~0.25s at 30 fps)
+SWIPE_MIN_SPEED = 0.8  # Hand speed (normalised units per second)
+SWIPE_MIN_DISTANCE = 0.15  # Hand travel over SWIPE_FRAMES
+FLICK_FRAMES = 3
+FLICK_MIN_SPEED = 1.0  # Index tip speed relative to the hand
+FLICK_MIN_DISTANCE = 0.06
+SHAPE_SAMPLE_STEP = 0.015  # Hand travel between direction samples for shape matching
+SHAPE_MATCH_THRESHOLD = 0.15  # Mean direction mismatch (1 - cos) accepted by the DTW matcher
+
+# Cursor mode: "absolute" maps hand position to screen position,
+# "relative" moves the cursor by hand velocity like a mouse (make a fist to clutch)
+CURSOR_MODE = "absolute"
+RELATIVE_SMOOTHING_FACTOR = 0.3  # Lighter than absolute mode's 0.7; acceleration absorbs the noise
+POINTER_ACCEL_CURVE = [(0.0, 0.2), (0.1, 0.8), (0.5, 1.5), (1.5, 3.0)]  # (hand speed/s, gain)
+POINTER_ACCEL_MAX_SPEED = 2.0  # Hand speed covered by the lookup table
+POINTER_ACCEL_TABLE_SIZE = 256
+
+# Active region (virtual trackpad) settings
+ACTIVE_REGION_ENABLED = False
+ACTIVE_REGION = (0.2, 0.15, 0.8, 0.75)  # x_min, y_min, x_max, y_max in the mirrored camera frame
+ACTIVE_REGION_EDGE_WIDTH = 0.1  # Fraction of the region near each edge with faster cursor movement
+ACTIVE_REGION_EDGE_GAIN = 2.0  # Cursor speed in the edge bands relative to the center
+ROI_INFERENCE = True  # Only run hand tracking on the active region plus ROI_MARGIN
+ROI_MARGIN = 0.1  # Fraction of the frame added around the active region
+
+# Screen settings
+SCREEN_TARGET = "all"  # Map the hand onto "all" monitors, the "primary" one, or a monitor index
+SCREEN_GEOMETRY_CACHE = "~/.hand_gesture_control/screen_geometry.json"
+SCREEN_GEOMETRY_CACHE_MAX_AGE = 24 * 3600  # seconds before monitors are probed again
+
+# Adaptive quality: trade inference resolution, model complexity, skipped frames and
+# rendering rate for latency, moving one level at a time
+ADAPTIVE_QUALITY = True
+TARGET_LATENCY_MS = 60.0  # End-to-end (capture to actuation) latency to stay under
+QUALITY_DEGRADE_RATIO = 1.0  # Degrade when smoothed latency > target * ratio
+QUALITY_UPGRADE_RATIO = 0.6  # Upgrade when smoothed latency < target * ratio
+QUALITY_HOLD_FRAMES = 30  # Minimum frames between changes
+QUALITY_UPGRADE_HOLD_FRAMES = 150  # Minimum frames before trying a better level again
+QUALITY_LEVELS = [  # Best first
+    {'inference_scale': 1.0, 'model_complexity': 1, 'inference_skip': 1, 'render_interval': 1},
+    {'inference_scale': 0.75, 'model_complexity': 1, 'inference_skip': 1, 'render_interval': 1},
+    {'inference_scale': 0.75, 'model_complexity': 0, 'inference_skip': 1, 'render_interval': 2},
+    {'inference_scale': 0.5, 'model_complexity': 0, 'inference_skip': 1, 'render_interval': 2},
+    {'inference_scale': 0.5, 'model_complexity': 0, 'inference_skip': 2, 'render_interval': 3},
+]
+
+# Metrics endpoint (Prometheus text format on http://127.0.0.1:<port>/metrics), 0 = off
+METRICS_PORT = 0
+
+# Trace recording (Chrome trace-event JSON, toggled with 't', --trace or the tray menu)
+TRACE_BUFFER_SIZE = 4096  # Spans kept per stage; older ones are overwritten
+TRACE_DIR = "traces"
+
+# Session recording (landmarks plus gesture and mouse events, see session_recorder.py)
+SESSION_RECORDING = False  # Or record with --record
+SESSION_DIR = "sessions"
+SESSION_CHUNK_FRAMES = 256  # Frames per chunk written by the background writer
+SESSION_MAX_QUEUED_CHUNKS = 8  # Chunks waiting for the disk before new ones are dropped
+
+# Event log (see event_log.py): clicks, drags, scrolls and gestures, written off the hot loop
+EVENT_LOG_MODE = "console"  # "console", "ring" (kept in memory for crash dumps only) or "off"
+EVENT_LOG_RATE_LIMIT = 0.5  # Seconds between written repeats of the same event; the rest are counted
+EVENT_LOG_RING_SIZE = 1024  # Last events kept for crash dumps
+EVENT_LOG_QUEUE_SIZE = 4096  # Events waiting for the writer thread before new ones are dropped
+EVENT_LOG_DIR = "logs"
+
+# Gesture event bus (see gesture_events.py)
+GESTURE_EVENT_QUEUE_SIZE = 256  # Events queued per subscriber before its oldest are dropped
+
+# Landmark cache for recorded videos (see landmark_cache.py)
+LANDMARK_CACHE_DIR = "landmark_cache"
+
 # UI settings
 SHOW_INSTRUCTIONS = True
 INSTRUCTIONS_TIMEOUT = 10.0  # seconds to show instructions at startup
 FPS_DISPLAY = True
+LATENCY_DISPLAY = True  # Per-stage p50/p95/p99 overlay in the camera window
+LATENCY_LOG_INTERVAL = 30.0  # Seconds between latency summary lines (and tray tooltip updates)
 GESTURE_DISPLAY = True
 
 # Colors (BGR format for OpenCV)
@@ -0,0 +1,157 @@
+"""
+Structured, non-blocking event log for the hot loop.
+
+print() to a Windows console or a redirected pipe can block for
+milliseconds, and the recognizer and mouse controller used to print on
+every click, drag and scroll tick. They call EventLog.log(source,
+message, **fields) instead, which never blocks:
+
+  - every event is kept in a ring of the last EVENT_LOG_RING_SIZE events,
+    written out as JSON lines by dump() (main.py does so on a crash)
+  - events to be written are rate limited per (source, message): repeats
+    within EVENT_LOG_RATE_LIMIT seconds are only counted, and the count is
+    attached to the next one written
+  - written events go through an in-memory queue (a bounded deque, whose
+    appends are atomic, so logging takes no lock) to a background thread
+    that formats them and does the blocking writes
+
+Modes: "console" writes to stdout, "ring" only keeps the ring (crash dumps),
+"off" drops everything. Components log to default_log unless given their
+own; it keeps a ring until main.py switches it to config.EVENT_LOG_MODE.
+"""
+
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+import config
+
+MODES = ("console", "ring", "off")
+
+
+class EventLog:
+    def __init__(self, mode=None, ring_size=None, rate_limit=None, queue_size=None, stream=None,
+                 flush_interval=0.05, clock=time.perf_counter):
+        """
+        stream: where console mode writes (default: sys.stdout at write time).
+        flush_interval: how often the writer thread drains the queue (seconds).
+        """
+        self.ring = collections.deque(maxlen=ring_size or config.EVENT_LOG_RING_SIZE)
+        self.queue = collections.deque(maxlen=queue_size or config.EVENT_LOG_QUEUE_SIZE)
+        self.rate_limit = config.EVENT_LOG_RATE_LIMIT if rate_limit is None else rate_limit
+        self.stream = stream
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.last_written = {}  # (source, message) -> time last queued
+        self.suppressed = {}    # (source, message) -> repeats since then
+        self.dropped = 0        # Events lost to a full queue
+        self.written = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()  # Writer thread vs flush() from the caller
+        self.set_mode(mode or config.EVENT_LOG_MODE)
+
+    def set_mode(self, mode):
+        if mode not in MODES:
+            raise ValueError(f"Unknown event log mode {mode!r}; one of {', '.join(MODES)}")
+        self.mode = mode
+
+    def log(self, source, message, **fields):
+        """Record an event; never blocks"""
+        if self.mode == "off":
+            return
+        t = self.clock()
+        event = (t, source, message, fields)
+        self.ring.append(event)
+        if self.mode != "console":
+            return
+
+        key = (source, message)
+        last = self.last_written.get(key)
+        if last is not None and t - last < self.rate_limit:
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return
+        self.last_written[key] = t
+        repeated = self.suppressed.pop(key, 0)
+        if repeated:
+            event = (t, source, message, dict(fields, repeated=repeated))
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(event)
+        if self._thread is None:
+            self._start()
+
+    # --- Writer ---
+
+    def _start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Write out everything queued (called by the writer thread; safe to call from others)"""
+        with self._write_lock:
+            lines = []
+            while True:
+                try:
+                    lines.append(format_event(self.queue.popleft()))
+                except IndexError:
+                    break
+            if lines:
+                stream = self.stream or sys.stdout
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+                self.written += len(lines)
+
+    def close(self):
+        """Stop the writer thread after writing what is queued, and report suppressed repeats"""
+        for (source, message), repeated in list(self.suppressed.items()):
+            if self.mode == "console":
+                self.queue.append((self.clock(), source, message, {'repeated': repeated}))
+        self.suppressed.clear()
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    # --- Crash dumps ---
+
+    def events(self):
+        """Buffered events as dicts, oldest first"""
+        return [dict(fields, t=t, source=source, message=message) for t, source, message, fields in list(self.ring)]
+
+    def dump(self, path=None):
+        """Write the ring as JSON lines; returns the path"""
+        if path is None:
+            os.makedirs(config.EVENT_LOG_DIR, exist_ok=True)
+            path = os.path.join(config.EVENT_LOG_DIR, time.strftime("events-%Y%m%d-%H%M%S.jsonl"))
+        with open(path, "w") as f:
+            for event in self.events():
+                f.write(json.dumps(event, default=str) + "\n")
+        return path
+
+
+def format_event(event):
+    """'Source: message key=value ... (+N similar)' console line"""
+    t, source, message, fields = event
+    repeated = fields.get('repeated')
+    details = " ".join(f"{key}={_format_value(value)}" for key, value in fields.items() if key != 'repeated')
+    line = f"{source.capitalize()}: {message}" + (f" {details}" if details else "")
+    return line + (f" (+{repeated} similar)" if repeated else "")
+
+
+def _format_value(value):
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+# Shared by every component not given its own log
+default_log = EventLog(mode="ring")
@@ -0,0 +1,71 @@
+"""
+Frame pacing for the headless and tray pipelines.
+
+Replaces the fixed 10ms sleep after every frame: the capture loop is
+paced to the camera's delivered frame interval (or TARGET_FPS) using
+monotonic deadlines, so fast machines only sleep for the time that is
+actually left, and slow machines don't sleep at all. Frames that start
+later than their deadline (plus a tolerance) are counted as missed.
+"""
+
+import time
+
+import config
+
+
+class FrameScheduler:
+    def __init__(self, target_fps, tolerance=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        target_fps: frames per second to pace to.
+        tolerance: lateness allowed before a deadline counts as missed, as a fraction of the interval.
+        """
+        self.clock = clock
+        self.sleep = sleep
+        self.tolerance = config.FRAME_DEADLINE_TOLERANCE if tolerance is None else tolerance
+        self.set_fps(target_fps)
+        self.next_deadline = None
+        self.frames = 0
+        self.missed = 0
+        self.slept = 0.0
+
+    def set_fps(self, target_fps):
+        if target_fps <= 0:
+            raise ValueError(f"Invalid target FPS {target_fps}")
+        self.target_fps = target_fps
+        self.interval = 1.0 / target_fps
+
+    def wait(self):
+        """Block until the next frame is due; returns how late this frame started (seconds)"""
+        now = self.clock()
+        self.frames += 1
+        if self.next_deadline is None:
+            self.next_deadline = now + self.interval
+            return 0.0
+
+        lateness = now - self.next_deadline
+        if lateness < 0:
+            self.sleep(-lateness)
+            self.slept -= lateness
+            self.next_deadline += self.interval
+            return 0.0
+
+        if lateness > self.tolerance * self.interval:
+            self.missed += 1
+            # Resynchronise instead of rushing through a burst of catch-up frames
+            self.next_deadline = now + self.interval
+        else:
+            self.next_deadline += self.interval
+        return lateness
+
+    @property
+    def missed_ratio(self):
+        return self.missed / self.frames if self.frames else 0.0
+
+
+def pacing_fps(camera_fps):
+    """Frame rate to pace to: TARGET_FPS if set, else the camera's, else DEFAULT_FPS"""
+    if config.TARGET_FPS > 0:
+        return config.TARGET_FPS
+    if camera_fps and 1 <= camera_fps <= 240:
+        return camera_fps
+    return config.DEFAULT_FPS
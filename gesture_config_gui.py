@@ -82,7 +82,15 @@ class GestureConfigGUI:
         row += 1
         
         self.add_scale_control(parent, row, "Pinch Threshold (Click)", "PINCH_THRESHOLD_CLICK", 0.01, 0.15, 0.001, 
-                              "Lower = more sensitive click detection")
+                              "Lower = more sensitive click detection (hand scale normalisation off)")
+        row += 1
+        
+        self.add_scale_control(parent, row, "Pinch Enter Ratio", "PINCH_ENTER_RATIO", 0.1, 0.6, 0.01,
+                              "Pinch distance in palm sizes; higher = more sensitive click detection")
+        row += 1
+        
+        self.add_scale_control(parent, row, "Pinch Exit Ratio", "PINCH_EXIT_RATIO", 0.1, 0.8, 0.01,
+                              "Distance in palm sizes that ends a pinch; keep above the enter ratio")
         row += 1
         
         # Scroll Thresholds
@@ -90,7 +98,11 @@ class GestureConfigGUI:
         row += 1
         
         self.add_scale_control(parent, row, "Scroll Sensitivity", "SCROLL_SENSITIVITY", 0.01, 0.2, 0.005,
-                              "Lower = more sensitive scroll detection")
+                              "Lower = more sensitive scroll detection (hand scale normalisation off)")
+        row += 1
+        
+        self.add_scale_control(parent, row, "Scroll Sensitivity Ratio", "SCROLL_SENSITIVITY_RATIO", 0.05, 1.0, 0.01,
+                              "Pinky movement in palm sizes per scroll step; lower = more sensitive")
         row += 1
         
         self.add_scale_control(parent, row, "Scroll Pinch Threshold", "SCROLL_PINCH_THRESHOLD", 0.01, 0.15, 0.001,
@@ -115,6 +127,10 @@ class GestureConfigGUI:
         self.add_scale_control(parent, row, "Click Debounce Time (s)", "CLICK_DEBOUNCE_TIME", 0.1, 1.0, 0.05,
                               "Minimum time between clicks")
         row += 1
+
+        self.add_scale_control(parent, row, "Tap Window (s)", "TAP_WINDOW", 0.1, 0.6, 0.05,
+                              "Longest pinch that still clicks; longer pinches drag")
+        row += 1
         
         # Scroll Timing
         ttk.Label(parent, text="Scroll Timing", font=("Arial", 12, "bold")).grid(row=row, column=0, columnspan=2, sticky=tk.W, pady=(20, 10))
@@ -218,10 +234,14 @@ class GestureConfigGUI:
         """Load default configuration values"""
         defaults = {
             'PINCH_THRESHOLD_CLICK': 0.04,
+            'PINCH_ENTER_RATIO': 0.27,
+            'PINCH_EXIT_RATIO': 0.35,
             'SCROLL_SENSITIVITY': 0.05,
+            'SCROLL_SENSITIVITY_RATIO': 0.33,
             'SCROLL_PINCH_THRESHOLD': 0.07,
             'MIN_MOVEMENT_FOR_CURSOR': 0.005,
             'CLICK_DEBOUNCE_TIME': 0.5,
+            'TAP_WINDOW': 0.25,
             'SCROLL_DEBOUNCE_TIME': 0.1,
             'IDLE_TIMEOUT': 0.5,
             'CAMERA_WIDTH': 640,
@@ -0,0 +1,127 @@
+"""
+In-process bus for gesture events.
+
+GestureRecognizer publishes typed events - state changes, clicks, drags,
+scrolls and temporal gestures - to its EventBus as it recognizes them.
+Anything else (UI, logger, recorder, a remote client) subscribes instead
+of polling get_gesture_info():
+
+    subscription = recognizer.event_bus.subscribe((Click, StateChange))
+    for event in subscription.drain():
+        ...
+
+    recognizer.event_bus.subscribe(Click, callback=on_click)  # Called on the subscription's thread
+
+Publishing takes no lock: subscriptions are kept in immutable per-type
+tuples (rebuilt under a lock only when someone subscribes or
+unsubscribes), and every subscription has its own bounded deque, whose
+appends are atomic. A slow subscriber only loses its own oldest events
+(counted in dropped); recognition never waits for it.
+"""
+
+import collections
+import threading
+
+import config
+
+# Event types; t is the capture time of the frame that produced the event
+StateChange = collections.namedtuple('StateChange', 't previous gesture')
+Click = collections.namedtuple('Click', 't button')  # "left" or "right"
+DragStart = collections.namedtuple('DragStart', 't')
+DragEnd = collections.namedtuple('DragEnd', 't')
+Scroll = collections.namedtuple('Scroll', 't amount')  # Lines, positive = down
+TemporalGesture = collections.namedtuple('TemporalGesture', 't name')  # e.g. swipe_left, circle_cw
+
+EVENT_TYPES = (StateChange, Click, DragStart, DragEnd, Scroll, TemporalGesture)
+
+
+class Subscription:
+    def __init__(self, bus, types, maxsize, callback=None, poll_interval=0.005):
+        self.bus = bus
+        self.types = types
+        self.queue = collections.deque(maxlen=maxsize)
+        self.dropped = 0  # Oldest events overwritten while the queue was full
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self._closed = threading.Event()
+        self._thread = None
+        if callback is not None:
+            self._thread = threading.Thread(target=self._dispatch, name="gesture-events", daemon=True)
+            self._thread.start()
+
+    def drain(self):
+        """Queued events, oldest first (non-blocking)"""
+        events = []
+        while True:
+            try:
+                events.append(self.queue.popleft())
+            except IndexError:
+                return events
+
+    def get(self, timeout=None):
+        """Next event, waiting up to timeout seconds (None: forever); None on timeout or close"""
+        waited = 0.0
+        while True:
+            try:
+                return self.queue.popleft()
+            except IndexError:
+                pass
+            if self._closed.is_set() or (timeout is not None and waited >= timeout):
+                return None
+            # Polled: a wakeup signal would put a lock on the publishing side
+            self._closed.wait(self.poll_interval)
+            waited += self.poll_interval
+
+    def _dispatch(self):
+        while not self._closed.is_set():
+            events = self.drain()
+            for event in events:
+                self.callback(event)
+            if not events:
+                self._closed.wait(self.poll_interval)
+
+    def close(self):
+        self.bus.unsubscribe(self)
+        self._closed.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()  # Subscribe/unsubscribe only
+        self._subscriptions = ()
+        self._routes = {}  # Event type -> tuple of subscriptions
+
+    def subscribe(self, types=None, maxsize=None, callback=None):
+        """
+        types: event type or tuple of types (default: all EVENT_TYPES).
+        maxsize: events queued before the oldest are dropped (config.GESTURE_EVENT_QUEUE_SIZE).
+        callback: called with each event on a thread of the subscription's own.
+        """
+        if types is None:
+            types = EVENT_TYPES
+        elif not isinstance(types, tuple):
+            types = (types,)
+        subscription = Subscription(self, types, maxsize or config.GESTURE_EVENT_QUEUE_SIZE, callback)
+        with self._lock:
+            self._subscriptions += (subscription,)
+            self._rebuild()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+            self._rebuild()
+
+    def _rebuild(self):
+        types = set(EVENT_TYPES).union(*(s.types for s in self._subscriptions))
+        # Replaced in one assignment: publishers see the old or the new routes, never a mix
+        self._routes = {t: tuple(s for s in self._subscriptions if t in s.types) for t in types}
+
+    def publish(self, event):
+        for subscription in self._routes.get(type(event), ()):
+            queue = subscription.queue
+            if len(queue) == queue.maxlen:
+                subscription.dropped += 1
+            queue.append(event)
@@ -1,7 +1,14 @@
 import time
 import math
 import config
+from event_log import default_log
+from gesture_events import EventBus, StateChange, Click, DragStart, DragEnd, Scroll, TemporalGesture
+from latency_metrics import LatencyHistogram
 from mouse_controller import MouseController # Assuming mouse_controller.py is in the same directory
+from scroll_engine import ScrollEngine
+from gesture_state_machine import StateMachine, State, Group, ANY, STAY, feature_key
+from temporal_gestures import TemporalGestureEngine, default_matchers
+import pose_classifier
 import mediapipe as mp # For HandLandmark enum
 
 # For gesture state management
@@ -16,48 +23,186 @@ GESTURE_RIGHT_CLICK_ACTION = "right_click_action"
 GESTURE_SCROLL_READY = "scroll_ready"
 GESTURE_SCROLL_UP_ACTION = "scroll_up_action"
 GESTURE_SCROLL_DOWN_ACTION = "scroll_down_action"
+GESTURE_CLUTCH = "clutch" # Fist in relative mode: reposition hand without moving cursor
+
+CURSOR_MODE_ABSOLUTE = "absolute"
+CURSOR_MODE_RELATIVE = "relative"
+
+# Hand poses, classified once per frame by POSE_RULES
+POSE_LOST = 0   # No hand detected
+POSE_OPEN = 1   # All fingers up
+POSE_PINCH = 2  # Thumb and index tips together
+POSE_TOUCH = 3  # Index and middle tips together
+POSE_PINKY = 4  # Only pinky up
+POSE_FIST = 5   # No fingers up (relative mode)
+POSE_HAND = 6   # Any other pose
+
+# Landmark ids (mediapipe HandLandmark)
+THUMB_TIP, INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, PINKY_TIP = 4, 8, 12, 20
+WRIST, INDEX_FINGER_MCP, MIDDLE_FINGER_MCP, PINKY_MCP = 0, 5, 9, 17
+
+# (pose, guard(fingers, pinch, touch), cursor mode or None) - first match wins, safety first
+POSE_RULES = [
+    (POSE_OPEN, lambda fingers, pinch, touch: all(fingers), None),
+    (POSE_PINCH, lambda fingers, pinch, touch: pinch, None),
+    (POSE_TOUCH, lambda fingers, pinch, touch: touch, None),
+    (POSE_PINKY, lambda fingers, pinch, touch: fingers[4] and not any(fingers[1:4]), None),
+    (POSE_FIST, lambda fingers, pinch, touch: not any(fingers), CURSOR_MODE_RELATIVE),
+]
+
+# Pose names, the classes of the learned pose classifier (pose_classifier.py)
+POSE_NAMES = {POSE_OPEN: 'open', POSE_PINCH: 'pinch', POSE_TOUCH: 'touch', POSE_PINKY: 'pinky',
+              POSE_FIST: 'fist', POSE_HAND: 'hand'}
+
+SCROLL_GESTURES = (GESTURE_SCROLL_READY, GESTURE_SCROLL_UP_ACTION, GESTURE_SCROLL_DOWN_ACTION)
+
+GESTURE_STATES = {
+    GESTURE_IDLE: State(),
+    GESTURE_MOVE: State(group='cursor'),
+    GESTURE_LEFT_CLICK_READY: State(enter=('_start_pinch',), group='cursor'),  # Pinch: tap or drag undecided
+    GESTURE_LEFT_CLICK_ACTION: State(),
+    GESTURE_DRAG: State(enter=('_start_drag',), exit=('_end_drag',), group='cursor'),
+    GESTURE_RIGHT_CLICK_READY: State(enter=('_start_hold',)),
+    GESTURE_RIGHT_CLICK_ACTION: State(),
+    GESTURE_SCROLL_READY: State(group='scroll'),
+    GESTURE_SCROLL_UP_ACTION: State(group='scroll'),
+    GESTURE_SCROLL_DOWN_ACTION: State(group='scroll'),
+    GESTURE_CLUTCH: State(),
+}
+
+# Actions shared by a group run only when entering or leaving the group as a whole
+GESTURE_GROUPS = {
+    'cursor': Group(enter=('_reset_relative_cursor',)),  # Coming back from idle, clutch, scroll or clicks: don't jump
+    'scroll': Group(enter=('_start_scroll',), exit=('_end_scroll',)),  # Leaving keeps momentum coasting
+}
+
+# (from state(s) or ANY, pose, guard, target or STAY, actions) - first match wins
+GESTURE_TRANSITIONS = [
+    (ANY, POSE_LOST, None, GESTURE_IDLE, ('_stop_scroll', '_reset_cursor')),
+    # Tap vs drag: a pinch becomes a drag once it outlasts the tap window or the hand moves,
+    # and is a click when released before that
+    (GESTURE_LEFT_CLICK_READY, POSE_PINCH, '_pinch_is_drag', GESTURE_DRAG, ('_track_cursor',)),
+    (GESTURE_LEFT_CLICK_READY, POSE_PINCH, None, STAY, ()),
+    (GESTURE_LEFT_CLICK_READY, ANY, '_is_tap', GESTURE_LEFT_CLICK_ACTION, ('_tap',)),
+    (ANY, POSE_OPEN, None, GESTURE_IDLE, ('_stop_scroll',)),
+    (GESTURE_DRAG, POSE_PINCH, None, STAY, ('_track_cursor',)),
+    (ANY, POSE_PINCH, None, GESTURE_LEFT_CLICK_READY, ()),
+    (GESTURE_RIGHT_CLICK_READY, POSE_TOUCH, '_click_held', GESTURE_RIGHT_CLICK_ACTION, ('_right_click',)),
+    (GESTURE_RIGHT_CLICK_READY, POSE_TOUCH, None, STAY, ()),
+    (ANY, POSE_TOUCH, None, GESTURE_RIGHT_CLICK_READY, ()),
+    (SCROLL_GESTURES, POSE_PINKY, None, STAY, ('_scroll',)),
+    (ANY, POSE_PINKY, None, GESTURE_SCROLL_READY, ()),
+    (ANY, POSE_FIST, None, GESTURE_CLUTCH, ()),
+    (ANY, POSE_HAND, None, GESTURE_MOVE, ('_track_cursor',)),
+]
+
+# Pose a recorded gesture implies, for labelling classifier training frames (None: not a pose)
+GESTURE_POSES = {
+    GESTURE_IDLE: 'open', GESTURE_MOVE: 'hand', GESTURE_DRAG: 'pinch', GESTURE_LEFT_CLICK_READY: 'pinch',
+    GESTURE_RIGHT_CLICK_READY: 'touch', GESTURE_RIGHT_CLICK_ACTION: 'touch', GESTURE_CLUTCH: 'fist',
+    **{gesture: 'pinky' for gesture in SCROLL_GESTURES},
+}
+
+GESTURE_MACHINE = StateMachine(GESTURE_STATES, GESTURE_GROUPS, POSE_RULES, GESTURE_TRANSITIONS,
+                               default_pose=POSE_HAND, lost_pose=POSE_LOST,
+                               stateless_actions=('_track_cursor', '_reset_cursor', '_stop_scroll'))
+
+
+def classifier_poses(classes, cursor_mode):
+    """Pose of each classifier class; as in POSE_RULES, a fist is only a pose of its own in relative mode"""
+    codes = {name: pose for pose, name in POSE_NAMES.items()}
+    poses = [codes[name] for name in classes]
+    if cursor_mode != CURSOR_MODE_RELATIVE:
+        poses = [POSE_HAND if pose == POSE_FIST else pose for pose in poses]
+    return poses
+
 
 class GestureRecognizer:
-    def __init__(self, mouse_controller: MouseController, hand_tracker):
+    def __init__(self, mouse_controller: MouseController, hand_tracker, clock=time.perf_counter, event_log=None,
+                 temporal=None):
         self.mouse_controller = mouse_controller
+        self.event_log = event_log if event_log is not None else default_log
         self.hand_tracker = hand_tracker # To use its methods like calculate_distance, fingers_up
+        # Monotonic clock, same time base as frame capture timestamps; only used
+        # when recognize() isn't given a timestamp. Injectable for replay.
+        self.clock = clock
         self.mp_hands = mp.solutions.hands # For HandLandmark enum
 
         self.current_gesture = GESTURE_IDLE
-        self.last_gesture_time = time.time()
+        # Gestures, clicks, drags and scrolls as they happen, for any number of subscribers
+        self.event_bus = EventBus()
         self.last_click_time = 0
         self.last_scroll_time = 0
         
         # Smoothing for mouse movement
         self.prev_cursor_x = None
         self.prev_cursor_y = None
-        self.smoothing_factor = 0.7  # Higher = smoother but slower response
+        self.cursor_mode = config.CURSOR_MODE
+        if self.cursor_mode == CURSOR_MODE_RELATIVE:
+            # Pointer acceleration keeps slow (noisy) movement small, so less smoothing is needed
+            self.smoothing_factor = config.RELATIVE_SMOOTHING_FACTOR
+        else:
+            self.smoothing_factor = 0.7  # Higher = smoother but slower response
+        self.last_move_time = None
         
-        # Gesture state tracking
-        self.gesture_start_time = time.time()
+        # Gesture state machine, compiled once per cursor mode
+        self.machine = GESTURE_MACHINE.compile(type(self), self.cursor_mode)
+        # Learned pose classifier in place of the finger-state rules (optional)
+        self.pose_classifier = None
+        self.classifier_poses = None
+        self.classifier_min_confidence = config.POSE_CLASSIFIER_MIN_CONFIDENCE
+        if config.POSE_CLASSIFIER:
+            self.set_pose_classifier(pose_classifier.load(config.POSE_CLASSIFIER))
         self.gesture_hold_time = 0.1  # Time to hold gesture before action
-        
-        # Click state tracking
-        self.left_click_prepared = False
-        self.right_click_prepared = False
-        self.left_click_start_time = 0
         self.right_click_start_time = 0
-        
-        # Drag state tracking
-        self.is_dragging = False
-        self.drag_start_time = 0
+        self.pinch_start_time = 0
+        self.pinch_start_center = None
+        # Pinch-to-decision time of taps (click sent) and drags (button pressed)
+        self.decision_latency = {'tap': LatencyHistogram(), 'drag': LatencyHistogram()}
+
+        # Current frame, for the state machine actions
+        self.lm_list = None
+        self.frame_size = None
+        self.pinky_y = None
+        self.palm_size = None
+        # Pinch and touch of the previous frame (hysteresis of the normalised thresholds)
+        self.pinching = False
+        self.touching = False
 
         # Load thresholds from config
         self.pinch_threshold_click = config.PINCH_THRESHOLD_CLICK
         self.scroll_pinch_threshold = config.SCROLL_PINCH_THRESHOLD
         self.scroll_sensitivity = config.SCROLL_SENSITIVITY
         self.click_debounce_time = config.CLICK_DEBOUNCE_TIME
+        self.tap_window = config.TAP_WINDOW
+        self.tap_min_duration = config.TAP_MIN_DURATION
+        self.tap_max_movement = config.TAP_MAX_MOVEMENT
+        self.hand_scale_normalisation = config.HAND_SCALE_NORMALISATION
+        self.pinch_enter_ratio = config.PINCH_ENTER_RATIO
+        self.pinch_exit_ratio = config.PINCH_EXIT_RATIO
+        self.tap_max_movement_ratio = config.TAP_MAX_MOVEMENT_RATIO
+        self.scroll_sensitivity_ratio = config.SCROLL_SENSITIVITY_RATIO
         self.scroll_debounce_time = config.SCROLL_DEBOUNCE_TIME
         self.idle_timeout = config.IDLE_TIMEOUT
 
         # Scroll gesture parameters
         self.scroll_ref_y = None # Y-coordinate of pinky base when scroll gesture starts
-        self.in_scroll_mode = False
+        self.scroll_engine = None
+        if config.SCROLL_MODE == "continuous":
+            # With hand scale normalisation, pinky movement reaches the engine in palm sizes
+            units = ({'gain': config.SCROLL_GAIN_RATIO, 'deadzone': config.SCROLL_DEADZONE_RATIO}
+                     if self.hand_scale_normalisation else {})
+            self.scroll_engine = ScrollEngine(backend_resolution=mouse_controller.scroll_resolution, **units)
+
+        # Swipes, flicks and circles: matched on the landmark history every frame,
+        # reported only while the palm is open (other poses move the cursor or scroll)
+        self.temporal = temporal if temporal is not None else TemporalGestureEngine(default_matchers())
+        self.temporal_events = ()  # Temporal gestures completed on the latest frame
+
+    def set_pose_classifier(self, model):
+        """Classify poses with a pose_classifier model, or with the rules again when None"""
+        self.pose_classifier = model
+        self.classifier_poses = classifier_poses(model.classes, self.cursor_mode) if model is not None else None
 
     def _calculate_hand_center(self, lm_list):
         if not lm_list or len(lm_list) < 21:
@@ -85,202 +230,242 @@ class GestureRecognizer:
         
         return smooth_x, smooth_y
     
-    def _is_gesture_stable(self, current_time, required_hold_time=None):
-        """Check if current gesture has been held long enough to be considered stable"""
-        if required_hold_time is None:
-            required_hold_time = self.gesture_hold_time
-        return (current_time - self.gesture_start_time) >= required_hold_time
+    def _move_cursor(self, hand_center_x, hand_center_y, now, frame_width, frame_height):
+        """Smooth the hand center and move the cursor in the configured cursor mode"""
+        if self.cursor_mode == CURSOR_MODE_RELATIVE:
+            prev_x, prev_y = self.prev_cursor_x, self.prev_cursor_y
+            smooth_x, smooth_y = self._smooth_cursor_movement(hand_center_x, hand_center_y)
+            if prev_x is not None and self.last_move_time is not None:
+                self.mouse_controller.move_mouse_relative(
+                    smooth_x - prev_x, smooth_y - prev_y, now - self.last_move_time)
+            self.last_move_time = now
+        else:
+            smooth_x, smooth_y = self._smooth_cursor_movement(hand_center_x, hand_center_y)
+            self.mouse_controller.move_mouse(smooth_x, smooth_y, frame_width, frame_height)
+
+    # --- State machine actions and guards (see GESTURE_TRANSITIONS) ---
+
+    def _hand_center(self):
+        return self._calculate_hand_center(self.lm_list)
+
+    def _track_cursor(self, now):
+        hand_center_x, hand_center_y = self._hand_center()
+        if hand_center_x is not None:
+            self._move_cursor(hand_center_x, hand_center_y, now, *self.frame_size)
+
+    def _reset_cursor(self, now):
+        self.prev_cursor_x = None
+        self.prev_cursor_y = None
+
+    def _reset_relative_cursor(self, now):
+        if self.cursor_mode == CURSOR_MODE_RELATIVE:
+            self._reset_cursor(now)
+
+    def _start_pinch(self, now):
+        self.pinch_start_time = now
+        self.pinch_start_center = self._hand_center()
+
+    def _movement_scale(self):
+        """Unit hand movement is measured in: the palm size with hand scale normalisation, else frame units"""
+        return self.palm_size if self.hand_scale_normalisation else 1.0
+
+    def _pinch_is_drag(self, now):
+        if now - self.pinch_start_time > self.tap_window:
+            return True
+        x, y = self._hand_center()
+        if self.hand_scale_normalisation:
+            max_movement = self.tap_max_movement_ratio * self.palm_size
+        else:
+            max_movement = self.tap_max_movement
+        return math.hypot(x - self.pinch_start_center[0], y - self.pinch_start_center[1]) > max_movement
+
+    def _is_tap(self, now):
+        return (now - self.pinch_start_time >= self.tap_min_duration and
+                now - self.last_click_time > self.click_debounce_time)
 
-    def recognize(self, lm_list, frame_width, frame_height):
+    def _tap(self, now):
+        self.mouse_controller.left_click()
+        self.last_click_time = now
+        self.decision_latency['tap'].record(now - self.pinch_start_time)
+        self.event_bus.publish(Click(now, "left"))
+        self.event_log.log("gesture", "left click")
+
+    def _start_drag(self, now):
+        self.mouse_controller.press_left_click()
+        self.decision_latency['drag'].record(now - self.pinch_start_time)
+        self.event_bus.publish(DragStart(now))
+        self.event_log.log("gesture", "drag started")
+
+    def _end_drag(self, now):
+        self.mouse_controller.release_left_click()
+        self.event_bus.publish(DragEnd(now))
+        self.event_log.log("gesture", "drag released")
+
+    def _start_hold(self, now):
+        self.right_click_start_time = now
+        self.event_log.log("gesture", "right click ready")
+
+    def _click_held(self, now):
+        return (now - self.right_click_start_time > self.gesture_hold_time and
+                now - self.last_click_time > self.click_debounce_time)
+
+    def _right_click(self, now):
+        self.mouse_controller.right_click()
+        self.last_click_time = now
+        self.event_bus.publish(Click(now, "right"))
+        self.event_log.log("gesture", "right click")
+
+    def _start_scroll(self, now):
+        self.scroll_ref_y = self.pinky_y
+        if self.scroll_engine is not None:
+            self.scroll_engine.start(self.pinky_y, now)
+        self.event_log.log("gesture", "scroll mode", ref_y=self.scroll_ref_y)
+
+    def _scroll(self, now):
+        if self.scroll_engine is not None:
+            # Continuous scrolling: integrate pinky movement every frame
+            amount = self.scroll_engine.update(self.pinky_y, now, self._movement_scale())
+            if amount:
+                self.mouse_controller.scroll(amount)
+                self.event_bus.publish(Scroll(now, amount))
+                self.current_gesture = GESTURE_SCROLL_DOWN_ACTION if amount > 0 else GESTURE_SCROLL_UP_ACTION
+            return
+        delta_y = self.pinky_y - self.scroll_ref_y
+        if self.hand_scale_normalisation:
+            sensitivity = self.scroll_sensitivity_ratio * self.palm_size
+        else:
+            sensitivity = self.scroll_sensitivity
+        if abs(delta_y) > sensitivity and now - self.last_scroll_time > self.scroll_debounce_time:
+            if delta_y > 0:  # Pinky moved down -> scroll down
+                self.mouse_controller.scroll(1)
+                self.event_bus.publish(Scroll(now, 1))
+                self.current_gesture = GESTURE_SCROLL_DOWN_ACTION
+            else:  # Pinky moved up -> scroll up
+                self.mouse_controller.scroll(-1)
+                self.event_bus.publish(Scroll(now, -1))
+                self.current_gesture = GESTURE_SCROLL_UP_ACTION
+            self.scroll_ref_y = self.pinky_y  # Update reference
+            self.last_scroll_time = now
+
+    def _end_scroll(self, now):
+        """Leave scroll mode; the continuous engine keeps coasting with momentum"""
+        if self.scroll_engine is not None:
+            self.scroll_engine.release(now)
+
+    def _stop_scroll(self, now):
+        if self.scroll_engine is not None:
+            self.scroll_engine.stop()
+
+    # --- Per-frame dispatch ---
+
+    def step(self, pose, now):
+        """Advance the state machine by one frame already classified into a pose"""
+        # Momentum scrolling continues while other gestures are recognized
+        if pose != POSE_LOST and self.scroll_engine is not None and self.scroll_engine.coasting:
+            amount = self.scroll_engine.coast(now)
+            if amount:
+                self.mouse_controller.scroll(amount)
+                self.event_bus.publish(Scroll(now, amount))
+
+        previous = self.current_gesture
+        transition = self.machine.transitions[previous][pose]
+        while transition.guard is not None and not transition.guard(self, now):
+            transition = transition.otherwise
+        for action in transition.actions:
+            action(self, now)
+        if transition.target is not STAY:
+            self.current_gesture = transition.target
+        if self.current_gesture != previous:
+            self.event_bus.publish(StateChange(now, previous, self.current_gesture))
+        return self.current_gesture
+
+    def recognize(self, lm_list, frame_width, frame_height, timestamp=None):
         """
         Recognizes gestures from hand landmarks and controls the mouse.
         Uses whole hand position for movement instead of just index finger.
         lm_list: List of landmark coordinates [id, x, y, z].
         frame_width, frame_height: Dimensions of the camera frame.
+        timestamp: Monotonic capture time of the frame (seconds). All hold times,
+                   debounces and click windows are measured with it, so timing
+                   doesn't depend on processing delays. Defaults to the clock.
         """
+        now = self.clock() if timestamp is None else timestamp
+        events = self.temporal.update(lm_list, now)
         if not lm_list or len(lm_list) < 21:
             # No hand detected or insufficient landmarks
-            if self.is_dragging:
-                # Release drag if hand disappears
-                self.mouse_controller.release_left_click()
-                self.is_dragging = False
-                print("Drag released - hand lost")
-            if self.current_gesture != GESTURE_IDLE:
-                self.current_gesture = GESTURE_IDLE
-                self.in_scroll_mode = False
-                # Reset smoothing when hand disappears
-                self.prev_cursor_x = None
-                self.prev_cursor_y = None
-            return self.current_gesture
-
-        fingers = self.hand_tracker.fingers_up(lm_list)
-        now = time.time()
-        
-        # Calculate distances for pinch gestures
-        dist_thumb_index = self.hand_tracker.calculate_distance(
-            lm_list, 
-            self.mp_hands.HandLandmark.THUMB_TIP, 
-            self.mp_hands.HandLandmark.INDEX_FINGER_TIP
-        )
-        dist_index_middle = self.hand_tracker.calculate_distance(
-            lm_list, 
-            self.mp_hands.HandLandmark.INDEX_FINGER_TIP, 
-            self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP
-        )
-        
-        # Get hand center for movement (using wrist and middle finger MCP)
-        hand_center_x, hand_center_y = self._calculate_hand_center(lm_list)
-        
-        # --- Gesture Priority Logic ---
-        
-        # 1. IDLE STATE: All fingers up (open palm) - highest priority for safety
-        if all(fingers):
-            if self.is_dragging:
-                self.mouse_controller.release_left_click()
-                self.is_dragging = False
-                print("Drag released - open palm")
-            if self.current_gesture != GESTURE_IDLE:
-                self.current_gesture = GESTURE_IDLE
-                self.in_scroll_mode = False
-                print("Gesture: IDLE (Open Palm)")
-            return self.current_gesture
-        
-        # 2. DRAG MODE: Thumb and index pinch while moving hand
-        if dist_thumb_index < self.pinch_threshold_click:
-            if not self.is_dragging:
-                # Start dragging
-                self.mouse_controller.press_left_click()
-                self.is_dragging = True
-                self.drag_start_time = now
-                self.current_gesture = GESTURE_DRAG
-                print(f"Gesture: DRAG STARTED (Distance: {dist_thumb_index:.3f})")
-            
-            # Continue dragging - move mouse based on hand center
-            if hand_center_x is not None and hand_center_y is not None:
-                # Apply smoothing
-                smooth_x, smooth_y = self._smooth_cursor_movement(hand_center_x, hand_center_y)
-                # Move mouse with smoothed coordinates
-                self.mouse_controller.move_mouse(smooth_x, smooth_y, frame_width, frame_height)
-                self.current_gesture = GESTURE_DRAG
-                
-            return self.current_gesture
-        else:
-            # Release drag if pinch is released
-            if self.is_dragging:
-                self.mouse_controller.release_left_click()
-                self.is_dragging = False
-                print("Gesture: DRAG RELEASED")
-        
-        # 3. LEFT CLICK: Quick thumb and index pinch (if not dragging)
-        if (dist_thumb_index < self.pinch_threshold_click and 
-            not self.is_dragging):
-            if not self.left_click_prepared:
-                self.left_click_prepared = True
-                self.left_click_start_time = now
-                self.current_gesture = GESTURE_LEFT_CLICK_READY
-                print(f"Gesture: Left Click Ready (Distance: {dist_thumb_index:.3f})")
-            elif (now - self.left_click_start_time > 0.05 and  # Shorter hold time for quick clicks
-                  now - self.left_click_start_time < 0.3 and   # But not too long (that becomes drag)
-                  now - self.last_click_time > self.click_debounce_time):
-                self.mouse_controller.left_click()
-                self.last_click_time = now
-                self.current_gesture = GESTURE_LEFT_CLICK_ACTION
-                self.left_click_prepared = False
-                print(f"Gesture: LEFT CLICK EXECUTED")
-            return self.current_gesture
-        else:
-            self.left_click_prepared = False
-        
-        # 4. RIGHT CLICK: Index and middle finger touch
-        if dist_index_middle < self.pinch_threshold_click:
-            if not self.right_click_prepared:
-                self.right_click_prepared = True
-                self.right_click_start_time = now
-                self.current_gesture = GESTURE_RIGHT_CLICK_READY
-                print(f"Gesture: Right Click Ready (Distance: {dist_index_middle:.3f})")
-            elif (now - self.right_click_start_time > self.gesture_hold_time and 
-                  now - self.last_click_time > self.click_debounce_time):
-                self.mouse_controller.right_click()
-                self.last_click_time = now
-                self.current_gesture = GESTURE_RIGHT_CLICK_ACTION
-                self.right_click_prepared = False
-                print(f"Gesture: RIGHT CLICK EXECUTED")
-            return self.current_gesture
+            self.temporal_events = ()
+            self.pinching = self.touching = False
+            return self.step(POSE_LOST, now)
+
+        self.lm_list = lm_list
+        self.frame_size = (frame_width, frame_height)
+        self.pinky_y = lm_list[PINKY_TIP][2]
+        distance = self.hand_tracker.calculate_distance
+        if self.hand_scale_normalisation:
+            self.palm_size = max(distance(lm_list, WRIST, MIDDLE_FINGER_MCP), distance(lm_list, INDEX_FINGER_MCP, PINKY_MCP))
+        if self.pose_classifier is not None:
+            index, confidence = pose_classifier.predict_one(self.pose_classifier, lm_list)
+            # Unsure: plain cursor movement rather than a click or drag
+            pose = self.classifier_poses[index] if confidence >= self.classifier_min_confidence else POSE_HAND
         else:
-            self.right_click_prepared = False
-        
-        # 5. SCROLL MODE: Only pinky up, all others down
-        if (fingers[4] and not fingers[1] and not fingers[2] and not fingers[3]):
-            if not self.in_scroll_mode:
-                self.in_scroll_mode = True
-                self.scroll_ref_y = lm_list[self.mp_hands.HandLandmark.PINKY_TIP][2]
-                self.current_gesture = GESTURE_SCROLL_READY
-                print(f"Gesture: Scroll Mode Activated (Ref Y: {self.scroll_ref_y:.3f})")
+            pinch_distance = distance(lm_list, THUMB_TIP, INDEX_FINGER_TIP)
+            touch_distance = distance(lm_list, INDEX_FINGER_TIP, MIDDLE_FINGER_TIP)
+            if self.hand_scale_normalisation:
+                # Held until the fingertips part beyond the exit ratio
+                palm = self.palm_size
+                self.pinching = pinch_distance < (self.pinch_exit_ratio if self.pinching else self.pinch_enter_ratio) * palm
+                self.touching = touch_distance < (self.pinch_exit_ratio if self.touching else self.pinch_enter_ratio) * palm
             else:
-                # We're in scroll mode, check for movement
-                current_pinky_y = lm_list[self.mp_hands.HandLandmark.PINKY_TIP][2]
-                delta_y = current_pinky_y - self.scroll_ref_y
-                
-                if (abs(delta_y) > self.scroll_sensitivity and 
-                    now - self.last_scroll_time > self.scroll_debounce_time):
-                    
-                    if delta_y > 0:  # Pinky moved down -> scroll down
-                        self.mouse_controller.scroll(1)
-                        self.current_gesture = GESTURE_SCROLL_DOWN_ACTION
-                        print(f"Gesture: SCROLL DOWN (Delta: {delta_y:.3f})")
-                    else:  # Pinky moved up -> scroll up
-                        self.mouse_controller.scroll(-1)
-                        self.current_gesture = GESTURE_SCROLL_UP_ACTION
-                        print(f"Gesture: SCROLL UP (Delta: {delta_y:.3f})")
-                    
-                    self.scroll_ref_y = current_pinky_y  # Update reference
-                    self.last_scroll_time = now
-            return self.current_gesture
-        else:
-            self.in_scroll_mode = False
-        
-        # 6. MOUSE MOVEMENT: Default movement using hand center
-        if hand_center_x is not None and hand_center_y is not None:
-            # Apply smoothing
-            smooth_x, smooth_y = self._smooth_cursor_movement(hand_center_x, hand_center_y)
-            
-            # Move mouse with smoothed coordinates
-            self.mouse_controller.move_mouse(smooth_x, smooth_y, frame_width, frame_height)
-            self.current_gesture = GESTURE_MOVE
-            # Uncomment for debugging: print(f"Gesture: MOVE (Smooth: {smooth_x:.3f}, {smooth_y:.3f})")
-            return self.current_gesture
-        
-        # 7. DEFAULT: If no specific gesture detected, remain in current state or go idle
-        if self.current_gesture not in [GESTURE_IDLE, GESTURE_MOVE]:
-            self.current_gesture = GESTURE_IDLE
-            print("Gesture: Transitioning to IDLE")
-        
-        self.last_gesture_time = now
-        return self.current_gesture
+                self.pinching = pinch_distance < self.pinch_threshold_click
+                self.touching = touch_distance < self.pinch_threshold_click
+            key = feature_key(self.hand_tracker.fingers_up(lm_list), self.pinching, self.touching)
+            pose = self.machine.pose_table[key]
+        gesture = self.step(pose, now)
+        self.temporal_events = events if gesture == GESTURE_IDLE else ()
+        for event in self.temporal_events:
+            self.event_bus.publish(TemporalGesture(now, event))
+            self.event_log.log("gesture", event)
+        return gesture
+
+    @property
+    def is_dragging(self):
+        return self.current_gesture == GESTURE_DRAG
+
+    @property
+    def in_scroll_mode(self):
+        return self.current_gesture in SCROLL_GESTURES
 
     def get_gesture_info(self):
-        """Get current gesture information for UI display"""
+        """Current gesture information for UI display (subscribe to event_bus to hear about changes)"""
         return {
             'current_gesture': self.current_gesture,
-            'left_click_prepared': self.left_click_prepared,
-            'right_click_prepared': self.right_click_prepared,
+            'left_click_prepared': self.current_gesture == GESTURE_LEFT_CLICK_READY,
+            'right_click_prepared': self.current_gesture == GESTURE_RIGHT_CLICK_READY,
             'in_scroll_mode': self.in_scroll_mode,
             'is_dragging': self.is_dragging,
-            'smoothing_factor': self.smoothing_factor
+            'temporal_events': self.temporal_events,
+            'smoothing_factor': self.smoothing_factor,
+            'scroll_lines_per_second': self.scroll_engine.lines_per_second if self.scroll_engine else 0.0
         }
     
     def reset_gesture_state(self):
         """Reset all gesture states - useful for recalibration"""
+        now = self.clock()
+        previous = self.current_gesture
         if self.is_dragging:
             self.mouse_controller.release_left_click()
+            self.event_bus.publish(DragEnd(now))
         self.current_gesture = GESTURE_IDLE
-        self.left_click_prepared = False
-        self.right_click_prepared = False
-        self.in_scroll_mode = False
-        self.is_dragging = False
+        if previous != GESTURE_IDLE:
+            self.event_bus.publish(StateChange(now, previous, GESTURE_IDLE))
+        if self.scroll_engine is not None:
+            self.scroll_engine.stop()
         self.prev_cursor_x = None
         self.prev_cursor_y = None
-        print("Gesture state reset to IDLE")
+        self.pinching = self.touching = False
+        self.temporal.reset()
+        self.temporal_events = ()
+        self.event_log.log("gesture", "state reset")
 
 if __name__ == '__main__':
     # This class is tightly coupled with HandTracker and MouseController,
@@ -0,0 +1,135 @@
+"""
+Declarative state machine compiled into lookup tables.
+
+A machine is described by plain tables (see gesture_recognizer.py):
+
+  pose rules   (pose, guard(fingers, pinch, touch), cursor mode) in priority
+               order: what the hand is doing in a frame, from its features
+  states       State(enter, exit, group) per state name; groups add shared
+               enter/exit actions that don't fire for moves inside the group
+  transitions  (from state(s) or ANY, pose or ANY, guard, target or STAY,
+               actions), first match wins; a failing guard falls through to
+               the next matching row
+
+compile() resolves all of this once. Every combination of the boolean
+frame features (five finger states plus the two pinch tests) is classified
+into a pose in advance, and every (state, pose) pair gets its Transition
+with the exit and enter actions folded in. Per frame that leaves a feature
+key and two indexed lookups, however many gestures the tables define.
+
+Actions and guards are method names on the class that runs the machine;
+each is called as method(self, now).
+"""
+
+ANY = None   # Transition row matches every state (or every pose)
+STAY = None  # Transition target: keep the current state
+
+FEATURE_KEYS = 1 << 7  # Five finger bits, pinch bit, touch bit
+
+
+def feature_key(fingers, pinch, touch):
+    """Pack the per-frame boolean features into a pose table index"""
+    return (fingers[0] | fingers[1] << 1 | fingers[2] << 2 | fingers[3] << 3 | fingers[4] << 4 |
+            pinch << 5 | touch << 6)
+
+
+class State:
+    def __init__(self, enter=(), exit=(), group=None):
+        self.enter = tuple(enter)
+        self.exit = tuple(exit)
+        self.group = group
+
+
+class Group:
+    def __init__(self, enter=(), exit=()):
+        self.enter = tuple(enter)
+        self.exit = tuple(exit)
+
+
+class Transition:
+    """Resolved transition for one (state, pose) pair"""
+    __slots__ = ('target', 'actions', 'guard', 'otherwise', 'steady')
+
+    def __init__(self, target, actions, guard=None, otherwise=None, steady=False):
+        self.target = target        # New state, or STAY
+        self.actions = actions      # Unbound methods, called in order
+        self.guard = guard          # Unbound method; when it fails, otherwise applies
+        self.otherwise = otherwise
+        self.steady = steady        # Repeating it on the same pose changes no state
+
+
+class CompiledMachine:
+    def __init__(self, pose_table, transitions):
+        self.pose_table = pose_table    # Feature key -> pose
+        self.transitions = transitions  # State -> list of Transition indexed by pose
+
+
+class StateMachine:
+    def __init__(self, states, groups, pose_rules, transitions, default_pose, lost_pose, stateless_actions=()):
+        """
+        default_pose: pose of frames no rule matches.
+        lost_pose: pose of frames without a hand (never produced by the rules).
+        stateless_actions: actions that only touch the cursor, so a transition
+                           made only of these can be skipped by offline evaluators.
+        """
+        self.states = states
+        self.groups = groups
+        self.pose_rules = pose_rules
+        self.transitions = transitions
+        self.default_pose = default_pose
+        self.lost_pose = lost_pose
+        self.stateless_actions = frozenset(stateless_actions)
+        self.poses = max([default_pose, lost_pose] + [rule[0] for rule in pose_rules]) + 1
+        self._compiled = {}
+
+    def compile(self, cls, cursor_mode):
+        """Lookup tables for running the machine on instances of cls (cached)"""
+        key = (cls, cursor_mode)
+        if key not in self._compiled:
+            self._compiled[key] = CompiledMachine(self._compile_poses(cursor_mode),
+                                                  self._compile_transitions(cls))
+        return self._compiled[key]
+
+    def _compile_poses(self, cursor_mode):
+        rules = [(pose, guard) for pose, guard, mode in self.pose_rules if mode is None or mode == cursor_mode]
+        table = []
+        for key in range(FEATURE_KEYS):
+            fingers = [bool(key >> bit & 1) for bit in range(5)]
+            pinch, touch = bool(key >> 5 & 1), bool(key >> 6 & 1)
+            table.append(next((pose for pose, guard in rules if guard(fingers, pinch, touch)), self.default_pose))
+        return table
+
+    def _compile_transitions(self, cls):
+        table = {}
+        for state in self.states:
+            table[state] = [self._resolve(cls, state, pose, 0) for pose in range(self.poses)]
+        return table
+
+    def _resolve(self, cls, state, pose, start):
+        for row in range(start, len(self.transitions)):
+            sources, row_pose, guard, target, actions = self.transitions[row]
+            if row_pose is not ANY and row_pose != pose:
+                continue
+            if not (sources is ANY or state == sources or (isinstance(sources, tuple) and state in sources)):
+                continue
+            names = self._exit_enter(state, target) + tuple(actions)
+            steady = target in (STAY, state) and guard is None and self.stateless_actions.issuperset(names)
+            return Transition(target if target != state else STAY,
+                              tuple(getattr(cls, name) for name in names),
+                              getattr(cls, guard) if guard else None,
+                              self._resolve(cls, state, pose, row + 1) if guard else None,
+                              steady)
+        raise ValueError(f"No transition from state {state!r} on pose {pose}")
+
+    def _exit_enter(self, state, target):
+        """Exit and enter actions of a state change, group actions only when the group changes"""
+        if target is STAY or target == state:
+            return ()
+        old, new = self.states[state], self.states[target]
+        names = old.exit
+        if old.group != new.group:
+            if old.group:
+                names += self.groups[old.group].exit
+            if new.group:
+                names += self.groups[new.group].enter
+        return names + new.enter
@@ -4,20 +4,57 @@ import math
 import config
 
 class HandTracker:
-    def __init__(self, max_hands=None, min_detection_confidence=None, min_tracking_confidence=None):
+    def __init__(self, max_hands=None, min_detection_confidence=None, min_tracking_confidence=None,
+                 model_complexity=None):
         # Use config values as defaults
         max_hands = max_hands or config.MAX_NUM_HANDS
         min_detection_confidence = min_detection_confidence or config.MIN_DETECTION_CONFIDENCE
         min_tracking_confidence = min_tracking_confidence or config.MIN_TRACKING_CONFIDENCE
+        model_complexity = config.MODEL_COMPLEXITY if model_complexity is None else model_complexity
+        self.hands_options = {
+            'max_num_hands': max_hands,
+            'min_detection_confidence': min_detection_confidence,
+            'min_tracking_confidence': min_tracking_confidence,
+        }
         
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=max_hands,
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence)
+        self.model_complexity = model_complexity
+        self.hands = self.mp_hands.Hands(model_complexity=model_complexity, **self.hands_options)
+        self.pending_model_complexity = None
+        self.inference_scale = 1.0  # Frames are downscaled by this factor before inference
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         self.results = None
+        self.roi = None  # (x_min, y_min, x_max, y_max) of the mirrored frame, None = whole frame
+
+    def set_roi(self, roi):
+        """
+        Restrict hand detection and tracking to a normalised rectangle of the
+        mirrored frame (e.g. ActiveRegion.roi()). Pass None for the whole frame.
+        Landmarks are still reported in whole-frame coordinates.
+        """
+        if roi is not None and tuple(roi) == (0.0, 0.0, 1.0, 1.0):
+            roi = None
+        self.roi = tuple(roi) if roi is not None else None
+
+    def set_quality(self, inference_scale=None, model_complexity=None):
+        """
+        Change inference cost. Safe to call from another thread: a new
+        model complexity is applied by the next find_hands call.
+        """
+        if inference_scale is not None:
+            self.inference_scale = inference_scale
+        if model_complexity is not None and model_complexity != self.model_complexity:
+            self.pending_model_complexity = model_complexity
+
+    def _apply_pending_model(self):
+        complexity = self.pending_model_complexity
+        self.pending_model_complexity = None
+        if complexity is None or complexity == self.model_complexity:
+            return
+        self.hands.close()
+        self.hands = self.mp_hands.Hands(model_complexity=complexity, **self.hands_options)
+        self.model_complexity = complexity
 
     def find_hands(self, image, draw=True):
         """
@@ -26,18 +63,35 @@ class HandTracker:
         draw: Whether to draw landmarks on the image.
         Returns the image (with or without drawings) and hand landmarks.
         """
-        # Flip the image horizontally for a later selfie-view display,
-        # and convert the BGR image to RGB.
-        img_rgb = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
-        
+        if self.pending_model_complexity is not None:
+            self._apply_pending_model()
+
+        # Flip the image horizontally for a later selfie-view display.
+        # The flipped BGR image is also what we draw on.
+        output_image = cv2.flip(image, 1)
+
+        # Only convert and process the region of interest, if one is set
+        if self.roi is not None:
+            h, w = output_image.shape[:2]
+            x0, y0 = int(self.roi[0] * w), int(self.roi[1] * h)
+            x1, y1 = int(self.roi[2] * w), int(self.roi[3] * h)
+            inference_image = output_image[y0:y1, x0:x1]
+        else:
+            inference_image = output_image
+
+        # Landmarks are normalised, so a downscaled frame needs no conversion afterwards
+        if self.inference_scale < 1.0:
+            inference_image = cv2.resize(inference_image, None, fx=self.inference_scale, fy=self.inference_scale,
+                                         interpolation=cv2.INTER_AREA)
+        img_rgb = cv2.cvtColor(inference_image, cv2.COLOR_BGR2RGB)
+
         # To improve performance, optionally mark the image as not writeable to
         # pass by reference.
         img_rgb.flags.writeable = False
         self.results = self.hands.process(img_rgb)
 
-        # Prepare image for drawing (convert back to BGR if it was RGB)
-        # The input image to this function is BGR, so we use the flipped one for drawing
-        output_image = cv2.flip(image, 1) # Use the flipped BGR for drawing
+        if self.roi is not None and self.results.multi_hand_landmarks:
+            self._roi_to_frame(self.results.multi_hand_landmarks, x0 / w, y0 / h, (x1 - x0) / w, (y1 - y0) / h)
 
         if self.results.multi_hand_landmarks and draw:
             for hand_landmarks in self.results.multi_hand_landmarks:
@@ -49,6 +103,14 @@ class HandTracker:
                     self.mp_drawing_styles.get_default_hand_connections_style())
         return output_image, self.results.multi_hand_landmarks
 
+    def _roi_to_frame(self, hand_landmarks_list, x0, y0, roi_w, roi_h):
+        """Convert landmarks from ROI-normalised to whole-frame-normalised coordinates, in place"""
+        for hand_landmarks in hand_landmarks_list:
+            for lm in hand_landmarks.landmark:
+                lm.x = x0 + lm.x * roi_w
+                lm.y = y0 + lm.y * roi_h
+                lm.z = lm.z * roi_w
+
     def get_landmark_list(self, hand_landmarks, frame_width, frame_height):
         """
         Extracts landmark coordinates into a list.
@@ -65,6 +127,13 @@ class HandTracker:
                 lm_list.append([id, lm.x, lm.y, lm.z])
         return lm_list
 
+    def get_handedness(self, hand_index=0):
+        """(label, score) of a hand from the last find_hands call, e.g. ("Right", 0.98)"""
+        if self.results is None or not self.results.multi_handedness:
+            return None
+        classification = self.results.multi_handedness[hand_index].classification[0]
+        return classification.label, classification.score
+
     def fingers_up(self, lm_list):
         """
         Checks which fingers are extended upwards.
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of hand tracking results for recorded videos.
+
+MediaPipe inference is by far the most expensive step when re-running
+experiments on the same recordings. The landmarks of every frame are
+computed once and stored as a .npy array of session_recorder.FRAME_DTYPE
+records (array index = frame index), under
+
+    <LANDMARK_CACHE_DIR>/<sha256 of the video file>/<hash of tracker settings>.npy
+
+Cached arrays are memory-mapped on load, so later runs skip hands.process
+entirely and read landmarks at disk speed. Renaming or copying a video
+keeps its cache entry; changing a tracker setting (or the MediaPipe
+version) gets a new one.
+
+    python landmark_cache.py recordings/*.mp4     # precompute
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+import config
+from session_recorder import FRAME_DTYPE, HAND_NONE, set_hand, landmark_lists
+
+_HASH_BLOCK = 1 << 20
+_HASH_INDEX = "hashes.json"  # path -> (size, mtime, sha256), so unchanged files aren't rehashed
+
+
+def tracker_settings(hand_tracker):
+    """Every HandTracker setting that changes its output"""
+    import mediapipe
+    return {
+        'options': dict(hand_tracker.hands_options),
+        'model_complexity': hand_tracker.model_complexity,
+        'inference_scale': hand_tracker.inference_scale,
+        'roi': list(hand_tracker.roi) if hand_tracker.roi else None,
+        'mediapipe': getattr(mediapipe, '__version__', 'unknown'),
+    }
+
+
+def _replace(path, write, suffix=""):
+    """
+    Write path through a temporary file of its own, then move it into place:
+    readers never see a partial file, and concurrent writers never share one
+    """
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=suffix + ".tmp", delete=False) as f:
+        temp_path = f.name
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.remove(temp_path)
+            raise
+    os.replace(temp_path, path)
+
+
+def settings_key(settings):
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class LandmarkCache:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or config.LANDMARK_CACHE_DIR
+        self.hits = 0
+        self.misses = 0
+
+    def _load_hash_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, _HASH_INDEX)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def video_hash(self, path):
+        """SHA-256 of the file contents, remembered per (path, size, mtime)"""
+        stat = os.stat(path)
+        index = self._load_hash_index()
+        key = os.path.abspath(path)
+        entry = index.get(key)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime:
+            return entry[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+                digest.update(block)
+        index[key] = (stat.st_size, stat.st_mtime, digest.hexdigest())
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _replace(os.path.join(self.cache_dir, _HASH_INDEX), lambda f: f.write(json.dumps(index).encode('utf-8')))
+        return index[key][2]
+
+    def entry_path(self, video_path, settings):
+        return os.path.join(self.cache_dir, self.video_hash(video_path), settings_key(settings) + ".npy")
+
+    def get(self, video_path, settings):
+        """Memory-mapped landmark records for the video, or None if not cached"""
+        path = self.entry_path(video_path, settings)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def landmarks(self, video_path, hand_tracker=None):
+        """
+        Landmark records for every frame of the video, computed with
+        hand_tracker on a cache miss. The tracker should be fresh: it keeps
+        temporal state between frames. None uses a new default HandTracker.
+        """
+        own_tracker = hand_tracker is None
+        if own_tracker:
+            from hand_tracker import HandTracker
+            hand_tracker = HandTracker()
+        try:
+            settings = tracker_settings(hand_tracker)
+            records = self.get(video_path, settings)
+            if records is not None:
+                self.hits += 1
+                return records
+            self.misses += 1
+            records = track_video(video_path, hand_tracker)
+        finally:
+            if own_tracker:
+                hand_tracker.close()
+
+        path = self.entry_path(video_path, settings)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _replace(path, lambda f: np.save(f, records), ".npy")
+        info = {'video': os.path.basename(video_path), 'frames': len(records), 'settings': settings}
+        _replace(os.path.join(os.path.dirname(path), settings_key(settings) + ".json"),
+                 lambda f: f.write(json.dumps(info).encode('utf-8')))
+        return np.load(path, mmap_mode='r')
+
+    def frames(self, video_path, hand_tracker=None):
+        """(timestamp, lm_list) pairs for replay, timestamps from the video frame rate"""
+        return list(landmark_lists(self.landmarks(video_path, hand_tracker)))
+
+
+def track_video(video_path, hand_tracker):
+    """Run hand tracking on every frame; returns a FRAME_DTYPE array"""
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"Could not open video {video_path}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or config.DEFAULT_FPS
+    chunks = []
+    chunk = np.zeros(1024, FRAME_DTYPE)
+    count = 0
+    while True:
+        ok, image = capture.read()
+        if not ok:
+            break
+        _, hands = hand_tracker.find_hands(image, draw=False)
+        record = chunk[count % len(chunk)]
+        record['t'] = count / fps
+        record['index'] = count
+        if hands:
+            set_hand(record, hand_tracker.get_landmark_list(hands[0], image.shape[1], image.shape[0]),
+                     hand_tracker.get_handedness(0))
+        else:
+            set_hand(record, [])
+        count += 1
+        if count % len(chunk) == 0:
+            chunks.append(chunk)
+            chunk = np.zeros(len(chunk), FRAME_DTYPE)
+    capture.release()
+    chunks.append(chunk[:count % len(chunk)])
+    return np.concatenate(chunks)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Precompute hand landmarks for recorded videos')
+    parser.add_argument('videos', nargs='+', help='Video files')
+    parser.add_argument('--cache-dir', help=f'Cache directory (default: {config.LANDMARK_CACHE_DIR})')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    cache = LandmarkCache(args.cache_dir)
+    for video in args.videos:
+        hits = cache.hits
+        records = cache.landmarks(video)
+        detected = int(np.count_nonzero(records['hand'] != HAND_NONE))
+        print(f"{video}: {len(records)} frames, hand in {detected} "
+              f"({'cached' if cache.hits > hits else 'tracked'})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Per-stage latency instrumentation.
+
+Frames carry perf_counter timestamps from the pipeline stages (capture,
+inference start and end, recognition, actuation, display). The intervals
+between them go into fixed-bucket histograms, so recording is a bucket
+search and an increment, memory stays constant however long the app
+runs, and p50/p95/p99 can be read at any time.
+"""
+
+from bisect import bisect_left
+import time
+
+# Upper bucket bounds in milliseconds; the last bucket catches everything slower
+BUCKET_BOUNDS_MS = [0.25, 0.5, 1, 2, 3, 4, 5, 7.5, 10, 12.5, 15, 20, 25, 30, 40, 50,
+                    60, 75, 100, 125, 150, 200, 300, 500, 1000, float('inf')]
+
+# (name, start stamp, end stamp) of every measured interval
+STAGE_INTERVALS = [
+    ('queue', 'capture_time', 't_infer_start'),
+    ('inference', 't_infer_start', 't_infer_end'),
+    ('recognition', 't_infer_end', 't_recognized'),
+    ('actuation', 't_recognized', 't_actuated'),
+    ('end_to_end', 'capture_time', 't_actuated'),
+]
+DISPLAY_INTERVALS = [
+    ('display', 't_actuated', 't_displayed'),
+    ('capture_to_display', 'capture_time', 't_displayed'),
+]
+
+
+class LatencyHistogram:
+    def __init__(self, bounds_ms=None):
+        self.bounds = [b / 1000.0 for b in (bounds_ms or BUCKET_BOUNDS_MS)]
+        self.counts = [0] * len(self.bounds)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, p):
+        """Approximate percentile (0-100) in seconds, interpolated within its bucket"""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                low = self.bounds[i - 1] if i else 0.0
+                high = self.bounds[i]
+                if high == float('inf'):
+                    return low
+                return low + (high - low) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-2]
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class LatencyTracker:
+    """Histograms for every pipeline stage interval"""
+
+    def __init__(self):
+        self.histograms = {name: LatencyHistogram() for name, _, _ in STAGE_INTERVALS + DISPLAY_INTERVALS}
+        self.last_report = time.perf_counter()
+
+    def _record(self, frame, intervals):
+        for name, start_attr, end_attr in intervals:
+            start = getattr(frame, start_attr)
+            end = getattr(frame, end_attr)
+            if start and end:
+                self.histograms[name].record(end - start)
+
+    def record_frame(self, frame):
+        """Record capture-to-actuation intervals (called once the frame is actuated)"""
+        self._record(frame, STAGE_INTERVALS)
+
+    def record_display(self, frame):
+        """Record display intervals (called once the frame is shown)"""
+        self._record(frame, DISPLAY_INTERVALS)
+
+    def summary(self):
+        """{stage: (p50, p95, p99, count)} in milliseconds, for stages with samples"""
+        return {
+            name: (h.percentile(50) * 1000, h.percentile(95) * 1000, h.percentile(99) * 1000, h.count)
+            for name, h in self.histograms.items() if h.count
+        }
+
+    def summary_lines(self):
+        return [f"{name}: p50 {p50:.1f} p95 {p95:.1f} p99 {p99:.1f} ms"
+                for name, (p50, p95, p99, _) in self.summary().items()]
+
+    def short_summary(self):
+        """One short line for tooltips and status output"""
+        summary = self.summary()
+        if 'end_to_end' not in summary:
+            return "Latency: no data"
+        p50, p95, p99, _ = summary['end_to_end']
+        line = f"Latency p50 {p50:.0f} / p95 {p95:.0f} / p99 {p99:.0f} ms"
+        if 'inference' in summary:
+            line += f" (inference p50 {summary['inference'][0]:.0f} ms)"
+        return line
+
+    def report_due(self, interval):
+        """True once per interval seconds (for periodic log lines)"""
+        now = time.perf_counter()
+        if now - self.last_report >= interval:
+            self.last_report = now
+            return True
+        return False
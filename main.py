@@ -8,7 +8,15 @@ import threading
 
 from hand_tracker import HandTracker
 from gesture_recognizer import GestureRecognizer, GESTURE_IDLE, GESTURE_MOVE, GESTURE_DRAG # Import states
-from mouse_controller import MouseController
+from mouse_controller import MouseController, PynputMouseBackend, BufferedMouseBackend, replay_actions
+from pipeline import Pipeline, Frame, DROP_OLDEST, BLOCK
+from quality_controller import AdaptiveQualityController
+from frame_scheduler import FrameScheduler, pacing_fps
+from latency_metrics import LatencyTracker
+from metrics_server import Counter, LabeledCounter, MetricsRegistry, MetricsServer, RateGauge
+from trace_recorder import TraceRecorder
+from event_log import default_log
+from session_recorder import SessionRecorder
 from ui_manager import UIManager, CameraManager
 
 # Import system tray support (optional)
@@ -31,7 +39,296 @@ def load_selected_camera():
         print(f"Could not load saved camera selection: {e}")
     return None
 
-def main(headless=False, silent=False):
+class GestureApp:
+    """Application components plus the pipeline stage functions that use them"""
+
+    def __init__(self, camera_manager, hand_tracker, gesture_recognizer, action_buffer,
+                 mouse_backend, ui_manager=None, silent=False, status_callback=None):
+        self.camera_manager = camera_manager
+        self.camera_info = camera_manager.get_camera_info()
+        self.hand_tracker = hand_tracker
+        self.gesture_recognizer = gesture_recognizer
+        self.action_buffer = action_buffer
+        self.mouse_backend = mouse_backend
+        self.ui_manager = ui_manager
+        self.silent = silent
+        self.status_callback = status_callback  # Receives the periodic latency summary (tray tooltip)
+        self.pipeline = None
+        self.latency = LatencyTracker()
+        self.tracer = None
+        self.recorder = None
+
+        # Hot-loop counters for the metrics endpoint (each written by one stage only)
+        self.hands_detected = Counter()
+        self.gesture_events = LabeledCounter()
+        self.mouse_actions = LabeledCounter()
+        self.last_gesture = None
+
+        self.draw_landmarks = ui_manager is not None
+        self.scheduler = None  # FrameScheduler pacing the capture loop, if any
+        self.frame_count = 0
+        self.camera_switch_requested = False
+        self.prev_render_time = 0
+
+        # Quality knobs, set by the adaptive quality controller
+        self.inference_skip = 1  # Run inference on every Nth frame, reuse landmarks in between
+        self.render_interval = 1  # Redraw the window every Nth frame
+        self.last_hand_landmarks = None
+        self.last_lm_list = []
+        self.last_handedness = None
+        self.quality_controller = None
+
+    def apply_quality(self, level):
+        """Apply one QUALITY_LEVELS entry"""
+        self.hand_tracker.set_quality(level['inference_scale'], level['model_complexity'])
+        self.inference_skip = level['inference_skip']
+        self.render_interval = level['render_interval']
+
+    # --- Stages ---
+
+    def capture(self):
+        """Source stage: read the next camera frame"""
+        if self.camera_switch_requested:
+            self.camera_switch_requested = False
+            self._switch_camera()
+        if self.scheduler is not None:
+            self.scheduler.wait()
+
+        success, image = self.camera_manager.read_frame()
+        if not success:
+            if not self.silent:
+                print("Failed to read frame, trying to reinitialize camera...")
+            if not self.camera_manager.initialize_camera():
+                if not self.silent:
+                    print("Failed to reinitialize camera. Exiting.")
+                self.pipeline.stop()
+            return None
+
+        self.frame_count += 1
+        return Frame(self.frame_count, image, time.perf_counter())
+
+    def track(self, frame):
+        """Run hand tracking; keeps the first hand's landmarks"""
+        frame.t_infer_start = time.perf_counter()
+        if self.inference_skip > 1 and frame.index % self.inference_skip:
+            # Skipped frame: reuse the last inference result
+            frame.output_image = cv2.flip(frame.image, 1)
+            frame.hand_landmarks, frame.lm_list = self.last_hand_landmarks, self.last_lm_list
+            frame.handedness = self.last_handedness
+            frame.t_infer_end = time.perf_counter()
+            return frame
+
+        frame.output_image, frame.hand_landmarks = self.hand_tracker.find_hands(frame.image, draw=self.draw_landmarks)
+        if frame.hand_landmarks:
+            # Assuming only one hand for now (as per HandTracker default)
+            frame.lm_list = self.hand_tracker.get_landmark_list(frame.hand_landmarks[0], frame.width, frame.height)
+            frame.handedness = self.hand_tracker.get_handedness(0)
+        self.last_hand_landmarks, self.last_lm_list = frame.hand_landmarks, frame.lm_list
+        self.last_handedness = frame.handedness
+        if frame.hand_landmarks:
+            self.hands_detected.inc()
+        frame.t_infer_end = time.perf_counter()
+        return frame
+
+    def recognize(self, frame):
+        """Recognize the gesture; mouse actions are buffered on the frame for the actuate stage"""
+        frame.gesture = GESTURE_IDLE # Default if no hand
+        if frame.lm_list:
+            frame.fingers = self.hand_tracker.fingers_up(frame.lm_list)
+            frame.gesture = self.gesture_recognizer.recognize(frame.lm_list, frame.width, frame.height,
+                                                              frame.capture_time)
+        else:
+            # If no hand is detected, ensure gesture recognizer knows
+            self.gesture_recognizer.recognize([], frame.width, frame.height, frame.capture_time)
+        frame.actions = self.action_buffer.take()
+        if frame.gesture != self.last_gesture:
+            self.gesture_events.inc(frame.gesture)
+            self.last_gesture = frame.gesture
+        frame.t_recognized = time.perf_counter()
+        return frame
+
+    def actuate(self, frame):
+        """Perform the frame's mouse actions"""
+        replay_actions(self.mouse_backend, frame.actions)
+        frame.t_actuated = time.perf_counter()
+        for name, _ in frame.actions:
+            self.mouse_actions.inc(name)
+        self.latency.record_frame(frame)
+        if self.quality_controller is not None:
+            self.quality_controller.observe(frame.t_actuated - frame.capture_time)
+        if self.latency.report_due(config.LATENCY_LOG_INTERVAL):
+            self._report_latency()
+        return frame
+
+    def record(self, frame):
+        """Append the frame's landmarks and events to the session recording"""
+        self.recorder.record(frame, frame.handedness)
+        return frame
+
+    def _report_latency(self):
+        """Periodic latency summary for the console and the tray tooltip"""
+        if not self.silent:
+            print(self.latency.short_summary())
+            for line in self.latency.summary_lines():
+                print(f"  {line}")
+        if self.status_callback is not None:
+            self.status_callback(self.latency.short_summary())
+
+    def report_status(self, frame):
+        """Print status every 1000 frames (headless console)"""
+        if frame.index % 1000 == 0:
+            status = f"Processed {frame.index} frames, current gesture: {frame.gesture}"
+            if self.scheduler is not None:
+                status += (f", missed deadlines: {self.scheduler.missed} "
+                           f"({self.scheduler.missed_ratio:.1%} at {self.scheduler.target_fps:.0f} FPS)")
+            print(status)
+        return None
+
+    def render(self, frame):
+        """Draw the UI, show the window and handle keyboard input (main thread)"""
+        ui_manager = self.ui_manager
+        gesture_recognizer = self.gesture_recognizer
+
+        # Calculate FPS
+        curr_time = frame.capture_time
+        fps = 1 / (curr_time - self.prev_render_time) if self.prev_render_time > 0 else 0
+        self.prev_render_time = curr_time
+
+        if frame.index % self.render_interval == 0:
+            # Draw UI elements
+            processed_image = ui_manager.draw_status_info(frame.output_image, fps, frame.gesture,
+                                                          self.camera_info['index'], gesture_recognizer)
+            if frame.lm_list:
+                processed_image = ui_manager.draw_hand_info(processed_image, frame.lm_list, frame.fingers)
+            if config.ACTIVE_REGION_ENABLED:
+                processed_image = ui_manager.draw_active_region(processed_image, self.gesture_recognizer.mouse_controller.active_region,
+                                                                self.hand_tracker.roi)
+            processed_image = ui_manager.draw_latency(processed_image, self.latency)
+            processed_image = ui_manager.draw_instructions(processed_image, frame.capture_time)
+
+            cv2.imshow('Hand Gesture Mouse Control', processed_image)
+            frame.t_displayed = time.perf_counter()
+            self.latency.record_display(frame)
+
+        # Handle keyboard input
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            if not self.silent:
+                print("Quit requested")
+            self.pipeline.stop()
+        elif key == ord('c'):
+            # The capture stage owns the camera, so it performs the switch
+            self.camera_switch_requested = True
+        elif key == ord('i'):
+            ui_manager.toggle_instructions()
+            if not self.silent:
+                print("Toggled instructions")
+        elif key == ord('h'):
+            ui_manager.show_help()
+            if not self.silent:
+                print("Showing help")
+        elif key == ord('t') and self.tracer is not None:
+            self.tracer.toggle()
+        return None
+
+    def start_pacing(self):
+        """Pace the capture loop to the camera's frame interval (or TARGET_FPS)"""
+        self.scheduler = FrameScheduler(pacing_fps(self.camera_info.get('fps')))
+        if not self.silent:
+            print(f"Pacing capture to {self.scheduler.target_fps:.1f} FPS")
+
+    def _switch_camera(self):
+        if not self.silent:
+            print("Switching camera...")
+        if self.camera_manager.switch_camera():
+            self.camera_info = self.camera_manager.get_camera_info()
+            if self.scheduler is not None:
+                self.scheduler.set_fps(pacing_fps(self.camera_info.get('fps')))
+            if not self.silent:
+                print(f"Switched to camera {self.camera_info['index']}")
+        else:
+            if not self.silent:
+                print("Failed to switch camera")
+
+def create_metrics_registry(app):
+    """Metrics for the /metrics endpoint, read from the app and its pipeline when scraped"""
+    registry = MetricsRegistry()
+
+    def stage_stat(key):
+        return lambda: {name: stats[key] for name, stats in app.pipeline.stats().items()}
+
+    def detection_ratio():
+        frames = app.pipeline.stats()['track']['processed']
+        return app.hands_detected.value / frames if frames else 0.0
+
+    registry.add_counter("frames_total", "Frames processed by each pipeline stage", stage_stat('processed'), label="stage")
+    registry.add_counter("frames_dropped_total", "Frames dropped from each stage's input queue", stage_stat('dropped'), label="stage")
+    registry.add_counter("stage_busy_seconds_total", "Wall-clock time each stage spent processing", stage_stat('busy_time'), label="stage")
+    registry.add_counter("stage_cpu_seconds_total", "CPU time used by each stage's thread", stage_stat('cpu_time'), label="stage")
+    registry.add_gauge("fps", "Captured frames per second since the last scrape",
+                       RateGauge(lambda: app.pipeline.stats()['capture']['processed']))
+    registry.add_counter("hand_detected_frames_total", "Frames with a hand detected", lambda: app.hands_detected.value)
+    registry.add_gauge("hand_detection_ratio", "Fraction of tracked frames with a hand", detection_ratio)
+    registry.add_counter("gesture_events_total", "Gesture changes by new gesture", app.gesture_events.values, label="gesture")
+    registry.add_counter("mouse_actions_total", "Mouse actions performed", app.mouse_actions.values, label="action")
+    registry.add_counter("deadline_missed_total", "Capture frames that missed their pacing deadline",
+                         lambda: app.scheduler.missed if app.scheduler else 0)
+    registry.add_gauge("quality_level", "Adaptive quality level (0 = best)",
+                       lambda: app.quality_controller.level if app.quality_controller else 0)
+    registry.add_counter("process_cpu_seconds_total", "CPU time used by the process", time.process_time)
+    registry.add_histograms("latency_seconds", "Per-stage frame latency", lambda: app.latency.histograms, label="stage")
+    registry.add_histograms("gesture_decision_seconds", "Pinch to tap (click) or drag decision",
+                            lambda: app.gesture_recognizer.decision_latency, label="decision")
+    return registry
+
+# --- Stage graphs ---
+# Frames are dropped (oldest first) where only the latest one matters;
+# recognition results and mouse actions are never dropped.
+
+def _add_recording(pipeline, app):
+    """Session recording stage after actuation, if recording is on"""
+    if app.recorder is not None:
+        # Lossless in normal operation; never holds up actuation if the recorder falls behind
+        pipeline.add_stage("record", app.record, queue_size=32, policy=DROP_OLDEST)
+    return pipeline
+
+def build_window_pipeline(app):
+    """Camera window: capture -> track -> recognize -> actuate -> [record] -> render (main thread)"""
+    pipeline = (Pipeline("window")
+                .set_source("capture", app.capture)
+                .add_stage("track", app.track, queue_size=1, policy=DROP_OLDEST)
+                .add_stage("recognize", app.recognize, queue_size=2, policy=BLOCK)
+                .add_stage("actuate", app.actuate, queue_size=8, policy=BLOCK))
+    return (_add_recording(pipeline, app)
+            .add_stage("render", app.render, queue_size=1, policy=DROP_OLDEST, main_thread=True))
+
+def build_headless_pipeline(app):
+    """No window: paced capture -> track -> recognize -> actuate -> [record] -> console status"""
+    app.start_pacing()
+    pipeline = (Pipeline("headless")
+                .set_source("capture", app.capture)
+                .add_stage("track", app.track, queue_size=1, policy=DROP_OLDEST)
+                .add_stage("recognize", app.recognize, queue_size=2, policy=BLOCK)
+                .add_stage("actuate", app.actuate, queue_size=8, policy=BLOCK))
+    _add_recording(pipeline, app)
+    if not app.silent:
+        pipeline.add_stage("status", app.report_status, queue_size=1, policy=DROP_OLDEST)
+    return pipeline
+
+def build_tray_pipeline(app):
+    """System tray: like headless, without console status"""
+    app.start_pacing()
+    pipeline = (Pipeline("tray")
+                .set_source("capture", app.capture)
+                .add_stage("track", app.track, queue_size=1, policy=DROP_OLDEST)
+                .add_stage("recognize", app.recognize, queue_size=2, policy=BLOCK)
+                .add_stage("actuate", app.actuate, queue_size=8, policy=BLOCK))
+    return _add_recording(pipeline, app)
+
+def main(headless=False, silent=False, tray=False, status_callback=None, metrics_port=None,
+         trace=False, tracer=None, record=None):
+    if tray:
+        headless = True
     if not silent:
         print("Starting Hand Gesture Mouse Control...")
         if headless:
@@ -40,8 +337,7 @@ def main(headless=False, silent=False):
     
     # Initialize managers
     camera_manager = CameraManager()
-    if not headless:
-        ui_manager = UIManager()
+    ui_manager = None if headless else UIManager()
     
     # Check for previously selected camera
     selected_camera = load_selected_camera()
@@ -65,117 +361,96 @@ def main(headless=False, silent=False):
     print(f"Using camera {camera_info['index']} ({camera_info['width']}x{camera_info['height']})")
     print(f"Available cameras: {camera_info['available']}")
 
+    # Clicks, drags and scrolls are logged off the hot loop; silent runs only keep the crash ring
+    default_log.set_mode("ring" if silent and config.EVENT_LOG_MODE == "console" else config.EVENT_LOG_MODE)
+
     # Initialize our modules  
     hand_tracker = HandTracker()
-    mouse_controller = MouseController() # Gets screen dimensions on init
+    # Recognition buffers mouse actions; the actuate stage performs them on the real mouse
+    mouse_backend = PynputMouseBackend()
+    action_buffer = BufferedMouseBackend(scroll_resolution=mouse_backend.scroll_resolution)
+    mouse_controller = MouseController(backend=action_buffer) # Gets screen dimensions on init
     gesture_recognizer = GestureRecognizer(mouse_controller, hand_tracker)
+    active_region = mouse_controller.active_region
+    if config.ACTIVE_REGION_ENABLED and config.ROI_INFERENCE:
+        hand_tracker.set_roi(active_region.roi())
     
     if not silent:
-        print(f"Screen: {mouse_controller.screen_width}x{mouse_controller.screen_height}")
+        geometry = mouse_controller.geometry
+        print(f"Screen: {mouse_controller.screen_width}x{mouse_controller.screen_height} "
+              f"({len(geometry.monitors)} monitor(s), from {geometry.source})")
         if not headless:
             print("\nControls:")
             print("  'q' - Quit")
             print("  'c' - Change camera")
             print("  'i' - Toggle instructions")  
             print("  'h' - Show help")
+            print("  't' - Start/stop trace recording")
         else:
             print("\nHeadless mode controls:")
             print("  Press Ctrl+C to quit")
         print("\nStarting gesture recognition...")
 
-    # For FPS calculation
-    prev_time = 0
-    frame_count = 0
+    app = GestureApp(camera_manager, hand_tracker, gesture_recognizer, action_buffer,
+                     mouse_backend, ui_manager, silent, status_callback)
+    if config.ADAPTIVE_QUALITY:
+        app.quality_controller = AdaptiveQualityController(app.apply_quality, log=None if silent else print)
+    record = config.SESSION_RECORDING if record is None else record
+    if record:
+        app.recorder = SessionRecorder(record if isinstance(record, str) else None,
+                                       metadata={'camera': camera_info, 'mode': 'tray' if tray else
+                                                 'headless' if headless else 'window'})
+        if not silent:
+            print(f"Recording session to {app.recorder.path}")
+    if tray:
+        pipeline = build_tray_pipeline(app)
+    elif headless:
+        pipeline = build_headless_pipeline(app)
+    else:
+        pipeline = build_window_pipeline(app)
+    app.pipeline = pipeline
 
-    try:
-        while True:
-            success, frame = camera_manager.read_frame()
-            if not success:
-                if not silent:
-                    print("Failed to read frame, trying to reinitialize camera...")
-                if not camera_manager.initialize_camera():
-                    if not silent:
-                        print("Failed to reinitialize camera. Exiting.")
-                    break
-                continue
-
-            frame_count += 1
-
-            # Process hand tracking
-            if headless:
-                # In headless mode, don't draw landmarks to save processing
-                processed_image, hand_landmarks_list = hand_tracker.find_hands(frame, draw=False)
-            else:
-                processed_image, hand_landmarks_list = hand_tracker.find_hands(frame, draw=True)
-
-            current_gesture = GESTURE_IDLE # Default if no hand
-            fingers = [False] * 5  # Default finger state
-
-            if hand_landmarks_list: # If any hands are detected
-                # Assuming only one hand for now (as per HandTracker default)
-                for hand_lm in hand_landmarks_list: 
-                    lm_list = hand_tracker.get_landmark_list(hand_lm, camera_info['width'], camera_info['height'])
-                    if lm_list:
-                        fingers = hand_tracker.fingers_up(lm_list)
-                        current_gesture = gesture_recognizer.recognize(lm_list, camera_info['width'], camera_info['height'])
-                        # Mouse control actions are now handled within gesture_recognizer.recognize()
-            else:
-                # If no hand is detected, ensure gesture recognizer knows
-                gesture_recognizer.recognize([], camera_info['width'], camera_info['height'])
-
-            if not headless:
-                # Calculate FPS
-                curr_time = time.time()
-                fps = 1 / (curr_time - prev_time) if prev_time > 0 else 0
-                prev_time = curr_time
-                
-                # Draw UI elements
-                processed_image = ui_manager.draw_status_info(processed_image, fps, current_gesture, camera_info['index'], gesture_recognizer)
-                if hand_landmarks_list:
-                    for hand_lm in hand_landmarks_list:
-                        lm_list = hand_tracker.get_landmark_list(hand_lm, camera_info['width'], camera_info['height'])
-                        if lm_list:
-                            processed_image = ui_manager.draw_hand_info(processed_image, lm_list, fingers)
-                            break  # Only draw for first hand
-                processed_image = ui_manager.draw_instructions(processed_image)
-
-                cv2.imshow('Hand Gesture Mouse Control', processed_image)
-                
-                # Handle keyboard input
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
-                    if not silent:
-                        print("Quit requested")
-                    break
-                elif key == ord('c'):
-                    if not silent:
-                        print("Switching camera...")
-                    if camera_manager.switch_camera():
-                        camera_info = camera_manager.get_camera_info()
-                        if not silent:
-                            print(f"Switched to camera {camera_info['index']}")
-                    else:
-                        if not silent:
-                            print("Failed to switch camera")
-                elif key == ord('i'):
-                    ui_manager.toggle_instructions()
-                    if not silent:
-                        print("Toggled instructions")
-                elif key == ord('h'):
-                    ui_manager.show_help()
-                    if not silent:
-                        print("Showing help")
-            else:
-                # In headless mode, just check for Ctrl+C
-                time.sleep(0.01)  # Small delay to prevent excessive CPU usage
-                
-                # Print status every 1000 frames in headless mode
-                if not silent and frame_count % 1000 == 0:
-                    print(f"Processed {frame_count} frames, current gesture: {current_gesture}")
+    # Stage spans go to a ring buffer while recording; dumped on stop or exit
+    app.tracer = tracer or TraceRecorder()
+    pipeline.set_tracer(app.tracer)
+    if trace:
+        app.tracer.start()
+        if not silent:
+            print("Trace recording started")
+
+    metrics_server = None
+    metrics_port = config.METRICS_PORT if metrics_port is None else metrics_port
+    if metrics_port:
+        try:
+            metrics_server = MetricsServer(create_metrics_registry(app), metrics_port).start()
+            if not silent:
+                print(f"Metrics available at http://127.0.0.1:{metrics_server.port}/metrics")
+        except OSError as e:
+            print(f"Could not start metrics endpoint on port {metrics_port}: {e}")
 
+    try:
+        pipeline.run()
     except KeyboardInterrupt:
         if not silent:
             print("\nInterrupted by user")
+    except Exception:
+        if default_log.mode != "off":
+            print(f"Recent events written to {default_log.dump()}")
+        raise
+    finally:
+        default_log.close()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if app.tracer.recording:
+            app.tracer.stop()
+            print(f"Trace written to {app.tracer.dump()}")
+        if app.recorder is not None:
+            error = app.recorder.close()
+            if error is not None:
+                print(f"Session recording stopped early: {error}")
+            if not silent:
+                print(f"Recorded {app.recorder.frames_recorded} frames "
+                      f"({app.recorder.bytes_written / 1024:.0f} KB, {app.recorder.chunks_dropped} chunks dropped)")
 
     if not silent:
         print("Releasing resources...")
@@ -194,19 +469,27 @@ def parse_arguments():
                         help='Run with minimal console output')
     parser.add_argument('--tray', action='store_true',
                         help='Run with system tray icon (implies headless)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics on localhost at this port (0 = off)')
+    parser.add_argument('--trace', action='store_true',
+                        help='Record pipeline timing from startup and write a Chrome trace on exit')
+    parser.add_argument('--record', nargs='?', const=True, default=None, metavar='PATH',
+                        help='Record landmarks and gesture/mouse events to a session file')
     return parser.parse_args()
 
 # Global variables for system tray functionality
 app_running = False
 main_thread = None
 
-def run_main_app(headless=False, silent=False):
+def run_main_app(headless=False, silent=False, tray=False, status_callback=None, metrics_port=None,
+                 trace=False, tracer=None, record=None):
     """Wrapper for main function that can be called from system tray"""
     global app_running
     if not app_running:
         app_running = True
         try:
-            main(headless=headless, silent=silent)
+            main(headless=headless, silent=silent, tray=tray, status_callback=status_callback,
+                 metrics_port=metrics_port, trace=trace, tracer=tracer, record=record)
         finally:
             app_running = False
 
@@ -223,20 +506,28 @@ if __name__ == '__main__':
     if args.tray and SYSTEM_TRAY_AVAILABLE:
         print("Starting with system tray...")
         
+        # Create the system tray first so the app can report status to its tooltip;
+        # the tray menu starts and stops the same trace recorder the app records into
+        tracer = TraceRecorder()
+        tray = create_system_tray(run_main_app, quit_app, tracer)
+        
         # Start main application in background thread
         main_thread = threading.Thread(
-            target=lambda: run_main_app(headless=True, silent=args.silent), 
+            target=lambda: run_main_app(headless=True, silent=args.silent, tray=True,
+                                        status_callback=tray.set_status, metrics_port=args.metrics_port,
+                                        trace=args.trace, tracer=tracer, record=args.record), 
             daemon=True
         )
         main_thread.start()
         
-        # Create and run system tray
-        tray = create_system_tray(run_main_app, quit_app)
+        # Run system tray
         tray.run()
         
     elif args.tray and not SYSTEM_TRAY_AVAILABLE:
         print("System tray not available. Starting in headless mode instead...")
-        main(headless=True, silent=args.silent)
+        main(headless=True, silent=args.silent, metrics_port=args.metrics_port, trace=args.trace,
+             record=args.record)
     else:
         # Normal startup
-        main(headless=args.headless, silent=args.silent)
+        main(headless=args.headless, silent=args.silent, metrics_port=args.metrics_port, trace=args.trace,
+             record=args.record)
@@ -0,0 +1,171 @@
+"""
+Local Prometheus-style metrics endpoint.
+
+Serves GET /metrics in the Prometheus text exposition format from a
+background thread, bound to localhost only. The hot loop only bumps
+plain integer counters (each counter has a single writer thread, so an
+increment is one attribute update); everything else - pipeline stage
+counters, dropped frames, latency histograms, CPU time - is read from
+the existing objects when the endpoint is scraped.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+
+
+class Counter:
+    """Monotonic counter; increment from one thread only"""
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class LabeledCounter:
+    """Counters keyed by one label value, created on first use"""
+
+    def __init__(self):
+        self.counters = {}
+
+    def inc(self, label, amount=1):
+        counter = self.counters.get(label)
+        if counter is None:
+            counter = self.counters[label] = Counter()
+        counter.value += amount
+
+    def values(self):
+        return {label: counter.value for label, counter in list(self.counters.items())}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Named metrics, each backed by a function evaluated at scrape time.
+    Functions return a number, or a {label_value: number} dict for a
+    metric with one label.
+    """
+
+    def __init__(self, prefix="hgc_"):
+        self.prefix = prefix
+        self.metrics = []  # (name, type, help, label name, function)
+
+    def add(self, name, metric_type, help_text, func, label=None):
+        self.metrics.append((self.prefix + name, metric_type, help_text, label, func))
+
+    def add_counter(self, name, help_text, func, label=None):
+        self.add(name, "counter", help_text, func, label)
+
+    def add_gauge(self, name, help_text, func, label=None):
+        self.add(name, "gauge", help_text, func, label)
+
+    def add_histograms(self, name, help_text, func, label):
+        """func returns {label_value: LatencyHistogram}; exported in seconds"""
+        self.add(name, "histogram", help_text, func, label)
+
+    def render(self):
+        lines = []
+        for name, metric_type, help_text, label, func in self.metrics:
+            try:
+                value = func()
+            except Exception as e:
+                lines.append(f"# {name} unavailable: {e}")
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == "histogram":
+                for label_value, histogram in value.items():
+                    self._render_histogram(lines, name, {label: label_value}, histogram)
+            elif isinstance(value, dict):
+                for label_value, number in value.items():
+                    lines.append(f"{name}{_labels({label: label_value})} {_number(number)}")
+            else:
+                lines.append(f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(self, lines, name, labels, histogram):
+        cumulative = 0
+        for bound, count in zip(histogram.bounds, histogram.counts):
+            cumulative += count
+            bucket_labels = dict(labels, le=_number(bound))
+            lines.append(f"{name}_bucket{_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.total)}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+
+class MetricsServer:
+    """Serves a MetricsRegistry on http://127.0.0.1:<port>/metrics"""
+
+    def __init__(self, registry, port, host="127.0.0.1"):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the console
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+class RateGauge:
+    """Per-second rate of a growing count, measured between scrapes"""
+
+    def __init__(self, count_func):
+        self.count_func = count_func
+        self.last_count = count_func()
+        self.last_time = time.monotonic()
+        self.rate = 0.0
+
+    def __call__(self):
+        now = time.monotonic()
+        count = self.count_func()
+        if now - self.last_time > 0:
+            self.rate = (count - self.last_count) / (now - self.last_time)
+        self.last_count, self.last_time = count, now
+        return self.rate
@@ -1,20 +1,180 @@
-from pynput.mouse import Button, Controller
-import tkinter as tk
+from array import array
+import sys
+import time
 import math
 
-class MouseController:
+from active_region import ActiveRegion
+from event_log import default_log
+from pointer_acceleration import AccelerationCurve
+from screen_geometry import ScreenGeometry, get_screen_geometry
+
+# Action codes stored in the NullMouseBackend log
+ACTION_MOVE = 0
+ACTION_PRESS = 1
+ACTION_RELEASE = 2
+ACTION_CLICK = 3
+ACTION_SCROLL = 4
+
+ACTION_NAMES = {
+    ACTION_MOVE: "move",
+    ACTION_PRESS: "press",
+    ACTION_RELEASE: "release",
+    ACTION_CLICK: "click",
+    ACTION_SCROLL: "scroll",
+}
+
+BUTTON_LEFT = 0
+BUTTON_RIGHT = 1
+
+
+class PynputMouseBackend:
+    """Performs mouse actions on the real OS cursor through pynput"""
+
+    # Smallest scroll amount delivered, in lines: pynput scales by WHEEL_DELTA on Windows,
+    # but truncates to whole wheel clicks on X11 and macOS (smaller amounts are lost)
+    scroll_resolution = 1 / 120 if sys.platform == "win32" else 1.0
+
     def __init__(self):
+        # Imported here so headless tools never need a display connection
+        from pynput.mouse import Button, Controller
         self.mouse = Controller()
-        try:
-            root = tk.Tk()
-            self.screen_width = root.winfo_screenwidth()
-            self.screen_height = root.winfo_screenheight()
-            root.destroy()
-        except tk.TclError:
-            print("Warning: Could not initialize tkinter to get screen dimensions. Using default 1920x1080.")
-            self.screen_width = 1920
-            self.screen_height = 1080
-        
+        self.buttons = {BUTTON_LEFT: Button.left, BUTTON_RIGHT: Button.right}
+
+    def move_to(self, x, y):
+        self.mouse.position = (x, y)
+
+    def press(self, button):
+        self.mouse.press(self.buttons[button])
+
+    def release(self, button):
+        self.mouse.release(self.buttons[button])
+
+    def click(self, button):
+        self.mouse.press(self.buttons[button])
+        self.mouse.release(self.buttons[button])
+
+    def scroll(self, dx, dy):
+        self.mouse.scroll(dx, dy)
+
+
+class NullMouseBackend:
+    """
+    Records mouse actions instead of performing them.
+    Every action is appended to a flat array('d') as a
+    (timestamp, action, a, b) record, so millions of frames fit in memory
+    and the log can be handed to numpy without copying.
+    For moves a, b are x, y; for buttons a is the button; for scroll a, b are dx, dy.
+    """
+    RECORD_SIZE = 4
+
+    def __init__(self, clock=time.perf_counter, scroll_resolution=0.0):
+        """scroll_resolution: scroll granularity to report, as the backend being stood in for (0: any)"""
+        self.clock = clock
+        self.scroll_resolution = scroll_resolution
+        self.log = array('d')
+        self.position = (0, 0)
+        self.pressed = set()
+
+    def _record(self, action, a=0.0, b=0.0):
+        self.log.extend((self.clock(), action, a, b))
+
+    def move_to(self, x, y):
+        self.position = (x, y)
+        self._record(ACTION_MOVE, x, y)
+
+    def press(self, button):
+        self.pressed.add(button)
+        self._record(ACTION_PRESS, button)
+
+    def release(self, button):
+        self.pressed.discard(button)
+        self._record(ACTION_RELEASE, button)
+
+    def click(self, button):
+        self._record(ACTION_CLICK, button)
+
+    def scroll(self, dx, dy):
+        self._record(ACTION_SCROLL, dx, dy)
+
+    def __len__(self):
+        return len(self.log) // self.RECORD_SIZE
+
+    def records(self):
+        """Yield (timestamp, action, a, b) tuples"""
+        log = self.log
+        for i in range(0, len(log), self.RECORD_SIZE):
+            yield log[i], int(log[i + 1]), log[i + 2], log[i + 3]
+
+    def count(self, action, button=None):
+        """Count recorded actions of one type (optionally for one button)"""
+        return sum(1 for _, a, arg, _ in self.records()
+                   if a == action and (button is None or arg == button))
+
+    def clear(self):
+        del self.log[:]
+        self.pressed.clear()
+
+
+class BufferedMouseBackend:
+    """
+    Collects mouse actions so a different thread can perform them later.
+    Used by the pipeline: recognition fills the buffer, the actuate stage
+    takes the actions and replays them on the real backend.
+    """
+
+    def __init__(self, scroll_resolution=0.0):
+        """scroll_resolution: that of the backend the actions will be replayed on"""
+        self.actions = []
+        self.scroll_resolution = scroll_resolution
+
+    def move_to(self, x, y):
+        self.actions.append(('move_to', (x, y)))
+
+    def press(self, button):
+        self.actions.append(('press', (button,)))
+
+    def release(self, button):
+        self.actions.append(('release', (button,)))
+
+    def click(self, button):
+        self.actions.append(('click', (button,)))
+
+    def scroll(self, dx, dy):
+        self.actions.append(('scroll', (dx, dy)))
+
+    def take(self):
+        """Return the buffered actions and start a new buffer"""
+        actions, self.actions = self.actions, []
+        return actions
+
+
+def replay_actions(backend, actions):
+    """Perform actions collected by a BufferedMouseBackend"""
+    for name, args in actions:
+        getattr(backend, name)(*args)
+
+
+class MouseController:
+    def __init__(self, backend=None, screen_size=None, geometry=None, active_region=None, event_log=None):
+        """
+        backend: object performing the actions (PynputMouseBackend by default).
+                 Pass a NullMouseBackend to run without a display.
+        screen_size: (width, height) of a single screen, skipping detection.
+        geometry: ScreenGeometry to use instead of the detected one.
+        active_region: ActiveRegion mapped onto the screen (from config by default).
+        event_log: EventLog for button and wheel actions (event_log.default_log by default).
+        """
+        self.backend = backend if backend is not None else PynputMouseBackend()
+        self.event_log = event_log if event_log is not None else default_log
+        if geometry is None:
+            if screen_size is not None:
+                geometry = ScreenGeometry.from_size(*screen_size)
+            else:
+                geometry = get_screen_geometry()
+        self.geometry = geometry
+        self.screen_width, self.screen_height = geometry.map_width, geometry.map_height
+        self.active_region = active_region if active_region is not None else ActiveRegion.from_config()
+
         # Enhanced smoothing parameters
         self.prev_x, self.prev_y = 0, 0
         self.velocity_x, self.velocity_y = 0, 0
@@ -24,6 +184,17 @@ class MouseController:
         # Movement deadzone to reduce jitter
         self.deadzone_radius = 5  # pixels
 
+        # Relative mode: accelerated deltas move a sub-pixel cursor position,
+        # starting in the middle of the target screen area
+        self.accel_curve = AccelerationCurve()
+        self.rel_x = geometry.map_x + geometry.map_width / 2
+        self.rel_y = geometry.map_y + geometry.map_height / 2
+
+    @property
+    def scroll_resolution(self):
+        """Smallest scroll amount the backend delivers, in lines (whole lines unless it says otherwise)"""
+        return getattr(self.backend, 'scroll_resolution', 1.0)
+
     def map_value(self, value, in_min, in_max, out_min, out_max):
         # Ensure no division by zero
         if (in_max - in_min) == 0:
@@ -36,10 +207,9 @@ class MouseController:
         hand_x, hand_y: Normalized coordinates from MediaPipe (0.0 to 1.0)
         frame_width, frame_height: Dimensions of the camera frame.
         """
-        # Map hand coordinates to screen coordinates
+        # Map hand coordinates through the active region onto the screen
         # Natural movement: right hand movement = right cursor movement
-        target_x = self.map_value(hand_x, 0, 1, 0, self.screen_width)
-        target_y = self.map_value(hand_y, 0, 1, 0, self.screen_height)
+        target_x, target_y = self.geometry.to_screen(*self.active_region.to_unit(hand_x, hand_y))
         
         if smoothing:
             # Calculate movement delta
@@ -71,41 +241,60 @@ class MouseController:
             self.velocity_y *= 0.7
             
             # Update position
-            self.mouse.position = (int(current_x), int(current_y))
+            self.backend.move_to(int(current_x), int(current_y))
             self.prev_x, self.prev_y = current_x, current_y
         else:
             # Direct mapping without smoothing
-            self.mouse.position = (int(target_x), int(target_y))
+            self.backend.move_to(int(target_x), int(target_y))
             self.prev_x, self.prev_y = target_x, target_y
 
+    def move_mouse_relative(self, delta_x, delta_y, dt):
+        """
+        Moves the cursor by a hand displacement, like a physical mouse.
+        delta_x, delta_y: Change in normalised hand position since the last frame.
+        dt: Seconds since the last frame, used for the hand speed.
+        """
+        speed = math.sqrt(delta_x**2 + delta_y**2) / dt if dt > 0 else 0.0
+        gain = self.accel_curve.gain(speed)
+        geometry = self.geometry
+
+        new_x = self.rel_x + delta_x * gain * geometry.map_width
+        new_y = self.rel_y + delta_y * gain * geometry.map_height
+        new_x = min(max(new_x, geometry.left), geometry.right - 1)
+        new_y = min(max(new_y, geometry.top), geometry.bottom - 1)
+
+        # Keep the fractional position, but only actuate whole-pixel changes
+        if int(new_x) != int(self.rel_x) or int(new_y) != int(self.rel_y):
+            self.backend.move_to(int(new_x), int(new_y))
+        self.rel_x, self.rel_y = new_x, new_y
 
     def left_click(self):
-        self.mouse.press(Button.left)
-        self.mouse.release(Button.left)
-        print("Mouse Action: Left Click")
+        self.backend.click(BUTTON_LEFT)
+        self.event_log.log("mouse", "left click")
 
     def press_left_click(self):
         """Press and hold left mouse button for dragging"""
-        self.mouse.press(Button.left)
-        print("Mouse Action: Left Press (Drag Start)")
+        self.backend.press(BUTTON_LEFT)
+        self.event_log.log("mouse", "left press")
 
     def release_left_click(self):
         """Release left mouse button to end dragging"""
-        self.mouse.release(Button.left)
-        print("Mouse Action: Left Release (Drag End)")
+        self.backend.release(BUTTON_LEFT)
+        self.event_log.log("mouse", "left release")
 
     def right_click(self):
-        self.mouse.press(Button.right)
-        self.mouse.release(Button.right)
-        print("Mouse Action: Right Click")
+        self.backend.click(BUTTON_RIGHT)
+        self.event_log.log("mouse", "right click")
 
     def scroll(self, dy):
         """
         Scrolls the mouse wheel.
         dy: positive for scroll down, negative for scroll up.
+            May be fractional for high-resolution (smooth) scrolling, in
+            multiples of scroll_resolution.
         """
-        self.mouse.scroll(0, dy)
-        print(f"Mouse Action: Scroll by {dy}")
+        self.backend.scroll(0, dy)
+        self.event_log.log("mouse", "scroll", dy=dy)
 
 if __name__ == '__main__':
     # Test functions (optional)
@@ -0,0 +1,223 @@
+"""
+Staged pipeline runtime.
+
+A pipeline is a source followed by a chain of stages. Each stage runs on
+its own worker thread and is connected to the previous one by a bounded
+queue, so capture, tracking, recognition, actuation and rendering overlap
+instead of running one after another. Every edge has a policy for when it
+is full:
+
+  DROP_OLDEST - discard the oldest queued item (keeps latency low; for frames)
+  BLOCK       - wait for space (never loses items; for mouse actions)
+
+One stage may run on the calling thread instead (needed for cv2.imshow,
+which must stay on the main thread on most platforms).
+
+A TraceRecorder can be attached to record every stage run as a span.
+"""
+
+import queue
+import threading
+import time
+
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+# How often blocked workers wake up to check for shutdown
+_POLL_INTERVAL = 0.05
+
+
+class Frame:
+    """
+    One camera frame and everything the stages attach to it.
+    Times are time.perf_counter() stamps; 0.0 means the stage hasn't run.
+    """
+    __slots__ = ('index', 'image', 'capture_time', 'width', 'height', 'output_image',
+                 'hand_landmarks', 'handedness', 'lm_list', 'fingers', 'gesture', 'actions',
+                 't_infer_start', 't_infer_end', 't_recognized', 't_actuated', 't_displayed')
+
+    def __init__(self, index, image, capture_time):
+        self.index = index
+        self.image = image
+        self.capture_time = capture_time
+        self.t_infer_start = 0.0
+        self.t_infer_end = 0.0
+        self.t_recognized = 0.0
+        self.t_actuated = 0.0
+        self.t_displayed = 0.0
+        self.height, self.width = image.shape[:2]
+        self.output_image = None
+        self.hand_landmarks = None
+        self.handedness = None  # (label, score) of the first hand
+        self.lm_list = []
+        self.fingers = [False] * 5
+        self.gesture = None
+        self.actions = []
+
+
+class StageQueue:
+    """Bounded queue between two stages"""
+
+    def __init__(self, maxsize=1, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown queue policy {policy!r}")
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.policy = policy
+        self.dropped = 0
+
+    def put(self, item, stop_event):
+        """Add an item; returns False if the pipeline stopped while waiting"""
+        if self.policy == DROP_OLDEST:
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    return True
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+        while not stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, timeout=_POLL_INTERVAL):
+        """Next item, or None if nothing arrived within the timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def __len__(self):
+        return self.queue.qsize()
+
+
+class Stage:
+    def __init__(self, name, func, main_thread=False):
+        """
+        func: called with each item; returns the item to pass on, or None
+              to drop it. For the source, called with no arguments.
+        main_thread: run on the thread that calls Pipeline.run().
+        """
+        self.name = name
+        self.func = func
+        self.main_thread = main_thread
+        self.processed = 0
+        self.busy_time = 0.0  # Wall-clock seconds in func, including waits for the GIL or I/O
+        self.cpu_time = 0.0   # CPU seconds used by func (the stage's thread time)
+        self.input = None  # StageQueue feeding this stage (None for the source)
+
+
+class Pipeline:
+    def __init__(self, name="pipeline"):
+        self.name = name
+        self.stages = []
+        self.stop_event = threading.Event()
+        self.error = None
+        self.threads = []
+        self.tracer = None
+
+    def set_source(self, name, func):
+        """First stage: func() returns a new item, or None if there is nothing yet"""
+        if self.stages:
+            raise ValueError("The source must be added before other stages")
+        self.stages.append(Stage(name, func))
+        return self
+
+    def add_stage(self, name, func, queue_size=1, policy=DROP_OLDEST, main_thread=False):
+        """Append a stage fed from the previous one through a bounded queue"""
+        if not self.stages:
+            raise ValueError("Add a source before other stages")
+        if main_thread and any(s.main_thread for s in self.stages):
+            raise ValueError("Only one stage can run on the main thread")
+        stage = Stage(name, func, main_thread)
+        stage.input = StageQueue(queue_size, policy)
+        self.stages.append(stage)
+        return self
+
+    def set_tracer(self, tracer):
+        """Record stage spans into tracer (a TraceRecorder) whenever it is recording"""
+        tracer.attach(stage.name for stage in self.stages)
+        self.tracer = tracer
+        return self
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run_stage(self, index):
+        stage = self.stages[index]
+        output = self.stages[index + 1].input if index + 1 < len(self.stages) else None
+        stop_event = self.stop_event
+        try:
+            while not stop_event.is_set():
+                if stage.input is None:
+                    start, cpu_start = time.perf_counter(), time.thread_time()
+                    item = stage.func()
+                else:
+                    item = stage.input.get()
+                    if item is None:
+                        continue
+                    start, cpu_start = time.perf_counter(), time.thread_time()
+                    item = stage.func(item)
+                end = time.perf_counter()
+                stage.cpu_time += time.thread_time() - cpu_start
+                stage.busy_time += end - start
+                stage.processed += 1
+                tracer = self.tracer
+                if tracer is not None and tracer.recording:
+                    tracer.record(index, start, end, getattr(item, 'index', -1))
+                if item is not None and output is not None:
+                    output.put(item, stop_event)
+        except Exception as e:
+            # Remember the first failure, stop everything and re-raise from run()
+            if self.error is None:
+                self.error = e
+            stop_event.set()
+
+    def run(self):
+        """Start all stages and block until the pipeline stops"""
+        main_index = None
+        for i, stage in enumerate(self.stages):
+            if stage.main_thread:
+                main_index = i
+                continue
+            thread = threading.Thread(target=self._run_stage, args=(i,),
+                                      name=f"{self.name}-{stage.name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+        try:
+            if main_index is not None:
+                self._run_stage(main_index)
+            else:
+                while not self.stop_event.wait(_POLL_INTERVAL):
+                    pass
+        finally:
+            self.stop()
+            for thread in self.threads:
+                thread.join(timeout=1.0)
+
+        if self.error is not None:
+            raise self.error
+
+    def stats(self):
+        """Per-stage counters: items processed, busy and CPU seconds, queued and dropped inputs"""
+        return {
+            stage.name: {
+                'processed': stage.processed,
+                'busy_time': stage.busy_time,
+                'cpu_time': stage.cpu_time,
+                'queued': len(stage.input) if stage.input else 0,
+                'dropped': stage.input.dropped if stage.input else 0,
+            }
+            for stage in self.stages
+        }
@@ -0,0 +1,48 @@
+"""
+Pointer acceleration for the relative cursor mode.
+
+Works like OS mouse acceleration: the faster the hand moves, the more
+screen distance each unit of hand movement covers. Slow movements stay
+precise, so landmark noise moves the cursor by a fraction of a pixel
+instead of many. The curve is given as (speed, gain) points and
+precomputed into a lookup table, so a frame costs one index operation.
+"""
+
+import config
+
+
+class AccelerationCurve:
+    def __init__(self, points=None, max_speed=None, size=None):
+        """
+        points: (speed, gain) pairs with increasing speed. Speed is in
+                normalised hand units per second; gain multiplies the
+                movement relative to absolute mapping (1.0 = same distance).
+        max_speed: speed covered by the table; faster speeds use the last entry.
+        size: number of table entries.
+        """
+        points = sorted(config.POINTER_ACCEL_CURVE if points is None else points)
+        max_speed = config.POINTER_ACCEL_MAX_SPEED if max_speed is None else max_speed
+        size = config.POINTER_ACCEL_TABLE_SIZE if size is None else size
+        if not points or max_speed <= 0 or size < 2:
+            raise ValueError("Acceleration curve needs points, a positive max speed and 2+ entries")
+
+        self.points = points
+        self.max_speed = max_speed
+        self.inv_step = (size - 1) / max_speed
+        self.table = [self._interpolate(i / self.inv_step) for i in range(size)]
+
+    def _interpolate(self, speed):
+        """Piecewise-linear gain between the configured points"""
+        points = self.points
+        if speed <= points[0][0]:
+            return points[0][1]
+        for (s0, g0), (s1, g1) in zip(points, points[1:]):
+            if speed <= s1:
+                return g0 + (g1 - g0) * (speed - s0) / (s1 - s0)
+        return points[-1][1]
+
+    def gain(self, speed):
+        index = int(speed * self.inv_step)
+        if index >= len(self.table):
+            return self.table[-1]
+        return self.table[index]
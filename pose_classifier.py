@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Learned hand pose classifier, an alternative to the rule-based finger states.
+
+HandTracker.fingers_up compares fingertip and PIP heights, which only
+works for an upright hand. The classifiers here work on normalised
+landmarks instead: translated to the wrist, rotated so the wrist -> middle
+finger MCP axis points up and scaled by its length, so a tilted, near or
+far hand looks the same. Two NumPy models, both well under 0.1 ms a frame:
+
+  knn  k nearest training frames, from an index of per-class subsampled
+       points with precomputed squared norms (one matrix-vector product)
+  mlp  one hidden ReLU layer with a softmax output, trained with Adam
+
+Classes are pose names (gesture_recognizer.POSE_NAMES). Models are trained
+from recorded sessions (session_recorder.py) or videos (landmark_cache.py)
+and stored as a small .npz file; set config.POSE_CLASSIFIER to its path to
+use it in place of the rules.
+
+    python pose_classifier.py sessions/open.hgcs=open sessions/pinch.hgcs=pinch \\
+        sessions/tilted.hgcs=touch sessions/everyday.hgcs --kind mlp --output pose_model.npz
+
+SESSION=POSE labels every hand frame of a session with that pose (record
+one session per pose, moving and tilting the hand). A session without
+=POSE is labelled from the gestures recorded with it.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+FEATURES = 20 * 3  # Landmarks 1-20 relative to the wrist, x, y, z
+
+DEFAULT_K = 5
+DEFAULT_KNN_POINTS = 400  # Training points kept per class in the kNN index
+DEFAULT_HIDDEN = 32
+DEFAULT_EPOCHS = 300
+
+
+def features(landmarks):
+    """
+    (T, 60) normalised features of (T, 21, 3) landmarks: wrist at the origin,
+    wrist -> middle finger MCP pointing up (-y) with unit length
+    """
+    rel = landmarks[:, 1:, :] - landmarks[:, :1, :]
+    axis = rel[:, 8, :2]  # Middle finger MCP (landmark 9)
+    length = np.sqrt((axis * axis).sum(axis=1))
+    length[length == 0] = 1.0
+    ux, uy = (axis[:, 0] / length)[:, None], (axis[:, 1] / length)[:, None]
+    x, y = rel[:, :, 0], rel[:, :, 1]
+    out = np.empty_like(rel)
+    out[:, :, 0] = x * -uy + y * ux   # Across the hand
+    out[:, :, 1] = -(x * ux + y * uy)  # Along the hand, up is negative as in the image
+    out[:, :, 2] = rel[:, :, 2]
+    return (out / length[:, None, None]).reshape(len(landmarks), FEATURES)
+
+
+def landmark_array(lm_list):
+    """(1, 21, 3) landmarks of one HandTracker lm_list"""
+    return np.asarray(lm_list, np.float64)[None, :21, 1:4]
+
+
+class KNNPoseClassifier:
+    kind = 'knn'
+
+    def __init__(self, classes, points, labels, k=DEFAULT_K):
+        self.classes = list(classes)
+        self.points = np.asarray(points, np.float32)
+        self.labels = np.asarray(labels, np.int64)
+        self.k = int(k)
+        self.norms = (self.points * self.points).sum(axis=1)  # |p|^2, precomputed once
+        self.onehot = np.eye(len(self.classes))
+
+    @classmethod
+    def fit(cls, x, y, classes, k=DEFAULT_K, points_per_class=DEFAULT_KNN_POINTS, seed=0):
+        rng = np.random.default_rng(seed)
+        keep = []
+        for label in range(len(classes)):
+            rows = np.flatnonzero(y == label)
+            keep.append(rng.choice(rows, min(len(rows), points_per_class), replace=False))
+        keep = np.concatenate(keep)
+        return cls(classes, x[keep], y[keep], k)
+
+    def predict_proba(self, x):
+        """(T, classes) vote fractions of the k nearest points"""
+        # |p - f|^2 = |p|^2 - 2 p.f + |f|^2; the last term doesn't change the ranking
+        distances = self.norms[None, :] - 2.0 * (x.astype(np.float32) @ self.points.T)
+        k = min(self.k, len(self.points))
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        return self.onehot[self.labels[nearest]].sum(axis=1) / k
+
+    def arrays(self):
+        return {'points': self.points, 'labels': self.labels.astype(np.int16), 'k': np.int32(self.k)}
+
+    @classmethod
+    def from_arrays(cls, classes, data):
+        return cls(classes, data['points'], data['labels'], int(data['k']))
+
+
+class MLPPoseClassifier:
+    kind = 'mlp'
+
+    def __init__(self, classes, mean, std, w1, b1, w2, b2):
+        self.classes = list(classes)
+        self.mean, self.std = np.asarray(mean, np.float32), np.asarray(std, np.float32)
+        self.w1, self.b1 = np.asarray(w1, np.float32), np.asarray(b1, np.float32)
+        self.w2, self.b2 = np.asarray(w2, np.float32), np.asarray(b2, np.float32)
+
+    @classmethod
+    def fit(cls, x, y, classes, hidden=DEFAULT_HIDDEN, epochs=DEFAULT_EPOCHS, learning_rate=0.01,
+            weight_decay=1e-4, batch_size=256, seed=0):
+        """Softmax cross-entropy with Adam on standardised features"""
+        rng = np.random.default_rng(seed)
+        mean, std = x.mean(axis=0), x.std(axis=0) + 1e-6
+        x = (x - mean) / std
+        onehot = np.eye(len(classes))[y]
+        params = [rng.normal(0, np.sqrt(2.0 / x.shape[1]), (x.shape[1], hidden)), np.zeros(hidden),
+                  rng.normal(0, np.sqrt(1.0 / hidden), (hidden, len(classes))), np.zeros(len(classes))]
+        moments = [np.zeros_like(p) for p in params]
+        squares = [np.zeros_like(p) for p in params]
+        step = 0
+        for _ in range(epochs):
+            order = rng.permutation(len(x))
+            for start in range(0, len(x), batch_size):
+                rows = order[start:start + batch_size]
+                w1, b1, w2, b2 = params
+                h = np.maximum(x[rows] @ w1 + b1, 0.0)
+                logits = h @ w2 + b2
+                p = np.exp(logits - logits.max(axis=1, keepdims=True))
+                p /= p.sum(axis=1, keepdims=True)
+                d_logits = (p - onehot[rows]) / len(rows)
+                d_h = (d_logits @ w2.T) * (h > 0)
+                grads = [x[rows].T @ d_h + weight_decay * w1, d_h.sum(axis=0),
+                         h.T @ d_logits + weight_decay * w2, d_logits.sum(axis=0)]
+                step += 1
+                for i, g in enumerate(grads):
+                    moments[i] = 0.9 * moments[i] + 0.1 * g
+                    squares[i] = 0.999 * squares[i] + 0.001 * g * g
+                    params[i] -= (learning_rate * moments[i] / (1 - 0.9 ** step) /
+                                  (np.sqrt(squares[i] / (1 - 0.999 ** step)) + 1e-8))
+        return cls(classes, mean, std, *params)
+
+    def predict_proba(self, x):
+        """(T, classes) softmax probabilities"""
+        h = np.maximum(((x - self.mean) / self.std).astype(np.float32) @ self.w1 + self.b1, 0.0)
+        logits = h @ self.w2 + self.b2
+        p = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return p / p.sum(axis=1, keepdims=True)
+
+    def arrays(self):
+        return {'mean': self.mean, 'std': self.std, 'w1': self.w1, 'b1': self.b1, 'w2': self.w2, 'b2': self.b2}
+
+    @classmethod
+    def from_arrays(cls, classes, data):
+        return cls(classes, data['mean'], data['std'], data['w1'], data['b1'], data['w2'], data['b2'])
+
+
+CLASSIFIERS = {cls.kind: cls for cls in (KNNPoseClassifier, MLPPoseClassifier)}
+
+
+def predict(model, landmarks, chunk=4096):
+    """(classes, confidences) of (T, 21, 3) landmarks, in chunks (the kNN distance matrix is T x points)"""
+    best, confidence = np.zeros(len(landmarks), np.int64), np.zeros(len(landmarks))
+    for start in range(0, len(landmarks), chunk):
+        proba = model.predict_proba(features(landmarks[start:start + chunk]))
+        rows = slice(start, start + len(proba))
+        best[rows] = proba.argmax(axis=1)
+        confidence[rows] = proba[np.arange(len(proba)), best[rows]]
+    return best, confidence
+
+
+def predict_one(model, lm_list):
+    """(class index, confidence) of one HandTracker lm_list"""
+    proba = model.predict_proba(features(landmark_array(lm_list)))[0]
+    best = int(proba.argmax())
+    return best, float(proba[best])
+
+
+def save(model, path):
+    np.savez_compressed(path, kind=model.kind, classes=np.array(model.classes), **model.arrays())
+
+
+def load(path):
+    with np.load(path) as data:
+        return CLASSIFIERS[str(data['kind'])].from_arrays([str(c) for c in data['classes']], data)
+
+
+# --- Training from recorded sessions ---
+
+def labelled_frames(path, pose=None):
+    """
+    (landmarks (T, 21, 3), pose names (T,)) of the hand frames of a session or video.
+    pose labels every frame; otherwise labels come from the session's recorded gestures.
+    """
+    from gesture_recognizer import GESTURE_POSES
+    from replay import load_frames
+    from session_recorder import SessionReader, GESTURES, HAND_NONE
+
+    if pose is not None:
+        frames, _ = load_frames(path)
+        hands = [lm_list for _, lm_list in frames if lm_list]
+        landmarks = np.array([[lm[1:4] for lm in lm_list[:21]] for lm_list in hands]).reshape(-1, 21, 3)
+        return landmarks, np.array([pose] * len(landmarks), dtype=object)
+
+    records = SessionReader(path).frames()
+    names = [GESTURE_POSES.get(GESTURES[g]) for g in records['gesture']]
+    keep = (records['hand'] != HAND_NONE) & np.array([name is not None for name in names], bool)
+    return (records['landmarks'][keep].astype(np.float64),
+            np.array([name for name, k in zip(names, keep) if k], dtype=object))
+
+
+def train(x, y_names, kind='mlp', validation=0.2, seed=0, **options):
+    """Fit a classifier on features and pose names; returns (model, validation accuracy or None)"""
+    classes = sorted(set(y_names))
+    y = np.array([classes.index(name) for name in y_names])
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(x))
+    held_out = order[:int(len(x) * validation)]
+    fit_rows = order[len(held_out):]
+    model = CLASSIFIERS[kind].fit(x[fit_rows], y[fit_rows], classes, seed=seed, **options)
+    accuracy = None
+    if len(held_out):
+        accuracy = float((model.predict_proba(x[held_out]).argmax(axis=1) == y[held_out]).mean())
+    return model, accuracy
+
+
+def parse_session(text):
+    """SESSION or SESSION=POSE"""
+    from gesture_recognizer import POSE_NAMES
+    path, _, pose = text.rpartition('=') if '=' in text else (text, '', '')
+    if pose and pose not in POSE_NAMES.values():
+        raise argparse.ArgumentTypeError(f"Unknown pose {pose!r}; one of {', '.join(POSE_NAMES.values())}")
+    return path, pose or None
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Train a hand pose classifier from recorded sessions')
+    parser.add_argument('sessions', nargs='+', type=parse_session, metavar='SESSION[=POSE]',
+                        help='Session recordings (.hgcs) or videos; =POSE labels all their hand frames')
+    parser.add_argument('--kind', choices=sorted(CLASSIFIERS), default='mlp', help='Classifier type')
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help='Neighbours (knn)')
+    parser.add_argument('--points', type=int, default=DEFAULT_KNN_POINTS, help='Index points per class (knn)')
+    parser.add_argument('--hidden', type=int, default=DEFAULT_HIDDEN, help='Hidden units (mlp)')
+    parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS, help='Training epochs (mlp)')
+    parser.add_argument('--validation', type=float, default=0.2, help='Fraction of frames held out for accuracy')
+    parser.add_argument('--output', default='pose_model.npz', help='Model file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    landmarks, labels = [], []
+    for path, pose in args.sessions:
+        lm, names = labelled_frames(path, pose)
+        print(f"{path}: {len(lm)} frames" + (f" of {pose}" if pose else " (labels from recorded gestures)"))
+        landmarks.append(lm)
+        labels.append(names)
+    landmarks, labels = np.concatenate(landmarks), np.concatenate(labels)
+    if not len(landmarks):
+        print("No labelled hand frames")
+        return 1
+
+    options = ({'k': args.k, 'points_per_class': args.points} if args.kind == 'knn'
+               else {'hidden': args.hidden, 'epochs': args.epochs})
+    x = features(landmarks)
+    model, accuracy = train(x, labels, args.kind, args.validation, **options)
+    save(model, args.output)
+
+    sample = landmarks[:1]
+    start = time.perf_counter()
+    for _ in range(200):
+        model.predict_proba(features(sample))
+    per_frame = (time.perf_counter() - start) / 200
+    counts = ', '.join(f"{name} {int((labels == name).sum())}" for name in model.classes)
+    print(f"Trained {args.kind} on {len(x)} frames ({counts})")
+    if accuracy is not None:
+        print(f"Validation accuracy: {accuracy:.1%}")
+    print(f"Prediction: {per_frame * 1e6:.0f} us per frame")
+    print(f"Saved {args.output}; set POSE_CLASSIFIER = {args.output!r} in config.py to use it")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Adaptive quality controller.
+
+Watches end-to-end frame latency and steps through QUALITY_LEVELS (best
+first) to keep it under TARGET_LATENCY_MS. Each level sets the inference
+resolution, the MediaPipe model complexity, how many frames share one
+inference, and how often the window is redrawn. Hysteresis keeps it from
+oscillating: the degrade and upgrade thresholds are apart, every change
+is held for a minimum number of frames, and moving back up waits longer
+than moving down.
+"""
+
+from collections import deque
+
+import config
+
+
+class AdaptiveQualityController:
+    def __init__(self, apply_level, levels=None, target_latency_ms=None,
+                 degrade_ratio=None, upgrade_ratio=None, hold_frames=None, upgrade_hold_frames=None,
+                 log=print):
+        """
+        apply_level: callback taking a level dict; applies its settings to the app.
+        log: called with a message for every decision (None to stay quiet).
+        """
+        self.apply_level = apply_level
+        self.levels = config.QUALITY_LEVELS if levels is None else levels
+        self.target = (config.TARGET_LATENCY_MS if target_latency_ms is None else target_latency_ms) / 1000.0
+        self.degrade_ratio = config.QUALITY_DEGRADE_RATIO if degrade_ratio is None else degrade_ratio
+        self.upgrade_ratio = config.QUALITY_UPGRADE_RATIO if upgrade_ratio is None else upgrade_ratio
+        self.hold_frames = config.QUALITY_HOLD_FRAMES if hold_frames is None else hold_frames
+        self.upgrade_hold_frames = (config.QUALITY_UPGRADE_HOLD_FRAMES
+                                    if upgrade_hold_frames is None else upgrade_hold_frames)
+        self.log = log
+        if self.upgrade_ratio >= self.degrade_ratio:
+            raise ValueError("Upgrade ratio must be below the degrade ratio (hysteresis)")
+
+        self.level = 0
+        self.latency = None  # Exponentially smoothed latency in seconds
+        self.frames_since_change = 0
+        self.decisions = deque(maxlen=100)  # (frame, old level, new level, latency) history
+        self.frame = 0
+        self.apply_level(self.levels[self.level])
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def observe(self, latency):
+        """Feed one frame's end-to-end latency (seconds); may change the level"""
+        self.frame += 1
+        self.frames_since_change += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += 0.1 * (latency - self.latency)
+
+        if self.frames_since_change < self.hold_frames:
+            return
+        if self.latency > self.target * self.degrade_ratio and self.level < len(self.levels) - 1:
+            self._change(self.level + 1, "over")
+        elif (self.latency < self.target * self.upgrade_ratio and self.level > 0 and
+              self.frames_since_change >= self.upgrade_hold_frames):
+            self._change(self.level - 1, "under")
+
+    def _change(self, new_level, direction):
+        old_level = self.level
+        self.level = new_level
+        self.frames_since_change = 0
+        self.decisions.append((self.frame, old_level, new_level, self.latency))
+        self.apply_level(self.levels[new_level])
+        if self.log:
+            threshold = self.degrade_ratio if direction == "over" else self.upgrade_ratio
+            self.log(f"Quality: level {old_level} -> {new_level} (latency {self.latency * 1000:.1f}ms "
+                     f"{direction} {self.target * threshold * 1000:.1f}ms) {self.levels[new_level]}")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Faster-than-real-time replay of recorded sessions.
+
+Feeds the landmarks of a session recording (session_recorder.py) through
+GestureRecognizer.recognize - cursor smoothing, scroll engine and all -
+with a NullMouseBackend instead of the real mouse. Every frame is
+recognized at its recorded capture timestamp (and the backend logs
+actions on the same clock), so hold times, debouncing and momentum
+behave exactly as they did live while the replay runs as fast as the
+CPU allows.
+
+    python replay.py sessions/session-20250101-120000.hgcs
+    python replay.py session.hgcs --set PINCH_ENTER_RATIO=0.3 --json report.json
+    python replay.py session.hgcs --compare HAND_SCALE_NORMALISATION=False   # Churn before/after
+    python replay.py recording.mp4    # landmarks tracked once, then cached (landmark_cache.py)
+"""
+
+import argparse
+import ast
+import contextlib
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+import config
+from event_log import EventLog
+from gesture_recognizer import (GestureRecognizer, GESTURE_DRAG, GESTURE_LEFT_CLICK_READY,
+                                GESTURE_LEFT_CLICK_ACTION, GESTURE_RIGHT_CLICK_READY,
+                                GESTURE_RIGHT_CLICK_ACTION)
+from hand_tracker import HandTracker
+from mouse_controller import (MouseController, NullMouseBackend, ACTION_PRESS, ACTION_RELEASE,
+                              ACTION_CLICK, ACTION_SCROLL, ACTION_MOVE, BUTTON_LEFT, BUTTON_RIGHT)
+from session_recorder import SessionReader, MAGIC
+
+DEFAULT_FRAME_SIZE = (640, 480)
+
+
+class ReplayClock:
+    """Clock that returns whatever time the replay last set"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@contextlib.contextmanager
+def config_overrides(overrides):
+    """Temporarily set config values (e.g. {'PINCH_THRESHOLD_CLICK': 0.05})"""
+    saved = {}
+    for name, value in (overrides or {}).items():
+        if not hasattr(config, name):
+            raise KeyError(f"Unknown config setting {name}")
+        saved[name] = getattr(config, name)
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def _stats(values):
+    """count / mean / p50 / max of a list of durations, in milliseconds"""
+    if not values:
+        return {'count': 0}
+    values = np.asarray(values) * 1000
+    return {'count': int(len(values)), 'mean_ms': float(values.mean()),
+            'p50_ms': float(np.percentile(values, 50)), 'max_ms': float(values.max())}
+
+
+def replay(frames, overrides=None, frame_size=DEFAULT_FRAME_SIZE, frame_gestures=None):
+    """
+    Run the recognizer over (capture time, lm_list) pairs.
+    frame_gestures: list to append the gesture of every frame to.
+    Returns (report dict, NullMouseBackend with the actions it produced).
+    """
+    clock = ReplayClock()
+    backend = NullMouseBackend(clock=clock)
+    width, height = frame_size
+    gestures = {}
+    transitions = []  # (time, gesture) whenever the recognized gesture changes
+    frame_count = hand_frames = 0
+    first_time = last_time = None
+
+    with config_overrides(overrides):
+        quiet = EventLog(mode="off")
+        recognizer = GestureRecognizer(MouseController(backend=backend, screen_size=(1920, 1080), event_log=quiet),
+                                       HandTracker.__new__(HandTracker),  # fingers_up and distances need no model
+                                       clock=clock, event_log=quiet)
+        recognize = recognizer.recognize
+        previous = None
+        start = time.perf_counter()
+        for capture_time, lm_list in frames:
+            clock.now = capture_time
+            gesture = recognize(lm_list, width, height, capture_time)
+            if frame_gestures is not None:
+                frame_gestures.append(gesture)
+            if gesture != previous:
+                gestures[gesture] = gestures.get(gesture, 0) + 1
+                transitions.append((capture_time, gesture))
+                previous = gesture
+            frame_count += 1
+            hand_frames += bool(lm_list)
+            if first_time is None:
+                first_time = capture_time
+            last_time = capture_time
+        elapsed = time.perf_counter() - start
+
+    duration = (last_time - first_time) if frame_count > 1 else 0.0
+    report = {
+        'frames': frame_count,
+        'hand_frames': hand_frames,
+        'session_seconds': duration,
+        'replay_seconds': elapsed,
+        'fps': frame_count / elapsed if elapsed > 0 else 0.0,
+        'speedup': duration / elapsed if elapsed > 0 else 0.0,
+        'gestures': gestures,
+        'actions': _action_report(backend),
+        'timings': _timing_report(backend, transitions),
+        'churn': _churn_report(backend, transitions, duration),
+    }
+    return report, backend
+
+
+def _action_report(backend):
+    counts = {'moves': 0, 'left_clicks': 0, 'right_clicks': 0, 'drags': 0, 'scroll_events': 0}
+    for _, action, a, _ in backend.records():
+        if action == ACTION_MOVE:
+            counts['moves'] += 1
+        elif action == ACTION_CLICK:
+            counts['left_clicks' if a == BUTTON_LEFT else 'right_clicks'] += 1
+        elif action == ACTION_PRESS and a == BUTTON_LEFT:
+            counts['drags'] += 1
+        elif action == ACTION_SCROLL:
+            counts['scroll_events'] += 1
+    return counts
+
+
+def _timing_report(backend, transitions):
+    """Drag durations, time between clicks, and ready-to-action delay of clicks"""
+    drag_durations = []
+    click_times = []
+    pressed_at = None
+    for t, action, a, _ in backend.records():
+        if action == ACTION_PRESS and a == BUTTON_LEFT:
+            pressed_at = t
+        elif action == ACTION_RELEASE and a == BUTTON_LEFT and pressed_at is not None:
+            drag_durations.append(t - pressed_at)
+            pressed_at = None
+        elif action == ACTION_CLICK and a in (BUTTON_LEFT, BUTTON_RIGHT):
+            click_times.append(t)
+
+    ready_to_click = []
+    ready_at = {}
+    for t, gesture in transitions:
+        if gesture in (GESTURE_LEFT_CLICK_READY, GESTURE_RIGHT_CLICK_READY):
+            ready_at[gesture] = t
+        elif gesture == GESTURE_LEFT_CLICK_ACTION and GESTURE_LEFT_CLICK_READY in ready_at:
+            ready_to_click.append(t - ready_at.pop(GESTURE_LEFT_CLICK_READY))
+        elif gesture == GESTURE_RIGHT_CLICK_ACTION and GESTURE_RIGHT_CLICK_READY in ready_at:
+            ready_to_click.append(t - ready_at.pop(GESTURE_RIGHT_CLICK_READY))
+
+    return {
+        'drag_duration': _stats(drag_durations),
+        'click_interval': _stats(list(np.diff(click_times))),
+        'click_decision': _stats(ready_to_click),
+        'drag_starts': sum(1 for _, g in transitions if g == GESTURE_DRAG),
+    }
+
+
+def _churn_report(backend, transitions, duration):
+    """
+    Button actions (presses, releases, clicks) and gesture changes per minute of
+    session: a recognizer flickering between poses shows up as high rates
+    """
+    buttons = sum(1 for _, action, _, _ in backend.records() if action in (ACTION_PRESS, ACTION_RELEASE, ACTION_CLICK))
+    minutes = duration / 60.0
+    return {
+        'button_actions': buttons,
+        'gesture_changes': len(transitions),
+        'actions_per_minute': buttons / minutes if minutes > 0 else 0.0,
+        'changes_per_minute': len(transitions) / minutes if minutes > 0 else 0.0,
+    }
+
+
+def is_session(path):
+    """Whether path is a session recording (anything else is taken to be a video)"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_frames(path):
+    """
+    (capture time, lm_list) pairs and frame size of a session recording,
+    or of a video file (tracked once, then read from the landmark cache)
+    """
+    if not is_session(path):
+        from landmark_cache import LandmarkCache
+        capture = cv2.VideoCapture(path)
+        frame_size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)) or DEFAULT_FRAME_SIZE[0],
+                      int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) or DEFAULT_FRAME_SIZE[1])
+        capture.release()
+        return LandmarkCache().frames(path), frame_size
+
+    reader = SessionReader(path)
+    camera = reader.metadata.get('camera') or {}
+    frame_size = (camera.get('width') or DEFAULT_FRAME_SIZE[0], camera.get('height') or DEFAULT_FRAME_SIZE[1])
+    return list(reader.landmark_lists()), frame_size
+
+
+def print_report(name, report, baseline=None, compare=None):
+    """baseline: report of the same session replayed with the `compare` overrides"""
+    print(f"\n{name}")
+    print(f"  {report['frames']} frames ({report['hand_frames']} with a hand), "
+          f"{report['session_seconds']:.1f}s of session replayed in {report['replay_seconds']:.2f}s "
+          f"({report['fps']:.0f} FPS, {report['speedup']:.0f}x real time)")
+    print("  Gestures: " + ", ".join(f"{g} {n}" for g, n in sorted(report['gestures'].items())))
+    print("  Actions: " + ", ".join(f"{k} {v}" for k, v in report['actions'].items()))
+    churn = report['churn']
+    line = (f"  Churn: {churn['actions_per_minute']:.1f} button actions/min, "
+            f"{churn['changes_per_minute']:.1f} gesture changes/min")
+    if baseline is not None:
+        setting = ", ".join(f"{k}={v}" for k, v in compare.items())
+        line += (f" (with {setting}: {baseline['churn']['actions_per_minute']:.1f} actions/min, "
+                 f"{baseline['churn']['changes_per_minute']:.1f} changes/min)")
+    print(line)
+    for timing, stats in report['timings'].items():
+        if isinstance(stats, dict) and stats['count']:
+            print(f"  {timing}: {stats['count']}x, mean {stats['mean_ms']:.0f} ms, "
+                  f"p50 {stats['p50_ms']:.0f} ms, max {stats['max_ms']:.0f} ms")
+
+
+def parse_override(text):
+    """NAME=VALUE with a Python literal value (strings may be left unquoted)"""
+    name, _, value = text.partition('=')
+    if not value:
+        raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got {text!r}")
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    return name.strip().upper(), value
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Replay recorded sessions through the gesture recognizer')
+    parser.add_argument('sessions', nargs='+', help='Session recordings (.hgcs) or recorded videos')
+    parser.add_argument('--set', dest='overrides', action='append', type=parse_override, default=[],
+                        metavar='NAME=VALUE', help='Override a config setting, e.g. PINCH_ENTER_RATIO=0.3')
+    parser.add_argument('--compare', action='append', type=parse_override, default=[], metavar='NAME=VALUE',
+                        help='Also replay with this setting changed and compare churn, '
+                             'e.g. HAND_SCALE_NORMALISATION=False')
+    parser.add_argument('--json', help='Write the reports to this file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    overrides = dict(args.overrides)
+    compare = dict(args.compare)
+    reports = {}
+    baselines = {}
+    for path in args.sessions:
+        frames, frame_size = load_frames(path)
+        reports[path], _ = replay(frames, overrides, frame_size)
+        if compare:
+            baselines[path], _ = replay(frames, dict(overrides, **compare), frame_size)
+        print_report(path, reports[path], baselines.get(path), compare)
+    if args.json:
+        with open(args.json, 'w') as f:
+            output = {'overrides': overrides, 'reports': reports}
+            if compare:
+                output.update(compare=compare, baselines=baselines)
+            json.dump(output, f, indent=2)
+        print(f"\nReport written to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
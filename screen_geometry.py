@@ -0,0 +1,254 @@
+"""
+Screen geometry discovery for the mouse controller.
+
+Finds every monitor rectangle on the virtual desktop without creating a
+Tk window, caches the result on disk and precomputes the mapping from
+normalised hand coordinates (0.0 to 1.0) to desktop pixels.
+
+Lookup order:
+  1. HGC_SCREEN_GEOMETRY environment variable, e.g. "1920x1080+0+0,2560x1440+1920+0"
+  2. Cached geometry file (skipped when refresh=True or when it is stale)
+  3. Platform probe: Win32 EnumDisplayMonitors, or Xlib with XRandR monitors
+  4. Tk primary screen size
+  5. Default 1920x1080
+"""
+
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+import config
+
+ENV_VAR = "HGC_SCREEN_GEOMETRY"
+
+Monitor = namedtuple("Monitor", "x y width height primary")
+
+
+class ScreenGeometry:
+    def __init__(self, monitors, source="unknown", target=None):
+        """
+        monitors: list of Monitor rectangles in desktop pixels.
+        source: where the geometry came from (for diagnostics).
+        target: what normalised coordinates map onto - "all" for the whole
+                virtual desktop, "primary", or a monitor index.
+        """
+        if not monitors:
+            raise ValueError("ScreenGeometry needs at least one monitor")
+        self.monitors = list(monitors)
+        self.source = source
+
+        # Bounding box of the virtual desktop
+        self.left = min(m.x for m in self.monitors)
+        self.top = min(m.y for m in self.monitors)
+        self.right = max(m.x + m.width for m in self.monitors)
+        self.bottom = max(m.y + m.height for m in self.monitors)
+        self.width = self.right - self.left
+        self.height = self.bottom - self.top
+
+        self.set_target(config.SCREEN_TARGET if target is None else target)
+
+    @classmethod
+    def from_size(cls, width, height, source="fixed"):
+        return cls([Monitor(0, 0, width, height, True)], source)
+
+    @property
+    def primary(self):
+        for monitor in self.monitors:
+            if monitor.primary:
+                return monitor
+        return self.monitors[0]
+
+    def target_rect(self, target):
+        """(x, y, width, height) of the area a target maps onto"""
+        if target == "all":
+            return self.left, self.top, self.width, self.height
+        if target == "primary":
+            monitor = self.primary
+        else:
+            monitor = self.monitors[int(target) % len(self.monitors)]
+        return monitor.x, monitor.y, monitor.width, monitor.height
+
+    def set_target(self, target):
+        """Precompute the normalised-to-pixel mapping for a target area"""
+        self.target = target
+        self.map_x, self.map_y, self.map_width, self.map_height = self.target_rect(target)
+
+    def to_screen(self, norm_x, norm_y):
+        """Map normalised (0.0 to 1.0) coordinates onto the target area"""
+        return (self.map_x + norm_x * self.map_width,
+                self.map_y + norm_y * self.map_height)
+
+    def monitor_at(self, x, y):
+        """Return the monitor containing a desktop pixel, or None"""
+        for monitor in self.monitors:
+            if (monitor.x <= x < monitor.x + monitor.width and
+                    monitor.y <= y < monitor.y + monitor.height):
+                return monitor
+        return None
+
+    def to_dict(self):
+        return {'monitors': [list(m) for m in self.monitors], 'source': self.source}
+
+    def __repr__(self):
+        spec = ",".join(f"{m.width}x{m.height}+{m.x}+{m.y}" for m in self.monitors)
+        return f"ScreenGeometry({spec}, source={self.source!r})"
+
+
+def parse_geometry_spec(spec):
+    """
+    Parse "WxH+X+Y[,WxH+X+Y...]" into monitors; the first one is primary.
+    The offset part is optional and defaults to +0+0.
+    """
+    monitors = []
+    for i, part in enumerate(p.strip() for p in spec.split(",") if p.strip()):
+        size, _, offset = part.partition("+")
+        width, height = (int(v) for v in size.lower().split("x"))
+        x, y = (int(v) for v in offset.split("+")) if offset else (0, 0)
+        monitors.append(Monitor(x, y, width, height, i == 0))
+    return monitors
+
+
+def _display_key():
+    """Identifies the display setup a cached geometry belongs to"""
+    return f"{sys.platform}:{os.environ.get('DISPLAY', '')}"
+
+
+def _cache_path():
+    return os.path.expanduser(config.SCREEN_GEOMETRY_CACHE)
+
+
+def load_cached_geometry():
+    """Load geometry from the cache file if it is fresh and for this display"""
+    try:
+        with open(_cache_path(), "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('display') != _display_key():
+        return None
+    if time.time() - data.get('saved_at', 0) > config.SCREEN_GEOMETRY_CACHE_MAX_AGE:
+        return None
+    try:
+        monitors = [Monitor(*m) for m in data['monitors']]
+        return ScreenGeometry(monitors, source="cache")
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def save_cached_geometry(geometry):
+    path = _cache_path()
+    data = geometry.to_dict()
+    data['display'] = _display_key()
+    data['saved_at'] = time.time()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f)
+    except OSError as e:
+        print(f"Warning: Could not cache screen geometry: {e}")
+
+
+def _probe_win32():
+    import ctypes
+    from ctypes import wintypes
+
+    class MONITORINFO(ctypes.Structure):
+        _fields_ = [("cbSize", wintypes.DWORD), ("rcMonitor", wintypes.RECT),
+                    ("rcWork", wintypes.RECT), ("dwFlags", wintypes.DWORD)]
+
+    user32 = ctypes.windll.user32
+    monitors = []
+
+    def callback(hmonitor, hdc, rect, data):
+        info = MONITORINFO()
+        info.cbSize = ctypes.sizeof(MONITORINFO)
+        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(info)):
+            r = info.rcMonitor
+            monitors.append(Monitor(r.left, r.top, r.right - r.left, r.bottom - r.top,
+                                    bool(info.dwFlags & 1)))  # MONITORINFOF_PRIMARY
+        return True
+
+    proc = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC,
+                              ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+    user32.EnumDisplayMonitors(None, None, proc(callback), 0)
+    return monitors
+
+
+def _probe_xlib():
+    if not os.environ.get("DISPLAY"):
+        return []
+    from Xlib import display as xdisplay
+
+    disp = xdisplay.Display()
+    try:
+        screen = disp.screen()
+        if disp.has_extension("RANDR"):
+            reply = screen.root.xrandr_get_monitors()
+            monitors = [Monitor(m.x, m.y, m.width_in_pixels, m.height_in_pixels, bool(m.primary))
+                        for m in reply.monitors]
+            if monitors:
+                return monitors
+        return [Monitor(0, 0, screen.width_in_pixels, screen.height_in_pixels, True)]
+    finally:
+        disp.close()
+
+
+def _probe_tk():
+    import tkinter as tk
+    root = tk.Tk()
+    try:
+        return [Monitor(0, 0, root.winfo_screenwidth(), root.winfo_screenheight(), True)]
+    finally:
+        root.destroy()
+
+
+def probe_monitors():
+    """Ask the platform for monitor rectangles; returns (monitors, source)"""
+    probes = [("win32", _probe_win32)] if sys.platform == "win32" else [("xlib", _probe_xlib)]
+    probes.append(("tk", _probe_tk))
+    for name, probe in probes:
+        try:
+            monitors = probe()
+        except Exception as e:
+            print(f"Screen geometry probe '{name}' failed: {e}")
+            continue
+        if monitors:
+            return monitors, name
+    return [], None
+
+
+def get_screen_geometry(refresh=False):
+    """
+    Return the ScreenGeometry for this machine.
+    refresh: ignore the cache file and probe the platform again.
+    """
+    spec = os.environ.get(ENV_VAR)
+    if spec:
+        try:
+            return ScreenGeometry(parse_geometry_spec(spec), source="env")
+        except ValueError as e:
+            print(f"Warning: Ignoring invalid {ENV_VAR}={spec!r}: {e}")
+
+    if not refresh:
+        geometry = load_cached_geometry()
+        if geometry is not None:
+            return geometry
+
+    monitors, source = probe_monitors()
+    if not monitors:
+        print("Warning: Could not detect screen geometry. Using default 1920x1080.")
+        return ScreenGeometry.from_size(1920, 1080, source="default")
+
+    geometry = ScreenGeometry(monitors, source=source)
+    save_cached_geometry(geometry)
+    return geometry
+
+
+if __name__ == '__main__':
+    geometry = get_screen_geometry(refresh="--refresh" in sys.argv)
+    print(geometry)
+    print(f"Virtual desktop: {geometry.width}x{geometry.height} at ({geometry.left}, {geometry.top})")
+    for i, m in enumerate(geometry.monitors):
+        print(f"  Monitor {i}: {m.width}x{m.height}+{m.x}+{m.y}{' (primary)' if m.primary else ''}")
@@ -0,0 +1,125 @@
+"""
+Continuous scrolling for the pinky scroll gesture.
+
+Instead of one wheel tick each time the pinky crosses SCROLL_SENSITIVITY,
+pinky movement is integrated every frame into fractional scroll lines.
+Whatever has accumulated is sent as one batched scroll per frame, in
+steps of SCROLL_RESOLUTION (rounded to whole lines for mouse backends
+that can't scroll finer, where a fractional amount would be truncated to
+nothing). When the gesture ends, scrolling coasts on
+with the last velocity and slows down with exponential friction, like
+touchpad momentum scrolling.
+"""
+
+import math
+
+import config
+
+
+class ScrollEngine:
+    def __init__(self, gain=None, deadzone=None, friction=None, min_velocity=None, resolution=None,
+                 backend_resolution=0.0):
+        """
+        gain: scroll lines per unit of pinky movement.
+        deadzone: per-frame pinky movement ignored as landmark noise.
+        Movement is in frame units, or in whatever units update() is given a scale in.
+        friction: momentum decay rate (1/s); 0 disables momentum.
+        min_velocity: lines/s below which momentum stops.
+        resolution: smallest scroll amount sent to the mouse, in lines.
+        backend_resolution: scroll granularity of the mouse backend (MouseController.scroll_resolution);
+                            resolution is rounded to a multiple of it.
+        """
+        self.gain = config.SCROLL_GAIN if gain is None else gain
+        self.deadzone = config.SCROLL_DEADZONE if deadzone is None else deadzone
+        self.friction = config.SCROLL_MOMENTUM_FRICTION if friction is None else friction
+        self.min_velocity = config.SCROLL_MIN_VELOCITY if min_velocity is None else min_velocity
+        self.resolution = config.SCROLL_RESOLUTION if resolution is None else resolution
+        if backend_resolution > 0:
+            self.resolution = backend_resolution * max(1, round(self.resolution / backend_resolution))
+
+        self.active = False
+        self.coasting = False
+        self.ref_y = None
+        self.last_time = None
+        self.velocity = 0.0  # lines per second, smoothed
+        self.pending = 0.0  # accumulated lines not yet sent
+
+        # Throughput statistics
+        self.lines_emitted = 0.0
+        self.active_time = 0.0
+
+    def start(self, pinky_y, now):
+        """Begin scrolling with the pinky at pinky_y"""
+        self.active = True
+        self.coasting = False
+        self.ref_y = pinky_y
+        self.last_time = now
+        self.velocity = 0.0
+
+    def update(self, pinky_y, now, scale=1.0):
+        """
+        Integrate pinky movement; returns the scroll amount to send this frame.
+        scale: size of the movement unit in frame units (the palm size with hand scale normalisation).
+        """
+        dt = now - self.last_time
+        delta = (pinky_y - self.ref_y) / scale
+        self.ref_y = pinky_y
+        self.last_time = now
+        self.active_time += max(dt, 0.0)
+
+        if abs(delta) < self.deadzone:
+            delta = 0.0
+        lines = delta * self.gain
+        if dt > 0:
+            # Smoothed velocity, used for momentum once the gesture ends
+            self.velocity = 0.5 * self.velocity + 0.5 * (lines / dt)
+        return self._emit(lines)
+
+    def update_run(self, pinky_ys, times, scales):
+        """update() for each of a run of frames; returns the amount to send on each (batch evaluation)"""
+        update = self.update
+        return [update(pinky_y, now, scale) for pinky_y, now, scale in zip(pinky_ys, times, scales)]
+
+    def release(self, now):
+        """The scroll gesture ended; coast on with the current velocity"""
+        self.active = False
+        self.last_time = now
+        self.coasting = self.friction > 0 and abs(self.velocity) >= self.min_velocity
+
+    def coast(self, now):
+        """Advance momentum scrolling; returns the scroll amount to send this frame"""
+        dt = now - self.last_time
+        self.last_time = now
+        if dt <= 0:
+            return 0.0
+        self.active_time += dt
+
+        # Exact integral of v * exp(-friction * t) over the frame
+        decay = math.exp(-self.friction * dt)
+        lines = self.velocity * (1.0 - decay) / self.friction
+        self.velocity *= decay
+        if abs(self.velocity) < self.min_velocity:
+            self.stop()
+        return self._emit(lines)
+
+    def stop(self):
+        """Stop scrolling and momentum immediately, dropping any sub-step remainder"""
+        self.active = False
+        self.coasting = False
+        self.velocity = 0.0
+        self.pending = 0.0
+
+    def _emit(self, lines):
+        """Quantise the accumulated amount to the scroll resolution"""
+        self.pending += lines
+        steps = int(self.pending / self.resolution)  # Truncates toward zero
+        if steps == 0:
+            return 0.0
+        amount = steps * self.resolution
+        self.pending -= amount
+        self.lines_emitted += abs(amount)
+        return amount
+
+    @property
+    def lines_per_second(self):
+        return self.lines_emitted / self.active_time if self.active_time > 0 else 0.0
@@ -0,0 +1,326 @@
+"""
+Landmark session recorder.
+
+Records what the tracker saw during a session - the first hand's 21
+landmarks as float32 (21, 3), handedness and its score, the capture
+timestamp - plus the gesture changes and mouse actions that came out of
+it, so a real session can be analysed or replayed later.
+
+File layout (little-endian):
+
+    header   b"HGCSESS1", uint32 metadata length, JSON metadata
+    chunk    b"CHNK", uint32 frame count, uint32 event count,
+             frame records (FRAME_DTYPE), event records (EVENT_DTYPE)
+    chunk    ...
+
+Records are fixed-size numpy structured arrays, so every chunk can be
+memory-mapped straight from the file (SessionReader). The pipeline stage
+only copies a frame into a preallocated chunk buffer; full chunks are
+written by a background thread through a bounded queue, so memory stays
+bounded and a slow disk drops chunks instead of stalling the pipeline.
+At 30 FPS a session takes roughly 9 KB/s.
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+import config
+from gesture_recognizer import (GESTURE_NONE, GESTURE_IDLE, GESTURE_MOVE, GESTURE_DRAG,
+                                GESTURE_LEFT_CLICK_READY, GESTURE_LEFT_CLICK_ACTION,
+                                GESTURE_RIGHT_CLICK_READY, GESTURE_RIGHT_CLICK_ACTION,
+                                GESTURE_SCROLL_READY, GESTURE_SCROLL_UP_ACTION,
+                                GESTURE_SCROLL_DOWN_ACTION, GESTURE_CLUTCH, GESTURE_STATES)
+from mouse_controller import ACTION_MOVE, ACTION_PRESS, ACTION_RELEASE, ACTION_CLICK, ACTION_SCROLL
+
+MAGIC = b"HGCSESS1"
+CHUNK_MAGIC = b"CHNK"
+_CHUNK_HEADER = struct.Struct("<4sII")
+
+FRAME_DTYPE = np.dtype([
+    ('t', '<f8'),                    # Capture time (perf_counter seconds)
+    ('index', '<u4'),                # Frame index
+    ('hand', 'i1'),                  # HAND_NONE, HAND_LEFT, HAND_RIGHT or HAND_UNKNOWN
+    ('gesture', 'u1'),               # Index into GESTURES
+    ('score', '<f4'),                # Handedness score
+    ('landmarks', '<f4', (21, 3)),   # Normalised x, y, z
+])
+
+EVENT_DTYPE = np.dtype([
+    ('t', '<f8'),                    # Capture time of the frame that produced the event
+    ('index', '<u4'),                # Frame index
+    ('kind', 'u1'),                  # EVENT_GESTURE or EVENT_MOUSE
+    ('code', 'u1'),                  # Gesture index or mouse ACTION_* code
+    ('a', '<f4'),                    # Mouse action arguments (x, y / button / dx, dy)
+    ('b', '<f4'),
+])
+
+HAND_NONE = -1
+HAND_LEFT = 0
+HAND_RIGHT = 1
+HAND_UNKNOWN = 2  # Landmarks without handedness information
+_HANDEDNESS = {"Left": HAND_LEFT, "Right": HAND_RIGHT}
+
+EVENT_GESTURE = 0
+EVENT_MOUSE = 1
+
+GESTURES = [GESTURE_NONE, GESTURE_IDLE, GESTURE_MOVE, GESTURE_DRAG,
+            GESTURE_LEFT_CLICK_READY, GESTURE_LEFT_CLICK_ACTION,
+            GESTURE_RIGHT_CLICK_READY, GESTURE_RIGHT_CLICK_ACTION,
+            GESTURE_SCROLL_READY, GESTURE_SCROLL_UP_ACTION, GESTURE_SCROLL_DOWN_ACTION,
+            GESTURE_CLUTCH]
+# States added to the recognizer later get the next codes; codes in existing recordings stay valid
+GESTURES += [gesture for gesture in GESTURE_STATES if gesture not in GESTURES]
+_GESTURE_CODES = {name: i for i, name in enumerate(GESTURES)}
+_GESTURE_CODES[None] = _GESTURE_CODES[GESTURE_NONE]  # Frame not recognized
+
+# BufferedMouseBackend action names -> ACTION_* codes
+ACTION_CODES = {'move_to': ACTION_MOVE, 'press': ACTION_PRESS, 'release': ACTION_RELEASE,
+                'click': ACTION_CLICK, 'scroll': ACTION_SCROLL}
+
+
+def set_hand(record, lm_list, handedness=None):
+    """Fill the hand fields of a FRAME_DTYPE record from an lm_list and (label, score)"""
+    if lm_list:
+        record['landmarks'] = [lm[1:4] for lm in lm_list]
+        label, score = handedness or (None, 0.0)
+        record['hand'] = _HANDEDNESS.get(label, HAND_UNKNOWN)
+        record['score'] = score
+    else:
+        record['landmarks'] = 0.0
+        record['hand'] = HAND_NONE
+        record['score'] = 0.0
+
+
+def landmark_lists(records):
+    """Yield (time, lm_list) per FRAME_DTYPE record, lm_list in HandTracker [id, x, y, z] layout"""
+    for record in records:
+        if record['hand'] == HAND_NONE:
+            yield float(record['t']), []
+        else:
+            yield float(record['t']), [[i, float(x), float(y), float(z)]
+                                       for i, (x, y, z) in enumerate(record['landmarks'].tolist())]
+
+
+class _Chunk:
+    """Preallocated frame and event buffers for one chunk"""
+
+    def __init__(self, frames, events):
+        self.frames = np.zeros(frames, FRAME_DTYPE)
+        self.events = np.zeros(events, EVENT_DTYPE)
+        self.frame_count = 0
+        self.event_count = 0
+
+
+class SessionRecorder:
+    def __init__(self, path=None, chunk_frames=None, max_queued_chunks=None, metadata=None):
+        """
+        path: output file (a timestamped file in config.SESSION_DIR by default).
+        chunk_frames: frames per chunk; events get four slots per frame.
+        max_queued_chunks: full chunks waiting for the writer before new ones are dropped.
+        metadata: extra JSON-serialisable values stored in the header.
+        """
+        if path is None:
+            os.makedirs(config.SESSION_DIR, exist_ok=True)
+            path = os.path.join(config.SESSION_DIR, time.strftime("session-%Y%m%d-%H%M%S.hgcs"))
+        self.path = path
+        self.chunk_frames = chunk_frames or config.SESSION_CHUNK_FRAMES
+        self.chunk_events = self.chunk_frames * 4
+        self.queue = queue.Queue(maxsize=max_queued_chunks or config.SESSION_MAX_QUEUED_CHUNKS)
+        self.free = queue.Queue()   # Written chunks, reused instead of reallocated
+        self.chunk = self._new_chunk()
+        self.last_gesture = None
+        self.frames_recorded = 0
+        self.chunks_written = 0
+        self.chunks_dropped = 0
+        self.bytes_written = 0
+        self.error = None   # OSError that stopped the writer (disk full, file removed, ...)
+        self.closed = False
+
+        header = dict(metadata or {})
+        header.update({'version': 1, 'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       'wall_time': time.time(), 'perf_time': time.perf_counter(),
+                       'gestures': GESTURES})
+        header_bytes = json.dumps(header).encode('utf-8')
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        self.bytes_written = self.file.tell()
+
+        self.writer = threading.Thread(target=self._write_chunks, name="session-writer", daemon=True)
+        self.writer.start()
+
+    def _new_chunk(self):
+        try:
+            chunk = self.free.get_nowait()
+            chunk.frame_count = chunk.event_count = 0
+            return chunk
+        except queue.Empty:
+            return _Chunk(self.chunk_frames, self.chunk_events)
+
+    def record(self, frame, handedness=None):
+        """
+        Append one pipeline Frame (after recognition and actuation).
+        handedness: (label, score) of the first hand, e.g. ("Right", 0.98).
+        """
+        chunk = self.chunk
+        if chunk.event_count + len(frame.actions) + 1 > self.chunk_events:
+            self._flush()
+            chunk = self.chunk
+
+        record = chunk.frames[chunk.frame_count]
+        record['t'] = frame.capture_time
+        record['index'] = frame.index
+        try:
+            gesture = _GESTURE_CODES[frame.gesture]
+        except KeyError:
+            raise ValueError(f"Unknown gesture {frame.gesture!r}: not a state in GESTURE_STATES") from None
+        record['gesture'] = gesture
+        set_hand(record, frame.lm_list, handedness)
+        chunk.frame_count += 1
+
+        if frame.gesture != self.last_gesture:
+            self.last_gesture = frame.gesture
+            self._add_event(chunk, frame, EVENT_GESTURE, gesture)
+        for name, args in frame.actions:
+            self._add_event(chunk, frame, EVENT_MOUSE, ACTION_CODES[name], *args)
+
+        self.frames_recorded += 1
+        if chunk.frame_count == self.chunk_frames:
+            self._flush()
+
+    def _add_event(self, chunk, frame, kind, code, a=0.0, b=0.0):
+        event = chunk.events[chunk.event_count]
+        event['t'] = frame.capture_time
+        event['index'] = frame.index
+        event['kind'] = kind
+        event['code'] = code
+        event['a'] = a
+        event['b'] = b
+        chunk.event_count += 1
+
+    def _flush(self):
+        """Hand the current chunk to the writer and start a new one"""
+        chunk = self.chunk
+        if not chunk.frame_count and not chunk.event_count:
+            return
+        try:
+            if self.error is not None:
+                raise queue.Full  # Writer has stopped: nothing will drain the queue
+            self.queue.put_nowait(chunk)
+        except queue.Full:
+            # Writer can't keep up: drop this chunk rather than grow memory or stall
+            self.chunks_dropped += 1
+            chunk.frame_count = chunk.event_count = 0
+            return
+        self.chunk = self._new_chunk()
+
+    def _write_chunks(self):
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            frames = chunk.frames[:chunk.frame_count]
+            events = chunk.events[:chunk.event_count]
+            try:
+                self.file.write(_CHUNK_HEADER.pack(CHUNK_MAGIC, len(frames), len(events)))
+                self.file.write(frames.tobytes())
+                self.file.write(events.tobytes())
+                self.file.flush()
+            except (OSError, ValueError) as e:
+                # Stop writing; the reader ignores the truncated chunk and close() reports the error
+                self.error = e
+                break
+            self.bytes_written += _CHUNK_HEADER.size + frames.nbytes + events.nbytes
+            self.chunks_written += 1
+            self.free.put(chunk)
+
+    def _put_final(self, item):
+        """Blocking put that gives up once the writer has stopped; returns whether it was queued"""
+        while self.writer.is_alive():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def close(self):
+        """
+        Write the partial chunk and wait for the writer to finish.
+        Never hangs on a failed writer; returns the write error (also kept in self.error), or None.
+        """
+        if self.closed:
+            return self.error
+        self.closed = True
+        chunk = self.chunk
+        if chunk.frame_count or chunk.event_count:
+            # The final chunk must not be dropped while the writer is still working
+            if not self._put_final(chunk):
+                self.chunks_dropped += 1
+        self._put_final(None)
+        self.writer.join()
+        try:
+            self.file.close()
+        except OSError as e:
+            self.error = self.error or e
+        return self.error
+
+
+class SessionReader:
+    """Reads a session file; chunk arrays are memory-mapped, not loaded"""
+
+    def __init__(self, path):
+        self.path = path
+        self.chunks = []  # (frames memmap, events memmap)
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a session recording")
+            (length,) = struct.unpack("<I", f.read(4))
+            self.metadata = json.loads(f.read(length).decode('utf-8'))
+            offset = f.tell()
+            size = os.fstat(f.fileno()).st_size
+
+            while offset + _CHUNK_HEADER.size <= size:
+                f.seek(offset)
+                magic, n_frames, n_events = _CHUNK_HEADER.unpack(f.read(_CHUNK_HEADER.size))
+                end = offset + _CHUNK_HEADER.size + n_frames * FRAME_DTYPE.itemsize + n_events * EVENT_DTYPE.itemsize
+                if magic != CHUNK_MAGIC or end > size:
+                    break  # Truncated final chunk (e.g. the app was killed mid-write)
+                offset += _CHUNK_HEADER.size
+                frames = self._map(FRAME_DTYPE, offset, n_frames)
+                offset += n_frames * FRAME_DTYPE.itemsize
+                events = self._map(EVENT_DTYPE, offset, n_events)
+                offset += n_events * EVENT_DTYPE.itemsize
+                self.chunks.append((frames, events))
+        self.gestures = self.metadata.get('gestures', GESTURES)
+
+    def _map(self, dtype, offset, count):
+        if not count:
+            return np.zeros(0, dtype)
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+    def frames(self):
+        """All frame records as one array"""
+        parts = [frames for frames, _ in self.chunks]
+        return np.concatenate(parts) if parts else np.zeros(0, FRAME_DTYPE)
+
+    def events(self):
+        """All event records as one array"""
+        parts = [events for _, events in self.chunks]
+        return np.concatenate(parts) if parts else np.zeros(0, EVENT_DTYPE)
+
+    def __len__(self):
+        return sum(len(frames) for frames, _ in self.chunks)
+
+    def landmark_lists(self):
+        """Yield (capture time, lm_list) per frame, lm_list in HandTracker [id, x, y, z] layout"""
+        for frames, _ in self.chunks:
+            yield from landmark_lists(frames)
+
+    def gesture_name(self, code):
+        return self.gestures[code]
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Parallel threshold sweep over recorded sessions.
+
+Evaluates a grid or random search of config values by replaying recorded
+sessions (replay.py) in a process pool, and scores every candidate against
+labelled gesture events:
+
+  false clicks   - emitted clicks/drags with no matching label
+  missed clicks  - labels with no matching emitted event
+  latency        - mean delay from a label to its matching event
+
+Labels live next to each session in <session>.labels.json:
+
+    [{"t": 12.34, "event": "left_click"}, {"t": 15.0, "event": "drag"}, ...]
+
+with t in the session's capture time and event one of left_click,
+right_click or drag (drag start). With --labels recorded, the mouse events
+recorded during the session are used as the reference instead (useful to
+find settings that reproduce a known-good session).
+
+    python sweep.py sessions/*.hgcs --param PINCH_ENTER_RATIO=0.2:0.35:0.025 \\
+        --param CLICK_DEBOUNCE_TIME=0.2,0.3,0.5 --output sweep_report.json
+    python sweep.py sessions/*.hgcs --param PINCH_ENTER_RATIO=0.2:0.35 --random 200
+"""
+
+import argparse
+import ast
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from mouse_controller import ACTION_CLICK, ACTION_PRESS, BUTTON_LEFT
+
+EVENT_LEFT_CLICK = "left_click"
+EVENT_RIGHT_CLICK = "right_click"
+EVENT_DRAG = "drag"
+EVENT_KINDS = (EVENT_LEFT_CLICK, EVENT_RIGHT_CLICK, EVENT_DRAG)
+
+DEFAULT_MATCH_WINDOW = 0.3  # Seconds an emitted event may lag (or lead by a third of) its label
+DEFAULT_WEIGHTS = {'false': 1.0, 'missed': 1.0, 'latency_ms': 0.01}
+
+
+def emitted_events(backend):
+    """(time, kind) of the clicks and drag starts in a NullMouseBackend log"""
+    events = []
+    for t, action, a, _ in backend.records():
+        if action == ACTION_CLICK:
+            events.append((t, EVENT_LEFT_CLICK if a == BUTTON_LEFT else EVENT_RIGHT_CLICK))
+        elif action == ACTION_PRESS and a == BUTTON_LEFT:
+            events.append((t, EVENT_DRAG))
+    return events
+
+
+def recorded_events(path):
+    """Reference events from the mouse actions recorded in a session"""
+    from session_recorder import SessionReader, EVENT_MOUSE
+    events = SessionReader(path).events()
+    reference = []
+    for event in events[events['kind'] == EVENT_MOUSE]:
+        if event['code'] == ACTION_CLICK:
+            reference.append((float(event['t']), EVENT_LEFT_CLICK if event['a'] == BUTTON_LEFT else EVENT_RIGHT_CLICK))
+        elif event['code'] == ACTION_PRESS and event['a'] == BUTTON_LEFT:
+            reference.append((float(event['t']), EVENT_DRAG))
+    return reference
+
+
+def load_labels(session_path, mode="file"):
+    if mode == "recorded":
+        return recorded_events(session_path)
+    with open(os.path.splitext(session_path)[0] + ".labels.json") as f:
+        labels = json.load(f)
+    unknown = {label['event'] for label in labels} - set(EVENT_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown label event(s) {sorted(unknown)} in labels for {session_path}")
+    return sorted((float(label['t']), label['event']) for label in labels)
+
+
+def match_events(emitted, labels, window=DEFAULT_MATCH_WINDOW):
+    """
+    Greedily match emitted events to labels of the same kind, in time order.
+    Returns (false count, missed count, list of label-to-event delays).
+    """
+    delays = []
+    unmatched = list(emitted)
+    missed = 0
+    for label_time, kind in labels:
+        best = None
+        for i, (t, emitted_kind) in enumerate(unmatched):
+            if emitted_kind == kind and label_time - window / 3 <= t <= label_time + window:
+                best = i
+                break
+        if best is None:
+            missed += 1
+        else:
+            delays.append(unmatched.pop(best)[0] - label_time)
+    return len(unmatched), missed, delays
+
+
+def score(result, weights=DEFAULT_WEIGHTS):
+    """Lower is better"""
+    return (weights['false'] * result['false_clicks'] + weights['missed'] * result['missed_clicks']
+            + weights['latency_ms'] * result['latency_ms'])
+
+
+def warm_landmark_cache(paths):
+    """
+    Track any videos that aren't in the landmark cache yet, once, before the
+    workers start; otherwise every worker would track the same video
+    """
+    from landmark_cache import LandmarkCache
+    from replay import is_session
+    cache = LandmarkCache()
+    for path in paths:
+        if not is_session(path):
+            cache.landmarks(path)
+
+
+# --- Worker processes: sessions are loaded once per worker ---
+
+_sessions = None
+
+
+def _init_worker(paths, label_mode):
+    global _sessions
+    from replay import load_frames
+    _sessions = []
+    for path in paths:
+        frames, frame_size = load_frames(path)
+        _sessions.append((frames, frame_size, load_labels(path, label_mode)))
+
+
+def evaluate(overrides, window=DEFAULT_MATCH_WINDOW):
+    """Replay every session with the overrides and total up the scores"""
+    from replay import replay
+    false = missed = 0
+    delays = []
+    labels = frames = 0
+    for session_frames, frame_size, session_labels in _sessions:
+        _, backend = replay(session_frames, overrides, frame_size)
+        f, m, d = match_events(emitted_events(backend), session_labels, window)
+        false += f
+        missed += m
+        delays += d
+        labels += len(session_labels)
+        frames += len(session_frames)
+    return {
+        'params': overrides,
+        'false_clicks': false,
+        'missed_clicks': missed,
+        'matched': len(delays),
+        'labels': labels,
+        'frames': frames,
+        'latency_ms': float(np.mean(delays) * 1000) if delays else 0.0,
+        'latency_p95_ms': float(np.percentile(delays, 95) * 1000) if delays else 0.0,
+    }
+
+
+def parse_param(text):
+    """NAME=a,b,c (values) or NAME=start:stop[:step] (range; step required for grids)"""
+    name, _, spec = text.partition('=')
+    if not spec:
+        raise argparse.ArgumentTypeError(f"Expected NAME=VALUES, got {text!r}")
+    name = name.strip().upper()
+    if ':' in spec:
+        parts = [float(p) for p in spec.split(':')]
+        if len(parts) not in (2, 3):
+            raise argparse.ArgumentTypeError(f"Expected start:stop[:step] for {name}")
+        return name, tuple(parts)
+    return name, [_literal(v) for v in spec.split(',')]
+
+
+def _literal(text):
+    """Python literal, or the text itself (e.g. CURSOR_MODE=absolute,relative)"""
+    try:
+        return ast.literal_eval(text.strip())
+    except (ValueError, SyntaxError):
+        return text.strip()
+
+
+def grid_candidates(params):
+    axes = []
+    for name, spec in params:
+        if isinstance(spec, tuple):
+            if len(spec) != 3:
+                raise ValueError(f"{name}: a grid search needs start:stop:step")
+            start, stop, step = spec
+            values = [round(v, 10) for v in np.arange(start, stop + step / 2, step)]
+        else:
+            values = spec
+        axes.append([(name, v) for v in values])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def random_candidates(params, count, seed=None):
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(count):
+        candidate = {}
+        for name, spec in params:
+            if isinstance(spec, tuple):
+                candidate[name] = round(rng.uniform(spec[0], spec[1]), 6)
+            else:
+                candidate[name] = rng.choice(spec)
+        candidates.append(candidate)
+    return candidates
+
+
+def run_sweep(session_paths, candidates, workers=None, label_mode="file",
+              window=DEFAULT_MATCH_WINDOW, weights=DEFAULT_WEIGHTS):
+    """Evaluate all candidates in a process pool; returns results ranked best first"""
+    warm_landmark_cache(session_paths)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(list(session_paths), label_mode)) as pool:
+        results = list(pool.map(evaluate, candidates, itertools.repeat(window),
+                                chunksize=max(1, len(candidates) // (4 * (workers or os.cpu_count() or 1)))))
+    for result in results:
+        result['score'] = score(result, weights)
+    return sorted(results, key=lambda r: r['score'])
+
+
+def print_ranking(results, top=10):
+    print(f"\n{'rank':<6}{'score':>8}{'false':>7}{'missed':>8}{'latency':>10}  params")
+    for rank, result in enumerate(results[:top], 1):
+        params = " ".join(f"{k}={v}" for k, v in result['params'].items())
+        print(f"{rank:<6}{result['score']:>8.2f}{result['false_clicks']:>7}{result['missed_clicks']:>8}"
+              f"{result['latency_ms']:>8.0f}ms  {params}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Sweep gesture thresholds over recorded sessions')
+    parser.add_argument('sessions', nargs='+', help='Session recordings (.hgcs) or recorded videos')
+    parser.add_argument('--param', action='append', type=parse_param, required=True,
+                        metavar='NAME=VALUES', help='Config setting to sweep: a,b,c or start:stop[:step]')
+    parser.add_argument('--random', type=int, metavar='N', help='Random search with N candidates instead of a grid')
+    parser.add_argument('--seed', type=int, default=None, help='Random search seed')
+    parser.add_argument('--labels', choices=['file', 'recorded'], default='file',
+                        help='Score against <session>.labels.json or the session\'s recorded mouse events')
+    parser.add_argument('--window', type=float, default=DEFAULT_MATCH_WINDOW,
+                        help='Seconds an event may lag its label and still match')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all CPUs)')
+    parser.add_argument('--output', default='sweep_report.json', help='Ranked report (JSON)')
+    parser.add_argument('--top', type=int, default=10, help='Candidates to print')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    if args.random:
+        candidates = random_candidates(args.param, args.random, args.seed)
+    else:
+        candidates = grid_candidates(args.param)
+    print(f"Evaluating {len(candidates)} candidates over {len(args.sessions)} session(s)...")
+
+    start = time.perf_counter()
+    results = run_sweep(args.sessions, candidates, args.workers, args.labels, args.window)
+    elapsed = time.perf_counter() - start
+    frames = results[0]['frames'] * len(results) if results else 0
+    print(f"Done in {elapsed:.1f}s ({frames / elapsed:.0f} frames/s across workers)")
+
+    print_ranking(results, args.top)
+    with open(args.output, 'w') as f:
+        json.dump({'sessions': args.sessions, 'labels': args.labels, 'window': args.window,
+                   'weights': DEFAULT_WEIGHTS, 'results': results}, f, indent=2)
+    print(f"\nRanked report written to {args.output}")
+    if results:
+        print("Best: python replay.py " + " ".join(args.sessions) + " " +
+              " ".join(f"--set {k}={v}" for k, v in results[0]['params'].items()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Synthetic hand landmarks for headless tests and benchmarks.
+Produces lm_list values in the same [id, x, y, z] layout as
+HandTracker.get_landmark_list, for a handful of poses that
+GestureRecognizer understands.
+"""
+
+import math
+
+POSE_OPEN = "open"      # All fingers up -> idle
+POSE_MOVE = "move"      # Loose fist -> cursor movement (clutch in relative mode)
+POSE_POINT = "point"    # Only index up -> cursor movement in either mode
+POSE_PINCH = "pinch"    # Thumb tip on index tip -> drag / left click
+POSE_RIGHT = "right"    # Index and middle tips together -> right click
+POSE_SCROLL = "scroll"  # Only pinky up -> scroll
+
+POSES = [POSE_OPEN, POSE_MOVE, POSE_POINT, POSE_PINCH, POSE_RIGHT, POSE_SCROLL]
+
+# Horizontal offset of each finger's MCP joint from the hand center
+_FINGER_X = [-0.10, -0.05, 0.0, 0.05, 0.10]
+
+
+def _finger(base_x, base_y, up, scale):
+    """MCP, PIP, DIP and tip points of one non-thumb finger"""
+    if up:
+        offsets = [0.0, -0.04, -0.07, -0.10]
+    else:
+        offsets = [0.0, -0.03, -0.01, 0.01]
+    return [(base_x, base_y + dy * scale) for dy in offsets]
+
+
+def make_hand(pose, cx=0.5, cy=0.5, scale=1.0, pinky_dy=0.0, angle=0.0):
+    """
+    Build a 21-landmark list for a pose centered roughly on (cx, cy).
+    scale: hand size multiplier (larger = closer to the camera).
+    pinky_dy: extra vertical pinky-tip offset, used to drive scrolling.
+    angle: tilt of the whole hand around (cx, cy), radians clockwise in the image.
+    """
+    fingers_up = {
+        POSE_OPEN: [True, True, True, True, True],
+        POSE_MOVE: [False, False, False, False, False],
+        POSE_POINT: [False, True, False, False, False],
+        POSE_PINCH: [False, True, False, False, False],
+        POSE_RIGHT: [False, True, True, False, False],
+        POSE_SCROLL: [False, False, False, False, True],
+    }[pose]
+
+    base_y = cy - 0.05 * scale
+    points = [(cx, cy + 0.10 * scale)]  # 0: wrist
+
+    # 1-4: thumb (CMC, MCP, IP, tip); tip x > IP x means "up"
+    thumb_x = cx + _FINGER_X[0] * scale
+    thumb_dir = 1 if fingers_up[0] else -1
+    points += [
+        (thumb_x, cy + 0.06 * scale),
+        (thumb_x, cy + 0.02 * scale),
+        (thumb_x + 0.01 * scale * thumb_dir, cy - 0.01 * scale),
+        (thumb_x + 0.03 * scale * thumb_dir, cy - 0.02 * scale),
+    ]
+
+    # 5-20: index, middle, ring, pinky
+    for i in range(1, 5):
+        points += _finger(cx + _FINGER_X[i] * scale, base_y, fingers_up[i], scale)
+
+    if pose == POSE_PINCH:
+        tip_x, tip_y = points[8]
+        points[4] = (tip_x + 0.005 * scale, tip_y + 0.005 * scale)
+    elif pose == POSE_RIGHT:
+        tip_x, tip_y = points[8]
+        points[12] = (tip_x + 0.01 * scale, tip_y)
+
+    if pinky_dy:
+        x, y = points[20]
+        points[20] = (x, y + pinky_dy)
+
+    if angle:
+        cos, sin = math.cos(angle), math.sin(angle)
+        points = [(cx + (x - cx) * cos - (y - cy) * sin, cy + (x - cx) * sin + (y - cy) * cos) for x, y in points]
+
+    return [[i, x, y, 0.0] for i, (x, y) in enumerate(points)]
+
+
+def make_sequence(script, cx=0.5, cy=0.5):
+    """
+    Expand a script of (pose, frames, dx, dy) steps into a list of lm_lists.
+    The hand center moves by (dx, dy) per frame during each step; a pose of
+    None produces empty lists (no hand detected).
+    """
+    frames = []
+    for pose, count, dx, dy in script:
+        for _ in range(count):
+            cx += dx
+            cy += dy
+            frames.append(make_hand(pose, cx, cy) if pose else [])
+    return frames
@@ -13,16 +13,18 @@ from pystray import MenuItem, Menu
 from PIL import Image, ImageDraw
 
 class SystemTray:
-    def __init__(self, main_app_callback, quit_callback):
+    def __init__(self, main_app_callback, quit_callback, tracer=None):
         """
         Initialize system tray
         
         Args:
             main_app_callback: Function to call the main application
             quit_callback: Function to call when quitting
+            tracer: TraceRecorder started/stopped from the menu (optional)
         """
         self.main_app_callback = main_app_callback
         self.quit_callback = quit_callback
+        self.tracer = tracer
         self.icon = None
         self.is_running = False
         
@@ -104,6 +106,15 @@ class SystemTray:
         """Restart application in headless mode"""
         threading.Thread(target=lambda: self.main_app_callback(headless=True, silent=False), daemon=True).start()
     
+    def toggle_trace(self):
+        """Start trace recording, or stop it and write the trace file"""
+        path = self.tracer.toggle()
+        if path and self.icon:
+            self.icon.notify(f"Trace written to {path}", "Hand Gesture Control")
+    
+    def trace_menu_text(self, item):
+        return "Stop Trace Recording" if self.tracer.recording else "Start Trace Recording"
+    
     def quit_application(self):
         """Quit the application"""
         self.is_running = False
@@ -112,6 +123,12 @@ class SystemTray:
         if self.quit_callback:
             self.quit_callback()
     
+    def set_status(self, text):
+        """Show a status line (e.g. latency summary) in the tray icon tooltip"""
+        if self.icon:
+            # Windows limits tooltips to 128 characters
+            self.icon.title = f"Hand Gesture Control\n{text}"[:127]
+    
     def create_menu(self):
         """Create the system tray menu"""
         return Menu(
@@ -119,6 +136,7 @@ class SystemTray:
             Menu.SEPARATOR,
             MenuItem("Open Camera Window", self.open_normal_mode),
             MenuItem("Restart Headless", self.restart_headless),
+            MenuItem(self.trace_menu_text, self.toggle_trace, visible=self.tracer is not None),
             Menu.SEPARATOR,
             MenuItem("Help", self.show_help),
             MenuItem("About", self.show_about),
@@ -155,15 +173,16 @@ class SystemTray:
             except KeyboardInterrupt:
                 pass
 
-def create_system_tray(main_app_callback, quit_callback):
+def create_system_tray(main_app_callback, quit_callback, tracer=None):
     """
     Create and return a system tray instance
     
     Args:
         main_app_callback: Function to call the main application
         quit_callback: Function to call when quitting
+        tracer: TraceRecorder for the trace menu item (optional)
         
     Returns:
         SystemTray instance
     """
-    return SystemTray(main_app_callback, quit_callback)
+    return SystemTray(main_app_callback, quit_callback, tracer)
@@ -0,0 +1,269 @@
+"""
+Temporal gestures: swipes, flicks and shapes drawn with the hand.
+
+Pose gestures look at one frame; these need the hand's recent motion.
+LandmarkHistory keeps the last N frames of landmarks and capture times in
+preallocated NumPy arrays (a ring buffer), and every matcher updates
+incrementally from the newest frame, so the cost per frame is constant no
+matter how long the history is or how long a gesture takes:
+
+  VelocityMatcher  displacement of the hand center (or of a fingertip
+                   relative to it) over the last few frames, above a speed
+                   and distance threshold: swipes and flicks by direction
+  DTWMatcher       streaming subsequence DTW of the hand's motion direction
+                   against a bank of templates (circles, polygons): one DTW
+                   column for all templates per resampled motion step
+
+Directions are in the mirrored camera image: x grows to the user's right,
+y grows downwards.
+"""
+
+import math
+
+import numpy as np
+
+import config
+
+HAND_LANDMARKS = 21
+WRIST, MIDDLE_FINGER_MCP, INDEX_FINGER_TIP = 0, 9, 8
+
+
+class LandmarkHistory:
+    """Ring buffer of the last `capacity` landmark frames"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.landmarks = np.zeros((capacity, HAND_LANDMARKS, 4), np.float64)  # lm_list rows: id, x, y, z
+        self.times = np.zeros(capacity, np.float64)
+        self.present = np.zeros(capacity, bool)
+        self.count = 0  # Frames pushed so far
+
+    def push(self, lm_list, t):
+        """Add a frame; lm_list is [id, x, y, z] rows, or empty when no hand was found"""
+        slot = self.count % self.capacity
+        if lm_list and len(lm_list) >= HAND_LANDMARKS:
+            self.landmarks[slot] = lm_list[:HAND_LANDMARKS]  # Copied as is: slicing rows costs twice as much
+            self.present[slot] = True
+        else:
+            self.present[slot] = False
+        self.times[slot] = t
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def slot(self, age):
+        """Ring index of the frame `age` frames before the newest one"""
+        return (self.count - 1 - age) % self.capacity
+
+    def center(self, slot):
+        """Hand center (mean of wrist and middle finger MCP) of a frame"""
+        lm = self.landmarks[slot]
+        return ((lm[WRIST, 1] + lm[MIDDLE_FINGER_MCP, 1]) / 2,
+                (lm[WRIST, 2] + lm[MIDDLE_FINGER_MCP, 2]) / 2)
+
+    def recent(self, frames):
+        """(landmarks (frames, 21, 3), times, present) of the last `frames` frames, oldest first (copies)"""
+        frames = min(frames, len(self))
+        order = np.arange(self.count - frames, self.count) % self.capacity
+        return self.landmarks[order, :, 1:], self.times[order], self.present[order]
+
+    def clear(self):
+        self.present[:] = False
+        self.count = 0
+
+
+class VelocityMatcher:
+    """Fast straight motion over the last `frames` frames: '<name>_left', '_right', '_up' or '_down'"""
+
+    def __init__(self, name, frames, min_speed, min_distance, landmark=None, axis_ratio=2.0, refractory=0.5):
+        """
+        landmark: None tracks the hand center; a landmark id tracks that point
+                  relative to the hand center (a flick of the finger, not the hand).
+        min_speed: normalised units per second; min_distance: normalised units.
+        axis_ratio: how much the dominant axis must exceed the other one.
+        refractory: seconds after an event before the next one.
+        """
+        self.name = name
+        self.frames = frames
+        self.min_speed = min_speed
+        self.min_distance = min_distance
+        self.landmark = landmark
+        self.axis_ratio = axis_ratio
+        self.refractory = refractory
+        self.last_event_time = -math.inf
+
+    def reset(self):
+        self.last_event_time = -math.inf
+
+    def _point(self, history, slot):
+        x, y = history.center(slot)
+        if self.landmark is not None:
+            lm = history.landmarks[slot, self.landmark]
+            x, y = lm[1] - x, lm[2] - y
+        return x, y
+
+    def update(self, history):
+        if len(history) <= self.frames:
+            return None
+        new, old = history.slot(0), history.slot(self.frames)
+        if not (history.present[new] and history.present[old]):
+            return None
+        now = history.times[new]
+        dt = now - history.times[old]
+        if dt <= 0 or now - self.last_event_time < self.refractory:
+            return None
+
+        x1, y1 = self._point(history, new)
+        x0, y0 = self._point(history, old)
+        dx, dy = x1 - x0, y1 - y0
+        dist = math.hypot(dx, dy)
+        if dist < self.min_distance or dist / dt < self.min_speed:
+            return None
+        if abs(dx) > self.axis_ratio * abs(dy):
+            direction = 'right' if dx > 0 else 'left'
+        elif abs(dy) > self.axis_ratio * abs(dx):
+            direction = 'down' if dy > 0 else 'up'
+        else:
+            return None  # Diagonal: ambiguous
+        self.last_event_time = now
+        return f"{self.name}_{direction}"
+
+
+def resample_directions(points, samples):
+    """Unit motion directions of a path resampled to `samples` equal arc-length steps: (samples, 2)"""
+    points = np.asarray(points, np.float64)
+    steps = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    arc = np.concatenate([[0.0], np.cumsum(steps)])
+    at = np.linspace(0.0, arc[-1], samples + 1)
+    resampled = np.column_stack([np.interp(at, arc, points[:, 0]), np.interp(at, arc, points[:, 1])])
+    deltas = np.diff(resampled, axis=0)
+    return deltas / np.linalg.norm(deltas, axis=1, keepdims=True)
+
+
+def polygon(sides, clockwise=True, phase=0.0, points_per_side=8):
+    """Closed regular polygon path (a circle for large `sides`), clockwise as seen in the image"""
+    corners = np.linspace(0.0, 2 * math.pi, sides + 1) + phase
+    if not clockwise:
+        corners = -corners
+    corners = np.column_stack([np.cos(corners), np.sin(corners)])  # y down: increasing angle is clockwise
+    path = [corners[0]]
+    for a, b in zip(corners[:-1], corners[1:]):
+        path += [a + (b - a) * k / points_per_side for k in range(1, points_per_side + 1)]
+    return np.array(path)
+
+
+def circle_templates(phases=4):
+    """Clockwise and counterclockwise circles, each starting at several phases"""
+    templates = []
+    for name, clockwise in (('circle_cw', True), ('circle_ccw', False)):
+        for k in range(phases):
+            templates.append((name, polygon(32, clockwise, 2 * math.pi * k / phases, points_per_side=2)))
+    return templates
+
+
+class DTWMatcher:
+    """
+    Streaming subsequence DTW (SPRING) of the hand's motion direction against templates.
+
+    The hand center is sampled every `step` of travel; each sample is a unit
+    direction, so matching doesn't depend on the size or speed of the shape.
+    Per sample, one DTW column is updated for all templates at once:
+
+        D'[i] = c[i] + min(D[i], D[i-1], D[i-2] + c[i-1]),  D'[0] = c[0] (a match may start at any sample)
+
+    and a template matches when its last cell, averaged over the template
+    length, falls below `threshold` (c is 1 - cos of the angle between
+    directions, so 0 is a perfect match and 1 is unrelated motion). A sample
+    covers at most two template steps and pays for both, so a few samples
+    that happen to point the right way can't stretch over the whole template.
+    """
+
+    def __init__(self, templates, samples=24, step=0.015, threshold=0.3, refractory=0.5):
+        """templates: (name, path points) pairs; names may repeat (e.g. phases of one shape)"""
+        self.names = [name for name, _ in templates]
+        self.directions = np.stack([resample_directions(points, samples) for _, points in templates])  # (T, M, 2)
+        self.step = step
+        self.threshold = threshold * samples  # Compared against the unaveraged last cell
+        self.refractory = refractory
+        self.cost = np.full((len(self.names), samples), np.inf)
+        self.anchor = None  # Hand center at the last sample
+        self.last_event_time = -math.inf
+
+    def reset(self):
+        self.cost[:] = np.inf
+        self.anchor = None
+
+    def update(self, history):
+        if not len(history):
+            return None
+        slot = history.slot(0)
+        if not history.present[slot]:
+            self.reset()
+            return None
+        x, y = history.center(slot)
+        if self.anchor is None:
+            self.anchor = (x, y)
+            return None
+        dx, dy = x - self.anchor[0], y - self.anchor[1]
+        dist = math.hypot(dx, dy)
+        if dist < self.step:
+            return None
+        self.anchor = (x, y)
+
+        # One column for every template. Each sample advances the template by 0, 1 or 2
+        # steps (shapes drawn up to twice as coarse as the template still match); a match
+        # may start at any sample
+        c = 1.0 - (self.directions[:, :, 0] * (dx / dist) + self.directions[:, :, 1] * (dy / dist))
+        cost = self.cost
+        previous = cost.copy()
+        np.minimum(previous[:, 1:], cost[:, :-1], out=previous[:, 1:])
+        np.minimum(previous[:, 2:], cost[:, :-2] + c[:, 1:-1], out=previous[:, 2:])  # Skipped step still pays
+        previous[:, 0] = 0.0
+        self.cost = np.add(c, previous, out=c)
+
+        now = history.times[slot]
+        best = int(np.argmin(self.cost[:, -1]))
+        if self.cost[best, -1] < self.threshold and now - self.last_event_time >= self.refractory:
+            self.last_event_time = now
+            self.cost[:] = np.inf  # Don't report the same stroke again
+            return self.names[best]
+        return None
+
+
+class TemporalGestureEngine:
+    """Landmark history plus the matchers that read it, updated once per frame"""
+
+    def __init__(self, matchers, capacity=None):
+        capacity = capacity or config.GESTURE_HISTORY_FRAMES
+        lookback = max((getattr(m, 'frames', 0) for m in matchers), default=0)
+        if lookback >= capacity:
+            raise ValueError(f"Gesture history of {capacity} frames is too short for a {lookback}-frame matcher")
+        self.history = LandmarkHistory(capacity)
+        self.matchers = matchers
+
+    def update(self, lm_list, t):
+        """Push a frame and return the temporal gestures it completes (usually none)"""
+        self.history.push(lm_list, t)
+        events = ()
+        for matcher in self.matchers:
+            event = matcher.update(self.history)
+            if event is not None:
+                events += (event,)
+        return events
+
+    def reset(self):
+        self.history.clear()
+        for matcher in self.matchers:
+            matcher.reset()
+
+
+def default_matchers(templates=None):
+    """Swipes, index flicks and shape templates (circles by default) with the config thresholds"""
+    return [
+        VelocityMatcher('swipe', config.SWIPE_FRAMES, config.SWIPE_MIN_SPEED, config.SWIPE_MIN_DISTANCE),
+        VelocityMatcher('flick', config.FLICK_FRAMES, config.FLICK_MIN_SPEED, config.FLICK_MIN_DISTANCE,
+                        landmark=INDEX_FINGER_TIP),
+        DTWMatcher(circle_templates() if templates is None else templates,
+                   step=config.SHAPE_SAMPLE_STEP, threshold=config.SHAPE_MATCH_THRESHOLD),
+    ]
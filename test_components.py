@@ -56,9 +56,9 @@ def test_components():
     try:
         print(f"\nTesting components...")
         
-        # Test MouseController
-        from mouse_controller import MouseController
-        mc = MouseController()
+        # Test MouseController (recording backend, so no display is needed)
+        from mouse_controller import MouseController, NullMouseBackend
+        mc = MouseController(backend=NullMouseBackend(), screen_size=(1920, 1080))
         print(f"✓ MouseController initialized (Screen: {mc.screen_width}x{mc.screen_height})")
         
         # Test HandTracker (without camera)
@@ -81,6 +81,147 @@ def test_components():
         print(f"✗ Component test failed: {e}")
         return False
 
+def test_screen_geometry():
+    """Test monitor parsing and the normalised-to-desktop mapping"""
+    try:
+        print(f"\nTesting screen geometry...")
+        from screen_geometry import ScreenGeometry, parse_geometry_spec
+
+        monitors = parse_geometry_spec("1920x1080+0+0,2560x1440+1920+0")
+        geometry = ScreenGeometry(monitors, source="test", target="all")
+        assert (geometry.width, geometry.height) == (4480, 1440)
+        assert geometry.to_screen(1.0, 1.0) == (4480, 1440)
+        geometry.set_target(1)
+        assert geometry.to_screen(0.5, 0.5) == (3200, 720)
+        assert geometry.monitor_at(3200, 720) is monitors[1]
+        print(f"✓ Screen geometry mapping works ({geometry})")
+        return True
+
+    except Exception as e:
+        print(f"✗ Screen geometry test failed: {e}")
+        return False
+
+def test_active_region():
+    """Test the virtual trackpad mapping and its tracker ROI"""
+    try:
+        print(f"\nTesting active region...")
+        from active_region import ActiveRegion
+
+        region = ActiveRegion((0.2, 0.2, 0.8, 0.8), edge_width=0.1, edge_gain=2.0)
+        assert region.to_unit(0.2, 0.8) == (0.0, 1.0)
+        assert region.to_unit(0.0, 1.0) == (0.0, 1.0)  # Clamped outside the region
+        center = region.to_unit(0.5, 0.5)
+        assert abs(center[0] - 0.5) < 1e-9 and abs(center[1] - 0.5) < 1e-9
+        assert all(abs(a - b) < 1e-9 for a, b in zip(region.roi(0.1), (0.1, 0.1, 0.9, 0.9)))
+        print("✓ Active region maps onto the full screen with edge acceleration")
+        return True
+
+    except Exception as e:
+        print(f"✗ Active region test failed: {e}")
+        return False
+
+def test_scroll_throughput():
+    """Compare scroll lines per second for the same pinky strokes: discrete ticks vs scroll engine"""
+    try:
+        print(f"\nTesting scroll throughput...")
+        import config
+        from scroll_engine import ScrollEngine
+
+        # 5 strokes: pinky moves 0.1 down over 0.5s, then 0.5s to reset the hand, at 30 FPS
+        dt = 1 / 30
+        strokes = 5
+        stroke = [i * 0.1 / 15 for i in range(16)]
+
+        # Discrete: one tick per SCROLL_SENSITIVITY crossed, limited by SCROLL_DEBOUNCE_TIME
+        ticks, now, last_tick = 0, 0.0, -1.0
+        for _ in range(strokes):
+            ref = stroke[0]
+            for y in stroke:
+                if abs(y - ref) > config.SCROLL_SENSITIVITY and now - last_tick > config.SCROLL_DEBOUNCE_TIME:
+                    ticks += 1
+                    ref, last_tick = y, now
+                now += dt
+            now += 0.5
+        discrete_lps = ticks / now
+
+        # Continuous: the engine's amounts go through MouseController to the backend, once for a
+        # backend with fine scrolling and once for one that only takes whole lines (pynput on X11/macOS)
+        from mouse_controller import MouseController, NullMouseBackend, ACTION_SCROLL
+        received = {}
+        for backend_resolution in (0.0, 1.0):
+            backend = NullMouseBackend(scroll_resolution=backend_resolution)
+            mouse = MouseController(backend=backend, screen_size=(1920, 1080))
+            engine = ScrollEngine(backend_resolution=mouse.scroll_resolution)
+            now = 0.0
+            for _ in range(strokes):
+                engine.start(stroke[0], now)
+                for y in stroke[1:]:
+                    now += dt
+                    amount = engine.update(y, now)
+                    if amount:
+                        mouse.scroll(amount)
+                engine.release(now)
+                for _ in range(15):
+                    now += dt
+                    if engine.coasting:
+                        amount = engine.coast(now)
+                        if amount:
+                            mouse.scroll(amount)
+            received[backend_resolution] = [b for _, action, _, b in backend.records() if action == ACTION_SCROLL]
+            assert abs(sum(received[backend_resolution]) - engine.lines_emitted) < 1e-9, "backend got what was emitted"
+        assert all(amount == int(amount) for amount in received[1.0]), "whole lines only for a whole-line backend"
+        continuous_lps = sum(received[0.0]) / now
+        whole_line_lps = sum(received[1.0]) / now
+
+        assert continuous_lps > discrete_lps, "scroll engine should scroll further for the same effort"
+        assert whole_line_lps > discrete_lps, "whole-line backends should still scroll"
+        print(f"✓ Scroll throughput: discrete {discrete_lps:.1f} lines/s, continuous {continuous_lps:.1f} lines/s "
+              f"({whole_line_lps:.1f} lines/s in whole lines)")
+        return True
+
+    except Exception as e:
+        print(f"✗ Scroll throughput test failed: {e}")
+        return False
+
+def test_offline_actuation(frames=5000):
+    """Drive the recognizer and actuation path headlessly and measure throughput"""
+    try:
+        print(f"\nTesting offline actuation...")
+        import time
+        from mouse_controller import (MouseController, NullMouseBackend,
+                                      ACTION_MOVE, ACTION_PRESS, ACTION_RELEASE, BUTTON_LEFT)
+        from hand_tracker import HandTracker
+        from gesture_recognizer import GestureRecognizer
+        from synthetic_landmarks import make_sequence, POSE_MOVE, POSE_PINCH, POSE_OPEN
+
+        backend = NullMouseBackend()
+        mc = MouseController(backend=backend, screen_size=(1920, 1080))
+        gr = GestureRecognizer(mc, HandTracker())
+
+        # Move, drag, release, rest - repeated to fill the requested frame count
+        script = [(POSE_MOVE, 20, 0.01, 0.0), (POSE_PINCH, 10, -0.01, 0.0),
+                  (POSE_MOVE, 10, -0.01, 0.0), (POSE_OPEN, 10, 0.0, 0.0)]
+        sequence = make_sequence(script)
+        cycles = max(1, frames // len(sequence))
+
+        start = time.perf_counter()
+        for _ in range(cycles):
+            for lm_list in sequence:
+                gr.recognize(lm_list, 640, 480)
+        elapsed = time.perf_counter() - start
+        fps = cycles * len(sequence) / elapsed
+
+        assert backend.count(ACTION_MOVE) > 0, "no cursor movement recorded"
+        assert backend.count(ACTION_PRESS, BUTTON_LEFT) == cycles, "expected one drag per cycle"
+        assert backend.count(ACTION_RELEASE, BUTTON_LEFT) == cycles, "expected one release per cycle"
+        print(f"✓ Offline actuation: {cycles * len(sequence)} frames at {fps:.0f} FPS, "
+              f"{len(backend)} actions recorded")
+        return True
+
+    except Exception as e:
+        print(f"✗ Offline actuation test failed: {e}")
+        return False
+
 if __name__ == "__main__":
     print("Hand Gesture Mouse Control - Component Test")
     print("=" * 50)
@@ -91,6 +232,10 @@ if __name__ == "__main__":
     success &= test_imports()
     success &= test_config()
     success &= test_components()
+    success &= test_screen_geometry()
+    success &= test_active_region()
+    success &= test_scroll_throughput()
+    success &= test_offline_actuation()
     
     print("\n" + "=" * 50)
     if success:
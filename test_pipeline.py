@@ -0,0 +1,891 @@
+#!/usr/bin/env python3
+"""
+Headless tests for the staged pipeline runtime (no camera or display needed)
+"""
+
+import threading
+import time
+
+from pipeline import Pipeline, StageQueue, DROP_OLDEST, BLOCK
+
+
+def test_queue_policies():
+    """Drop-oldest keeps the newest items; block never loses items"""
+    stop_event = threading.Event()
+
+    latest = StageQueue(maxsize=2, policy=DROP_OLDEST)
+    for i in range(5):
+        latest.put(i, stop_event)
+    assert latest.dropped == 3
+    assert [latest.get(), latest.get()] == [3, 4]
+
+    blocking = StageQueue(maxsize=1, policy=BLOCK)
+    assert blocking.put("a", stop_event)
+    stop_event.set()
+    assert not blocking.put("b", stop_event), "blocked put should give up once stopped"
+    assert blocking.get() == "a" and blocking.dropped == 0
+    print("✓ Queue policies work")
+
+
+def test_pipeline_runs_stages_in_order(items=200):
+    """Every item flows through all stages in order across threads"""
+    counter = iter(range(items))
+    received = []
+    pipeline = Pipeline("test")
+
+    def source():
+        try:
+            return next(counter)
+        except StopIteration:
+            time.sleep(0.01)
+            return None
+
+    def sink(item):
+        received.append(item)
+        if len(received) == items:
+            pipeline.stop()
+
+    (pipeline.set_source("source", source)
+             .add_stage("double", lambda x: x * 2, queue_size=4, policy=BLOCK)
+             .add_stage("nap", lambda x: (time.sleep(0.001), x)[1], queue_size=4, policy=BLOCK)
+             .add_stage("sink", sink, queue_size=4, policy=BLOCK, main_thread=True))
+    pipeline.run()
+
+    assert received == [i * 2 for i in range(items)]
+    stats = pipeline.stats()
+    assert stats['double']['processed'] == items
+    # Sleeping is busy (wall-clock) time but not CPU time
+    assert stats['nap']['busy_time'] >= items * 0.001 and stats['nap']['cpu_time'] < stats['nap']['busy_time'] / 2
+    print(f"✓ Pipeline delivered {items} items through all stages")
+
+
+def test_pipeline_reraises_stage_errors():
+    """A failing stage stops the pipeline and the error reaches the caller"""
+    def broken(item):
+        raise RuntimeError("stage failed")
+
+    pipeline = Pipeline("test").set_source("source", lambda: 1).add_stage("broken", broken)
+    try:
+        pipeline.run()
+    except RuntimeError as e:
+        assert str(e) == "stage failed"
+        print("✓ Stage errors stop the pipeline")
+        return
+    raise AssertionError("expected the stage error to be re-raised")
+
+
+def test_quality_controller_hysteresis():
+    """Degrades under load, holds each level, and recovers once latency drops"""
+    from quality_controller import AdaptiveQualityController
+
+    applied = []
+    levels = [{'name': 'high'}, {'name': 'medium'}, {'name': 'low'}]
+    controller = AdaptiveQualityController(applied.append, levels=levels, target_latency_ms=50,
+                                           hold_frames=10, upgrade_hold_frames=30, log=None)
+    for _ in range(15):
+        controller.observe(0.080)
+    assert controller.level == 1, "should degrade one level after the hold time"
+    for _ in range(4):
+        controller.observe(0.080)
+    assert controller.level == 1, "should hold the new level for hold_frames"
+
+    for _ in range(200):
+        controller.observe(0.010)
+    assert controller.level == 0, "should recover once latency is well under target"
+    assert [d[1:3] for d in controller.decisions][-1] == (1, 0)
+    assert applied[-1] == levels[0]
+    print(f"✓ Quality controller made {len(controller.decisions)} bounded decisions")
+
+
+def test_frame_scheduler_deadlines():
+    """Sleeps only the time left in each frame and counts late frames as missed"""
+    from frame_scheduler import FrameScheduler
+
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    scheduler = FrameScheduler(50, tolerance=0.25, clock=lambda: now[0], sleep=sleep)
+    scheduler.wait()             # First frame sets the first deadline at 20ms
+    now[0] += 0.005              # 5ms of work
+    scheduler.wait()
+    assert abs(sleeps[-1] - 0.015) < 1e-9, "should sleep only the remaining 15ms"
+    now[0] += 0.050              # A 50ms stall misses the 40ms deadline
+    scheduler.wait()
+    assert scheduler.missed == 1 and len(sleeps) == 1
+    now[0] += 0.001
+    scheduler.wait()             # Resynchronised: next deadline is 20ms after the stall
+    assert abs(sleeps[-1] - 0.019) < 1e-9
+    print(f"✓ Frame scheduler paced {scheduler.frames} frames, {scheduler.missed} missed")
+
+
+def test_latency_histogram_percentiles():
+    """Fixed-bucket histograms give percentiles within one bucket of the exact value"""
+    from latency_metrics import LatencyHistogram, LatencyTracker
+    from pipeline import Frame
+    import numpy as np
+
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000.0)
+    assert 45 <= histogram.percentile(50) * 1000 <= 55
+    assert 90 <= histogram.percentile(95) * 1000 <= 100
+    assert histogram.count == 100
+
+    tracker = LatencyTracker()
+    frame = Frame(1, np.zeros((4, 4, 3), np.uint8), 1.000)
+    frame.t_infer_start, frame.t_infer_end = 1.001, 1.021
+    frame.t_recognized, frame.t_actuated = 1.022, 1.023
+    tracker.record_frame(frame)
+    summary = tracker.summary()
+    assert set(summary) == {'queue', 'inference', 'recognition', 'actuation', 'end_to_end'}
+    assert 20 <= summary['end_to_end'][0] <= 25
+    print(f"✓ Latency histograms: {tracker.short_summary()}")
+
+
+def test_metrics_endpoint():
+    """Counters and histograms are served in Prometheus text format on localhost"""
+    from latency_metrics import LatencyHistogram
+    from metrics_server import Counter, LabeledCounter, MetricsRegistry, MetricsServer
+    import urllib.request
+
+    hands = Counter()
+    gestures = LabeledCounter()
+    histogram = LatencyHistogram([1, 10, float('inf')])
+    for _ in range(3):
+        hands.inc()
+    gestures.inc("move")
+    histogram.record(0.005)
+
+    registry = MetricsRegistry()
+    registry.add_counter("hand_detected_frames_total", "Frames with a hand", lambda: hands.value)
+    registry.add_counter("gesture_events_total", "Gestures", gestures.values, label="gesture")
+    registry.add_histograms("latency_seconds", "Latency", lambda: {"inference": histogram}, label="stage")
+
+    server = MetricsServer(registry, 0).start()
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5).read().decode()
+    finally:
+        server.stop()
+
+    assert "# TYPE hgc_hand_detected_frames_total counter" in body
+    assert "hgc_hand_detected_frames_total 3" in body
+    assert 'hgc_gesture_events_total{gesture="move"} 1' in body
+    assert 'hgc_latency_seconds_bucket{stage="inference",le="0.001"} 0' in body
+    assert 'hgc_latency_seconds_bucket{stage="inference",le="+Inf"} 1' in body
+    assert 'hgc_latency_seconds_count{stage="inference"} 1' in body
+    print(f"✓ Metrics endpoint served {len(body.splitlines())} lines")
+
+
+def test_trace_recorder(items=50):
+    """Stage spans are recorded into fixed rings and dumped as Chrome trace events"""
+    from trace_recorder import TraceRecorder
+    import json
+    import os
+    import tempfile
+
+    counter = iter(range(items))
+    pipeline = Pipeline("test")
+    tracer = TraceRecorder(capacity=32)
+
+    def source():
+        try:
+            return next(counter)
+        except StopIteration:
+            pipeline.stop()
+            return None
+
+    (pipeline.set_source("source", source)
+             .add_stage("sink", lambda x: None, queue_size=items, policy=BLOCK, main_thread=True)
+             .set_tracer(tracer))
+    tracer.start()
+    pipeline.run()
+    tracer.stop()
+
+    path = os.path.join(tempfile.mkdtemp(), "trace.json")
+    tracer.dump(path)
+    with open(path) as f:
+        events = json.load(f)['traceEvents']
+    spans = [e for e in events if e['ph'] == 'X']
+    names = {e['args']['name'] for e in events if e['name'] == 'thread_name'}
+    assert names == {"source", "sink"}
+    assert len([e for e in spans if e['name'] == 'source']) == 32, "ring keeps only the newest spans"
+    assert all(e['dur'] >= 0 and e['ts'] >= 0 for e in spans)
+    print(f"✓ Trace recorder wrote {len(spans)} spans")
+
+
+def test_benchmark_suite():
+    """Benchmarks run headlessly from fixtures and slowdowns are flagged against a baseline"""
+    from benchmark import run_benchmarks, compare, load_fixtures, release_fixtures
+    import os
+
+    fixtures = load_fixtures(frames=10)
+    try:
+        results = run_benchmarks(['camera_decode', 'recognize', 'actuation_dispatch'], fixtures=fixtures, log=None)
+    finally:
+        release_fixtures(fixtures)
+    assert not os.path.exists(os.path.dirname(fixtures['video'])), "generated clip removed"
+    assert set(results['results']) == {'camera_decode', 'recognize', 'actuation_dispatch'}
+    assert results['results']['actuation_dispatch']['actions'] > 0
+
+    baseline = {'results': {name: dict(r) for name, r in results['results'].items()}}
+    assert compare(results, baseline) == []
+    baseline['results']['recognize']['mean_ms'] /= 2
+    assert [r[0] for r in compare(results, baseline)] == ['recognize']
+    print(f"✓ Benchmarks: recognize at {results['results']['recognize']['per_second']:.0f}/s")
+
+
+def test_session_recorder_roundtrip(frames=600):
+    """Frames and events written in chunks read back through memory-mapped arrays"""
+    from session_recorder import SessionRecorder, SessionReader, EVENT_GESTURE, EVENT_MOUSE, HAND_RIGHT
+    from synthetic_landmarks import make_sequence, POSE_MOVE, POSE_OPEN
+    from pipeline import Frame
+    import errno
+    import numpy as np
+    import os
+    import tempfile
+    import threading
+
+    sequence = make_sequence([(POSE_MOVE, frames // 2, 0.001, 0.0), (POSE_OPEN, frames // 4, 0.0, 0.0),
+                              (None, frames // 4, 0.0, 0.0)])
+    path = os.path.join(tempfile.mkdtemp(), "session.hgcs")
+    recorder = SessionRecorder(path, chunk_frames=64)
+    image = np.zeros((4, 4, 3), np.uint8)
+    for i, lm_list in enumerate(sequence):
+        frame = Frame(i, image, i / 30.0)
+        frame.lm_list = lm_list
+        frame.gesture = "move" if i < frames // 2 else "idle"
+        frame.actions = [('move_to', (i, 2 * i))] if i < frames // 2 else []
+        recorder.record(frame, ("Right", 0.9) if lm_list else None)
+    recorder.close()
+
+    # An unknown gesture is an error, not silently recorded as "none"
+    recorder = SessionRecorder(os.path.join(tempfile.mkdtemp(), "bad.hgcs"))
+    frame = Frame(0, image, 0.0)
+    frame.gesture = "wave"
+    try:
+        recorder.record(frame)
+        raise AssertionError("expected an unknown gesture to be rejected")
+    except ValueError:
+        pass
+    finally:
+        recorder.close()
+
+    # A writer that fails (disk full) stops cleanly; close() reports the error instead of hanging
+    class FullDisk:
+        def __init__(self, file):
+            self.file = file
+
+        def write(self, data):
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        def flush(self):
+            pass
+
+        def close(self):
+            self.file.close()
+
+    recorder = SessionRecorder(os.path.join(tempfile.mkdtemp(), "full.hgcs"), chunk_frames=8, max_queued_chunks=2)
+    recorder.file = FullDisk(recorder.file)
+    for i, lm_list in enumerate(sequence[:200]):
+        frame = Frame(i, image, i / 30.0)
+        frame.lm_list = lm_list
+        frame.gesture = "idle"
+        recorder.record(frame)
+    closer = threading.Thread(target=recorder.close, daemon=True)
+    closer.start()
+    closer.join(timeout=10)
+    assert not closer.is_alive(), "close() hung on a failed writer"
+    assert isinstance(recorder.error, OSError) and recorder.error.errno == errno.ENOSPC
+    assert recorder.chunks_written == 0 and recorder.chunks_dropped > 0
+
+    reader = SessionReader(path)
+    records = reader.frames()
+    events = reader.events()
+    assert len(reader) == frames and len(reader.chunks) == -(-frames // 64)
+    assert np.allclose(records['landmarks'][10], [lm[1:4] for lm in sequence[10]])
+    assert records['hand'][0] == HAND_RIGHT and records['hand'][-1] == -1
+    assert list(events['kind']).count(EVENT_GESTURE) == 2
+    assert list(events['kind']).count(EVENT_MOUSE) == frames // 2
+    assert [reader.gesture_name(c) for c in events['code'][events['kind'] == EVENT_GESTURE]] == ["move", "idle"]
+    per_second = os.path.getsize(path) / (frames / 30.0) / 1024
+    assert per_second < 16, f"{per_second:.1f} KB/s is too large to leave on"
+    print(f"✓ Session recorder: {frames} frames, {per_second:.1f} KB/s at 30 FPS")
+
+
+def test_replay_faster_than_real_time():
+    """A recorded session replays on the session's own clock, much faster than real time"""
+    from replay import replay
+    from synthetic_landmarks import make_sequence, POSE_MOVE, POSE_PINCH, POSE_OPEN
+
+    # 30 FPS: move, drag for one second, release, rest - repeated for two minutes
+    script = [(POSE_MOVE, 30, 0.002, 0.0), (POSE_PINCH, 30, -0.002, 0.0),
+              (POSE_MOVE, 15, 0.0, 0.0), (POSE_OPEN, 15, 0.0, 0.0)]
+    sequence = make_sequence(script) * 40
+    frames = [(i / 30.0, lm_list) for i, lm_list in enumerate(sequence)]
+
+    report, backend = replay(frames)
+    assert report['frames'] == len(frames)
+    assert report['actions']['drags'] == 40
+    drag = report['timings']['drag_duration']
+    # The button goes down once the pinch outlasts the tap window, ~267 ms into each one-second pinch
+    assert drag['count'] == 40 and 700 < drag['p50_ms'] < 770, "drag timings follow the session clock"
+    assert report['replay_seconds'] < report['session_seconds'], "replays faster than real time"
+    print(f"✓ Replayed {report['session_seconds']:.0f}s of session at {report['fps']:.0f} FPS "
+          f"({report['speedup']:.0f}x real time)")
+
+
+def test_recognizer_uses_frame_timestamps():
+    """Hold times are measured in capture time, not in when frames happen to be processed"""
+    from mouse_controller import MouseController, NullMouseBackend, ACTION_CLICK, BUTTON_RIGHT
+    from gesture_recognizer import GestureRecognizer
+    from hand_tracker import HandTracker
+    from synthetic_landmarks import make_hand, POSE_RIGHT
+
+    def wall_clock():
+        raise AssertionError("recognize should use the frame timestamp")
+
+    backend = NullMouseBackend()
+    recognizer = GestureRecognizer(MouseController(backend=backend, screen_size=(1920, 1080)),
+                                   HandTracker.__new__(HandTracker), clock=lambda: 0.0)
+    recognizer.clock = wall_clock
+    hand = make_hand(POSE_RIGHT)
+    # Processed back to back, but captured 50ms apart: the 100ms hold only completes at 10.16s
+    for i in range(3):
+        recognizer.recognize(hand, 640, 480, 10.0 + i * 0.05)
+    assert backend.count(ACTION_CLICK, BUTTON_RIGHT) == 0
+    recognizer.recognize(hand, 640, 480, 10.16)
+    assert backend.count(ACTION_CLICK, BUTTON_RIGHT) == 1
+    print("✓ Gesture timing follows capture timestamps")
+
+
+def test_landmark_cache_skips_inference():
+    """The second run over the same video loads landmarks from the cache without tracking"""
+    from benchmark import make_fixture_video
+    from hand_tracker import HandTracker
+    from landmark_cache import LandmarkCache, tracker_settings
+    import landmark_cache
+    import numpy as np
+    import os
+    import tempfile
+    import threading
+
+    directory = tempfile.mkdtemp()
+    video = make_fixture_video(os.path.join(directory, "clip.avi"), frames=20)
+    cache = LandmarkCache(os.path.join(directory, "cache"))
+
+    tracker = HandTracker()
+    first = np.array(cache.landmarks(video, tracker))
+    tracker.close()
+
+    def no_inference(*args, **kwargs):
+        raise AssertionError("cached landmarks should not run hand tracking")
+
+    tracker = HandTracker()
+    tracker.find_hands = no_inference
+    second = cache.landmarks(video, tracker)
+    tracker.close()
+    assert isinstance(second, np.memmap) and len(second) == 20
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert np.array_equal(first, np.asarray(second))
+
+    tracker = HandTracker(model_complexity=0)  # Different settings -> different entry
+    assert cache.get(video, tracker_settings(tracker)) is None
+    tracker.close()
+
+    # Writers tracking the same video at once (as sweep workers could) each use their own temporary file
+    racing = LandmarkCache(os.path.join(directory, "race"))
+    writers = 8
+    tracked = threading.Barrier(writers)
+
+    def track_together(video_path, hand_tracker):
+        tracked.wait()  # Every writer finishes tracking, then they all write the entry at once
+        return first
+
+    results = []
+    tracker = HandTracker()
+    original, landmark_cache.track_video = landmark_cache.track_video, track_together
+    try:
+        threads = [threading.Thread(target=lambda: results.append(np.array(racing.landmarks(video, tracker))))
+                   for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        landmark_cache.track_video = original
+        tracker.close()
+    assert len(results) == writers and all(np.array_equal(first, r) for r in results)
+    written = [name for _, _, names in os.walk(racing.cache_dir) for name in names]
+    assert not [name for name in written if name.endswith(".tmp")], written
+    print(f"✓ Landmark cache: {len(second)} frames loaded without inference")
+
+
+def test_threshold_sweep_ranks_candidates():
+    """Sweeping the pinch threshold in worker processes ranks the one that finds every drag first"""
+    from session_recorder import SessionRecorder
+    from sweep import run_sweep, grid_candidates, parse_param
+    from synthetic_landmarks import make_sequence, POSE_MOVE, POSE_PINCH, POSE_OPEN
+    from pipeline import Frame
+    import json
+    import numpy as np
+    import os
+    import tempfile
+
+    script = [(POSE_MOVE, 20, 0.002, 0.0), (POSE_PINCH, 20, 0.0, 0.0), (POSE_OPEN, 20, 0.0, 0.0)]
+    sequence = make_sequence(script) * 5
+    path = os.path.join(tempfile.mkdtemp(), "session.hgcs")
+    recorder = SessionRecorder(path)
+    image = np.zeros((2, 2, 3), np.uint8)
+    for i, lm_list in enumerate(sequence):
+        frame = Frame(i, image, i / 30.0)
+        frame.lm_list = lm_list
+        recorder.record(frame)
+    recorder.close()
+    with open(path[:-len(".hgcs")] + ".labels.json", 'w') as f:
+        json.dump([{'t': (20 + 60 * k) / 30.0, 'event': 'drag'} for k in range(5)], f)
+
+    candidates = grid_candidates([parse_param("PINCH_ENTER_RATIO=0.01,0.27")])
+    results = run_sweep([path], candidates, workers=2)
+    assert results[0]['params'] == {'PINCH_ENTER_RATIO': 0.27}
+    assert (results[0]['false_clicks'], results[0]['missed_clicks']) == (0, 0)
+    assert results[1]['missed_clicks'] == 5
+    print(f"✓ Threshold sweep ranked {len(results)} candidates")
+
+
+def test_batch_evaluator_matches_recognize():
+    """The batch evaluator produces the same gestures and actions as frame-by-frame recognize"""
+    from batch_gestures import BatchGestureEvaluator
+    from replay import replay, config_overrides
+    from mouse_controller import ACTION_MOVE
+    from synthetic_landmarks import make_sequence, POSES, POSE_OPEN, POSE_MOVE, POSE_POINT, POSE_PINCH
+    import numpy as np
+    import random
+    import time
+
+    def session(poses, shortest, longest, runs):
+        rng = random.Random(7)
+        sequence = make_sequence([(rng.choice(poses), rng.randint(shortest, longest), rng.uniform(-0.004, 0.004),
+                                   rng.uniform(-0.01, 0.01)) for _ in range(runs)])
+        timestamps = np.arange(len(sequence)) / 30.0
+        landmarks = np.full((len(sequence), 21, 3), np.nan)
+        for i, lm_list in enumerate(sequence):
+            if lm_list:
+                landmarks[i] = [lm[1:4] for lm in lm_list]
+        return list(zip(timestamps.tolist(), sequence)), landmarks, timestamps
+
+    frames, landmarks, timestamps = session(POSES + [None], 1, 40, 200)
+
+    for overrides in ({}, {'SCROLL_MODE': 'discrete'}, {'CURSOR_MODE': 'relative'}):
+        frame_gestures = []
+        start = time.perf_counter()
+        _, backend = replay(frames, overrides, frame_gestures=frame_gestures)
+        per_frame = time.perf_counter() - start
+        with config_overrides(overrides):
+            start = time.perf_counter()
+            result = BatchGestureEvaluator().evaluate(landmarks, timestamps)
+            batch = time.perf_counter() - start
+
+        expected = [(t, action, a, b) for t, action, a, b in backend.records() if action != ACTION_MOVE]
+        actual = [(timestamps[int(i)], int(action), a, b) for i, action, a, b in result.actions]
+        assert actual == expected, overrides
+        assert result.gesture_names() == frame_gestures, overrides
+        assert batch < per_frame, (batch, per_frame)
+    matched = len(frames)
+
+    # Long runs of mostly cursor movement are where the batch evaluator is 100x faster or more;
+    # best of several runs, and a wide margin, so a loaded machine doesn't fail the floor
+    frames, landmarks, timestamps = session([POSE_OPEN, POSE_MOVE, POSE_POINT, POSE_POINT, POSE_MOVE, POSE_PINCH, None],
+                                            30, 300, 40)
+    evaluator = BatchGestureEvaluator()
+
+    def best(run, repeat):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    per_frame = best(lambda: replay(frames), 3)
+    batch = best(lambda: evaluator.evaluate(landmarks, timestamps), 5)
+    assert per_frame > 20 * batch, f"batch only {per_frame / batch:.0f}x faster"
+
+    print(f"✓ Batch evaluator matched recognize on {matched} frames ({len(expected)} actions); "
+          f"{per_frame / batch:.0f}x faster on {len(frames)} frames of long runs")
+
+
+def test_gesture_state_machine():
+    """Compiled transitions drive drag and right click; extra gestures don't change the others"""
+    from benchmark import extended_gesture_machine, landmark_script
+    from gesture_recognizer import (GestureRecognizer, GESTURE_MACHINE, POSE_OPEN, POSE_HAND,
+                                    GESTURE_DRAG, GESTURE_RIGHT_CLICK_ACTION)
+    from gesture_state_machine import feature_key
+    from hand_tracker import HandTracker
+    from mouse_controller import (MouseController, NullMouseBackend, ACTION_MOVE, ACTION_PRESS,
+                                  ACTION_RELEASE, ACTION_CLICK)
+    from synthetic_landmarks import make_hand, POSE_PINCH, POSE_RIGHT, POSE_POINT
+    import contextlib
+    import io
+
+    machine = GESTURE_MACHINE.compile(GestureRecognizer, "absolute")
+    assert machine.pose_table[feature_key([True] * 5, True, True)] == POSE_OPEN, "open palm wins over pinches"
+    assert machine.pose_table[feature_key([False, True, False, False, False], False, False)] == POSE_HAND
+
+    def run(poses, machine=None):
+        backend = NullMouseBackend()
+        recognizer = GestureRecognizer(MouseController(backend=backend, screen_size=(1920, 1080)),
+                                       HandTracker.__new__(HandTracker))
+        if machine is not None:
+            recognizer.machine = machine.compile(GestureRecognizer, recognizer.cursor_mode)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gestures = [recognizer.recognize(lm, 640, 480, 10 + i / 30.0) for i, lm in enumerate(poses)]
+        return gestures, [(action, a) for _, action, a, _ in backend.records() if action != ACTION_MOVE]
+
+    hands = [make_hand(POSE_POINT)] * 3 + [make_hand(POSE_PINCH)] * 12 + [make_hand(POSE_RIGHT)] * 6
+    gestures, actions = run(hands)
+    assert GESTURE_DRAG in gestures and GESTURE_RIGHT_CLICK_ACTION in gestures
+    assert [action for action, _ in actions] == [ACTION_PRESS, ACTION_RELEASE, ACTION_CLICK]
+
+    script = landmark_script()
+    assert run(script, extended_gesture_machine()) == run(script)
+    print(f"✓ Gesture state machine: {len(GESTURE_MACHINE.states)} states, {GESTURE_MACHINE.poses} poses")
+
+
+def test_tap_vs_drag():
+    """Short still pinches click on release; long or moving pinches drag; one-frame blips do nothing"""
+    from gesture_recognizer import GestureRecognizer, GESTURE_LEFT_CLICK_ACTION
+    from hand_tracker import HandTracker
+    from mouse_controller import MouseController, NullMouseBackend, ACTION_MOVE, ACTION_PRESS, ACTION_CLICK
+    from synthetic_landmarks import make_sequence, POSE_PINCH, POSE_POINT
+    import contextlib
+    import io
+
+    def run(script):
+        frame = [0]
+        backend = NullMouseBackend(clock=lambda: frame[0])  # Actions logged by frame index
+        recognizer = GestureRecognizer(MouseController(backend=backend, screen_size=(1920, 1080)),
+                                       HandTracker.__new__(HandTracker))
+        gestures = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i, lm in enumerate(make_sequence(script)):
+                frame[0] = i
+                gestures.append(recognizer.recognize(lm, 640, 480, 10 + i / 30.0))
+        actions = [(int(i), action) for i, action, _, _ in backend.records() if action != ACTION_MOVE]
+        return gestures, actions, recognizer.decision_latency
+
+    # Tap: 4 still pinch frames, click on the release frame
+    gestures, actions, latency = run([(POSE_POINT, 5, 0, 0), (POSE_PINCH, 4, 0, 0), (POSE_POINT, 5, 0, 0)])
+    assert actions == [(9, ACTION_CLICK)] and gestures[9] == GESTURE_LEFT_CLICK_ACTION
+    assert latency['tap'].count == 1 and abs(latency['tap'].mean - 4 / 30.0) < 1e-9
+
+    # Moving pinch: drag starts as soon as the hand leaves the tap radius, inside the window
+    _, actions, latency = run([(POSE_POINT, 5, 0, 0), (POSE_PINCH, 20, 0.01, 0), (POSE_POINT, 5, 0, 0)])
+    assert actions[0] == (7, ACTION_PRESS) and latency['drag'].count == 1 and latency['tap'].count == 0
+
+    # Still pinch held past the window: drag; one-frame pinch: nothing
+    _, actions, _ = run([(POSE_POINT, 5, 0, 0), (POSE_PINCH, 15, 0, 0), (POSE_POINT, 5, 0, 0)])
+    assert actions[0] == (13, ACTION_PRESS)
+    _, actions, _ = run([(POSE_POINT, 5, 0, 0), (POSE_PINCH, 1, 0, 0), (POSE_POINT, 5, 0, 0)])
+    assert actions == []
+    print(f"✓ Taps click on release; a moving pinch became a drag after {latency['drag'].mean * 1000:.0f} ms")
+
+
+def test_temporal_gestures():
+    """Ring buffer keeps the newest frames in order; swipes and circles are matched, jitter is not"""
+    from synthetic_landmarks import make_hand, POSE_OPEN
+    from temporal_gestures import LandmarkHistory, TemporalGestureEngine, default_matchers
+    import math
+    import random
+
+    history = LandmarkHistory(8)
+    for i in range(20):
+        history.push(make_hand(POSE_OPEN, 0.3 + 0.01 * i), i / 30.0)
+    landmarks, times, present = history.recent(5)
+    assert len(history) == 8 and present.all() and list(times * 30) == [15, 16, 17, 18, 19]
+    assert abs(landmarks[-1, 0, 0] - 0.49) < 1e-9
+
+    def run(path):
+        engine = TemporalGestureEngine(default_matchers())
+        events = []
+        for i, (x, y) in enumerate(path):
+            events += engine.update(make_hand(POSE_OPEN, x, y), 10 + i / 30.0)
+        return events
+
+    def circle(clockwise, phase=0.0, frames=40):
+        sign = 1 if clockwise else -1
+        return [(0.5 + 0.1 * math.cos(phase + sign * 2 * math.pi * i / frames),
+                 0.5 + 0.1 * math.sin(phase + sign * 2 * math.pi * i / frames)) for i in range(frames)]
+
+    assert run(circle(True)) == ['circle_cw'] and run(circle(False, phase=1.0)) == ['circle_ccw']
+    assert run([(0.3 + 0.03 * i, 0.5) for i in range(12)]) == ['swipe_right']
+    assert run([(0.5, 0.8 - 0.03 * i) for i in range(12)]) == ['swipe_up']
+    random.seed(3)
+    assert run([(0.5 + random.gauss(0, 0.005), 0.5 + random.gauss(0, 0.005)) for _ in range(300)]) == []
+    assert run([(0.3 + 0.004 * i, 0.5) for i in range(100)]) == [], "slow movement is not a swipe"
+    print("✓ Temporal gestures: circles and swipes matched from the landmark history")
+
+
+def test_pose_classifier():
+    """Classifiers trained on tilted hands beat the finger rules there, and drive recognize and batch alike"""
+    from batch_gestures import BatchGestureEvaluator
+    from gesture_recognizer import GestureRecognizer, GESTURE_MACHINE, GESTURE_DRAG, POSE_NAMES
+    from gesture_state_machine import feature_key
+    from hand_tracker import HandTracker
+    from mouse_controller import MouseController, NullMouseBackend, ACTION_MOVE
+    from synthetic_landmarks import make_hand, POSES
+    import contextlib
+    import io
+    import os
+    import random
+    import tempfile
+    import time
+    import numpy as np
+    import pose_classifier
+
+    labels = {'open': 'open', 'move': 'fist', 'point': 'hand', 'pinch': 'pinch', 'right': 'touch', 'scroll': 'pinky'}
+    rng = random.Random(4)
+
+    def hands(count, max_angle):
+        lm_lists, names = [], []
+        for _ in range(count):
+            pose = rng.choice(POSES)
+            lm_lists.append(make_hand(pose, rng.uniform(0.3, 0.7), rng.uniform(0.3, 0.7), rng.uniform(0.6, 1.4),
+                                      angle=rng.uniform(-max_angle, max_angle)))
+            names.append(labels[pose])
+        return lm_lists, np.array(names, dtype=object)
+
+    train_hands, train_names = hands(1200, 2.0)
+    test_hands, test_names = hands(300, 2.0)
+    x = pose_classifier.features(np.array(train_hands)[:, :, 1:])
+
+    # The rules, for comparison (fist and hand are the same pose to them in absolute mode)
+    tracker = HandTracker.__new__(HandTracker)
+    table = GESTURE_MACHINE.compile(GestureRecognizer, "relative").pose_table
+    distance = tracker.calculate_distance
+    rules = [POSE_NAMES[table[feature_key(tracker.fingers_up(lm), distance(lm, 4, 8) < 0.04, distance(lm, 8, 12) < 0.04)]]
+             for lm in test_hands]
+    rules_accuracy = np.mean(np.array(rules, dtype=object) == test_names)
+
+    directory = tempfile.mkdtemp()
+    for kind in ('knn', 'mlp'):
+        model, _ = pose_classifier.train(x, train_names, kind)
+        path = os.path.join(directory, f'{kind}.npz')
+        pose_classifier.save(model, path)
+        model = pose_classifier.load(path)
+        predicted = [model.classes[pose_classifier.predict_one(model, lm)[0]] for lm in test_hands]
+        accuracy = np.mean(np.array(predicted, dtype=object) == test_names)
+        assert accuracy > 0.97 and accuracy > rules_accuracy, (kind, accuracy, rules_accuracy)
+
+        start = time.perf_counter()
+        for lm in test_hands:
+            pose_classifier.predict_one(model, lm)
+        per_frame = (time.perf_counter() - start) / len(test_hands)
+        print(f"✓ {kind} pose classifier: {accuracy:.1%} on tilted hands (rules {rules_accuracy:.1%}), "
+              f"{per_frame * 1e6:.0f} us/frame, {os.path.getsize(path) // 1024} KiB")
+
+    # A drag with a hand tilted 60 degrees, through recognize and the batch evaluator
+    script = ([make_hand('point', angle=1.0)] * 5 + [make_hand('pinch', 0.5 + 0.01 * i, angle=1.0) for i in range(12)] +
+              [make_hand('open', angle=1.0)] * 5)
+    backend = NullMouseBackend(clock=lambda: 0.0)
+    recognizer = GestureRecognizer(MouseController(backend=backend, screen_size=(1920, 1080)), tracker)
+    recognizer.set_pose_classifier(model)
+    with contextlib.redirect_stdout(io.StringIO()):
+        gestures = [recognizer.recognize(lm, 640, 480, 10 + i / 30.0) for i, lm in enumerate(script)]
+    assert GESTURE_DRAG in gestures
+    evaluator = BatchGestureEvaluator()
+    evaluator.set_pose_classifier(model)
+    result = evaluator.evaluate(np.array(script)[:, :, 1:], 10 + np.arange(len(script)) / 30.0)
+    assert result.gesture_names() == gestures
+    assert [tuple(a[1:]) for a in result.actions] == [tuple(r[1:]) for r in backend.records() if r[1] != ACTION_MOVE]
+
+
+def test_event_log_rate_limit_and_ring():
+    """Logging never waits for a slow console; repeats are rate limited; the ring keeps every event"""
+    from event_log import EventLog
+    import json
+    import os
+    import tempfile
+    import threading
+
+    class SlowConsole:
+        def __init__(self):
+            self.lines = []
+            self.released = threading.Event()
+            self.threads = set()
+
+        def write(self, text):
+            self.threads.add(threading.current_thread())
+            self.released.wait(5)  # A blocked console or full pipe
+            self.lines += text.splitlines()
+
+        def flush(self):
+            pass
+
+    now = [0.0]
+    console = SlowConsole()
+    log = EventLog(mode="console", ring_size=100, rate_limit=0.5, stream=console, flush_interval=0.001,
+                   clock=lambda: now[0])
+    for i in range(300):  # Ten seconds of scroll ticks at 30 FPS
+        now[0] = i / 30.0
+        log.log("mouse", "scroll", dy=0.125)
+    log.log("mouse", "left click")
+    assert threading.current_thread() not in console.threads, "logging wrote to the console itself"
+
+    console.released.set()
+    log.close()
+    scrolls = [line for line in console.lines if line.startswith("Mouse: scroll")]
+    assert len(scrolls) == 21, scrolls  # One per half second, plus the count of the last repeats
+    assert "(+14 similar)" in scrolls[1] and console.lines[-2] == "Mouse: left click"
+    assert len(log.ring) == 100 and log.events()[-1]['message'] == "left click"
+
+    path = log.dump(os.path.join(tempfile.mkdtemp(), "events.jsonl"))
+    with open(path) as f:
+        events = [json.loads(line) for line in f]
+    assert len(events) == 100 and events[0]['dy'] == 0.125
+    print("✓ Event log: 301 events logged behind a blocked console, "
+          f"{len(console.lines)} lines written")
+
+
+def test_gesture_event_bus():
+    """Subscribers see typed events in order; a full queue drops only its own oldest events"""
+    from gesture_events import StateChange, Click, DragStart, DragEnd
+    from gesture_recognizer import GestureRecognizer, GESTURE_DRAG, GESTURE_RIGHT_CLICK_ACTION
+    from hand_tracker import HandTracker
+    from mouse_controller import MouseController, NullMouseBackend
+    from synthetic_landmarks import make_sequence, POSE_PINCH, POSE_POINT, POSE_RIGHT
+    import threading
+    import time
+
+    recognizer = GestureRecognizer(MouseController(backend=NullMouseBackend(), screen_size=(1920, 1080)),
+                                   HandTracker.__new__(HandTracker))
+    bus = recognizer.event_bus
+    everything = bus.subscribe()
+    actions = bus.subscribe((Click, DragStart, DragEnd))
+    slow = bus.subscribe(StateChange, maxsize=2)  # Never drained during recognition
+    heard = []
+    done = threading.Event()
+    callback = bus.subscribe(Click, callback=lambda event: (heard.append(event), done.set()))
+
+    script = make_sequence([(POSE_POINT, 5, 0, 0), (POSE_PINCH, 15, 0.002, 0), (POSE_POINT, 5, 0, 0),
+                            (POSE_RIGHT, 8, 0, 0), (POSE_POINT, 5, 0, 0)])
+    for i, lm in enumerate(script):
+        recognizer.recognize(lm, 640, 480, 10 + i / 30.0)
+
+    assert [type(e) for e in actions.drain()] == [DragStart, DragEnd, Click]
+    changes = [e for e in everything.drain() if isinstance(e, StateChange)]
+    assert GESTURE_DRAG in [e.gesture for e in changes] and GESTURE_RIGHT_CLICK_ACTION in [e.gesture for e in changes]
+    assert all(a.gesture == b.previous for a, b in zip(changes, changes[1:])), "state changes chain"
+    assert [e.gesture for e in slow.drain()] == [e.gesture for e in changes[-2:]]
+    assert slow.dropped == len(changes) - 2
+
+    assert done.wait(2) and heard[0].button == "right"
+    callback.close()
+    everything.close()
+    recognizer.reset_gesture_state()
+    assert everything.drain() == [] and slow.get(timeout=0.05) is not None  # Closed vs still subscribed
+
+    # Publishing cost does not grow with a stalled subscriber
+    start = time.perf_counter()
+    for i in range(10000):
+        bus.publish(Click(i, "left"))
+    per_event = (time.perf_counter() - start) / 10000
+    print(f"✓ Gesture event bus: {len(changes)} state changes, {per_event * 1e6:.2f} us per publish "
+          f"to {len(bus._subscriptions)} subscribers")
+
+
+def test_hand_scale_normalisation():
+    """Palm-normalised pinch thresholds with hysteresis: no false pinches far away, no flicker, less churn"""
+    from batch_gestures import BatchGestureEvaluator
+    from replay import replay, config_overrides
+    from mouse_controller import ACTION_MOVE, ACTION_CLICK, ACTION_PRESS, ACTION_RELEASE
+    from synthetic_landmarks import make_hand, POSE_POINT, POSE_PINCH
+    import numpy as np
+
+    def with_gap(gap, scale=1.0):
+        """Pointing hand with the thumb tip `gap` to the left of the index tip"""
+        hand = make_hand(POSE_POINT, scale=scale)
+        hand[4] = [4, hand[8][1] - gap, hand[8][2], 0.0]
+        return hand
+
+    # Far from the camera (palm 0.0375) a pointing hand's fingertips are all under 0.04 apart;
+    # then a pinch whose gap hovers around 0.04 for a second; then a real pinch close to the camera
+    hands = [make_hand(POSE_POINT, scale=0.25)] * 60
+    hands += [with_gap(0.1)] * 10 + [with_gap(0.02)] * 5
+    hands += [with_gap(0.038 if i % 4 < 2 else 0.042) for i in range(30)] + [with_gap(0.1)] * 10
+    hands += [make_hand(POSE_POINT, scale=2.0)] * 10 + [make_hand(POSE_PINCH, scale=2.0)] * 4
+    hands += [make_hand(POSE_POINT, scale=2.0)] * 10
+    frames = [(i / 30.0, hand) for i, hand in enumerate(hands)]
+
+    def buttons(backend):
+        return [(round(t * 30), action) for t, action, _, _ in backend.records()
+                if action in (ACTION_PRESS, ACTION_RELEASE, ACTION_CLICK)]
+
+    after, backend = replay(frames)
+    before, absolute = replay(frames, {'HAND_SCALE_NORMALISATION': False})
+    # One drag for the hovering pinch, one click for the near pinch, nothing for the far hand
+    assert buttons(backend) == [(78, ACTION_PRESS), (105, ACTION_RELEASE), (129, ACTION_CLICK)], buttons(backend)
+    assert any(i < 60 for i, _ in buttons(absolute)), "absolute thresholds pinch on the far hand"
+    assert before['churn']['actions_per_minute'] > after['churn']['actions_per_minute']
+    assert before['churn']['changes_per_minute'] > after['churn']['changes_per_minute']
+
+    # The batch evaluator's vectorised hysteresis agrees with recognize
+    landmarks = np.array([[lm[1:4] for lm in hand] for hand in hands])
+    timestamps = np.array([t for t, _ in frames])
+    for overrides, expected in (({}, backend), ({'HAND_SCALE_NORMALISATION': False}, absolute)):
+        with config_overrides(overrides):
+            result = BatchGestureEvaluator().evaluate(landmarks, timestamps)
+        actual = [(timestamps[int(i)], int(action), a, b) for i, action, a, b in result.actions]
+        assert actual == [r for r in expected.records() if r[1] != ACTION_MOVE], overrides
+
+    # Scrolling: the same pinky movement relative to the hand scrolls as far near or far from the camera
+    from synthetic_landmarks import POSE_SCROLL, POSE_OPEN
+    from mouse_controller import ACTION_SCROLL
+    lines = {}
+    for overrides in ({}, {'HAND_SCALE_NORMALISATION': False}, {'SCROLL_MODE': 'discrete'}):
+        for scale in (0.5, 1.5):
+            hands = [make_hand(POSE_SCROLL, scale=scale, pinky_dy=-0.006 * k * scale) for k in range(20)]
+            hands += [make_hand(POSE_OPEN, scale=scale)] * 30
+            _, scrolled = replay([(i / 30.0, hand) for i, hand in enumerate(hands)], overrides)
+            lines[tuple(overrides.items()), scale] = -sum(b for _, action, _, b in scrolled.records()
+                                                           if action == ACTION_SCROLL)  # Pinky up: scrolls up
+    assert lines[(), 0.5] > 0 and abs(lines[(), 0.5] - lines[(), 1.5]) < 0.01 * lines[(), 1.5], lines
+    assert lines[(('SCROLL_MODE', 'discrete'),), 0.5] == lines[(('SCROLL_MODE', 'discrete'),), 1.5] > 0, lines
+    absolute = (('HAND_SCALE_NORMALISATION', False),)
+    assert lines[absolute, 1.5] > 2 * lines[absolute, 0.5], lines
+
+    print(f"✓ Hand scale normalisation: churn {before['churn']['actions_per_minute']:.0f} -> "
+          f"{after['churn']['actions_per_minute']:.0f} button actions/min, "
+          f"{before['churn']['changes_per_minute']:.0f} -> {after['churn']['changes_per_minute']:.0f} gesture changes/min")
+
+
+if __name__ == "__main__":
+    print("Pipeline Runtime Test")
+    print("=" * 50)
+    test_queue_policies()
+    test_pipeline_runs_stages_in_order()
+    test_pipeline_reraises_stage_errors()
+    test_quality_controller_hysteresis()
+    test_frame_scheduler_deadlines()
+    test_latency_histogram_percentiles()
+    test_metrics_endpoint()
+    test_trace_recorder()
+    test_benchmark_suite()
+    test_session_recorder_roundtrip()
+    test_replay_faster_than_real_time()
+    test_recognizer_uses_frame_timestamps()
+    test_landmark_cache_skips_inference()
+    test_threshold_sweep_ranks_candidates()
+    test_batch_evaluator_matches_recognize()
+    test_gesture_state_machine()
+    test_tap_vs_drag()
+    test_temporal_gestures()
+    test_pose_classifier()
+    test_event_log_rate_limit_and_ring()
+    test_gesture_event_bus()
+    test_hand_scale_normalisation()
+    print("=" * 50)
+    print("✓ All pipeline tests passed!")
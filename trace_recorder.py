@@ -0,0 +1,120 @@
+"""
+Chrome trace-event recorder for pipeline timing.
+
+While recording, every stage run is stored as a (start, end, frame index)
+span in a preallocated per-stage ring buffer. Each ring has exactly one
+writer (the stage's thread), so recording is three array stores and an
+increment - no locks, no allocation. Dumping converts the buffered spans
+to the Chrome/Perfetto trace-event JSON format, which can be opened in
+chrome://tracing or https://ui.perfetto.dev to see where frame time goes.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+import config
+
+
+class SpanRing:
+    """Fixed-capacity ring of (start, end, frame) spans for one stage"""
+
+    def __init__(self, capacity):
+        self.starts = np.zeros(capacity, np.float64)
+        self.ends = np.zeros(capacity, np.float64)
+        self.frames = np.full(capacity, -1, np.int64)
+        self.capacity = capacity
+        self.count = 0
+
+    def record(self, start, end, frame):
+        i = self.count % self.capacity
+        self.starts[i] = start
+        self.ends[i] = end
+        self.frames[i] = frame
+        self.count += 1
+
+    def spans(self):
+        """Buffered spans, oldest first"""
+        n = min(self.count, self.capacity)
+        first = self.count - n
+        order = [(first + k) % self.capacity for k in range(n)]
+        return self.starts[order], self.ends[order], self.frames[order]
+
+    def clear(self):
+        self.count = 0
+
+
+class TraceRecorder:
+    def __init__(self, capacity=None, trace_dir=None):
+        """
+        capacity: spans kept per stage (older spans are overwritten).
+        trace_dir: where dump() writes trace files.
+        """
+        self.capacity = capacity or config.TRACE_BUFFER_SIZE
+        self.trace_dir = trace_dir or config.TRACE_DIR
+        self.rings = []        # One SpanRing per pipeline stage
+        self.stage_names = []
+        self.recording = False
+        self.origin = time.perf_counter()
+
+    def attach(self, stage_names):
+        """Allocate one ring per stage (called when a pipeline is built)"""
+        self.stage_names = list(stage_names)
+        self.rings = [SpanRing(self.capacity) for _ in self.stage_names]
+
+    def start(self):
+        for ring in self.rings:
+            ring.clear()
+        self.origin = time.perf_counter()
+        self.recording = True
+
+    def stop(self):
+        self.recording = False
+
+    def record(self, stage_index, start, end, frame=-1):
+        """Store one stage run; call only from that stage's thread"""
+        self.rings[stage_index].record(start, end, frame)
+
+    def events(self):
+        """Buffered spans as Chrome trace events (timestamps in microseconds)"""
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                   'args': {'name': 'Hand Gesture Control'}}]
+        for tid, (name, ring) in enumerate(zip(self.stage_names, self.rings)):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': name}})
+            events.append({'name': 'thread_sort_index', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'sort_index': tid}})
+            starts, ends, frames = ring.spans()
+            for start, end, frame in zip(starts.tolist(), ends.tolist(), frames.tolist()):
+                if start < self.origin:
+                    continue  # Written by a stage before this recording started
+                events.append({
+                    'name': name, 'cat': 'stage', 'ph': 'X', 'pid': pid, 'tid': tid,
+                    'ts': round((start - self.origin) * 1e6, 3),
+                    'dur': round((end - start) * 1e6, 3),
+                    'args': {'frame': frame},
+                })
+        return events
+
+    def dump(self, path=None):
+        """Write the buffered spans to a trace file and return its path"""
+        if path is None:
+            os.makedirs(self.trace_dir, exist_ok=True)
+            path = os.path.join(self.trace_dir, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events(), 'displayTimeUnit': 'ms'}, f)
+        return path
+
+    def toggle(self):
+        """Start recording, or stop and dump; returns the trace path when one was written"""
+        if not self.recording:
+            self.start()
+            print("Trace recording started")
+            return None
+        self.stop()
+        path = self.dump()
+        print(f"Trace written to {path}")
+        return path
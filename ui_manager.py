@@ -3,18 +3,22 @@ import time
 import config
 
 class UIManager:
-    def __init__(self):
-        self.start_time = time.time()
+    def __init__(self, clock=time.perf_counter):
+        """clock: monotonic clock with the same time base as frame capture timestamps"""
+        self.clock = clock
+        self.start_time = clock()
         self.show_instructions = config.SHOW_INSTRUCTIONS
         self.instructions_timeout = config.INSTRUCTIONS_TIMEOUT
         
-    def draw_instructions(self, image):
-        """Draw instruction overlay on the image"""
+    def draw_instructions(self, image, now=None):
+        """Draw instruction overlay on the image (now: the frame's capture timestamp)"""
         if not self.show_instructions:
             return image
             
         # Check if we should still show instructions
-        elapsed_time = time.time() - self.start_time
+        if now is None:
+            now = self.clock()
+        elapsed_time = now - self.start_time
         if elapsed_time > self.instructions_timeout:
             self.show_instructions = False
             return image
@@ -41,6 +45,7 @@ class UIManager:
             "• 'c' - Change camera",
             "• 'i' - Toggle instructions",
             "• 'h' - Show help again",
+            "• 't' - Start/stop trace recording",
             "",
             f"Instructions will hide in {int(self.instructions_timeout - elapsed_time)}s"
         ]
@@ -94,6 +99,15 @@ class UIManager:
         
         return image
     
+    def draw_latency(self, image, latency_tracker):
+        """Draw per-stage latency percentiles"""
+        if not config.LATENCY_DISPLAY:
+            return image
+        h, w = image.shape[:2]
+        for i, line in enumerate(latency_tracker.summary_lines()):
+            cv2.putText(image, line, (w - 300, 20 + i * 16), config.FONT, 0.4, config.COLOR_WHITE, 1)
+        return image
+    
     def draw_hand_info(self, image, lm_list, fingers):
         """Draw additional hand information for debugging"""
         if not lm_list:
@@ -112,16 +126,28 @@ class UIManager:
             
         return image
     
+    def draw_active_region(self, image, active_region, roi=None):
+        """Outline the active region (and the tracker ROI, if any) on the mirrored frame"""
+        h, w = image.shape[:2]
+        x_min, y_min, x_max, y_max = active_region.rect
+        cv2.rectangle(image, (int(x_min * w), int(y_min * h)), (int(x_max * w), int(y_max * h)),
+                      config.COLOR_GREEN, 1)
+        if roi is not None:
+            x_min, y_min, x_max, y_max = roi
+            cv2.rectangle(image, (int(x_min * w), int(y_min * h)), (int(x_max * w), int(y_max * h)),
+                          config.COLOR_YELLOW, 1)
+        return image
+
     def toggle_instructions(self):
         """Toggle instruction display"""
         self.show_instructions = not self.show_instructions
         if self.show_instructions:
-            self.start_time = time.time()  # Reset timer
+            self.start_time = self.clock()  # Reset timer
     
     def show_help(self):
         """Show instructions again"""
         self.show_instructions = True
-        self.start_time = time.time()
+        self.start_time = self.clock()
 
 class CameraManager:
     def __init__(self):
@@ -193,6 +219,7 @@ class CameraManager:
                 'index': self.current_camera,
                 'width': width,
                 'height': height,
+                'fps': self.cap.get(cv2.CAP_PROP_FPS),
                 'available': self.available_cameras
             }
         return None